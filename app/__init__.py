@@ -5,6 +5,12 @@ from flask_cors import CORS
 from flasgger import Swagger
 from app.api.debug.routes import DebugLogs
 from app.models.book import db
+from app.models.crawl_state import CrawlState
+from app.models.catalogue import CatalogueState
+from app.models.stats import StatsSnapshot
+from app.models.scraping_job import ScrapingJob
+from app.models.app_lock import AppLock
+from app.models.failed_fetch import FailedFetch
 from config import Config
 
 def create_app():
@@ -12,7 +18,6 @@ def create_app():
     app.config.from_object(Config)
 
     app.config['JSON_AS_ASCII'] = False
-    app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
     
     # Inicializa extensões
     db.init_app(app)
@@ -26,6 +31,12 @@ def create_app():
     from app.utils.monitoring import setup_monitoring
     setup_monitoring(app)
 
+    from app.utils.cache import init_response_cache
+    init_response_cache(app)
+
+    from app.utils.compression import setup_compression, output_json
+    setup_compression(app)
+
     swagger = Swagger(app, template={
         "swagger": "2.0",
         "info": {
@@ -48,11 +59,12 @@ def create_app():
     
     # Configurar API DEPOIS do Swagger
     api = Api(app, prefix='/api/v1')
+    api.representation('application/json')(output_json)  # indentação só com ?pretty
     
     # Registra rrotas
-    from app.api.core.routes import HealthCheck, ScrapingTrigger
+    from app.api.core.routes import HealthCheck, ScrapingTrigger, ScrapingJobStatus
     from app.api.auth.routes import Login, RefreshToken
-    from app.api.books.routes import Books, BookDetail, BookSearch
+    from app.api.books.routes import Books, BookDetail, BookSearch, BookExport, BookBatch
     from app.api.categories.routes import Categories, CategoryStats
     from app.api.stats.routes import StatsOverview, TopRatedBooks, PriceRangeBooks
     from app.api.ml.routes import MLFeatures, TrainingData, Predictions
@@ -60,11 +72,14 @@ def create_app():
     # Core endpoints
     api.add_resource(HealthCheck, '/health')
     api.add_resource(ScrapingTrigger, '/scraping/trigger')
+    api.add_resource(ScrapingJobStatus, '/scraping/jobs/<int:job_id>')
     
     # Books endpoints
     api.add_resource(Books, '/books')
     api.add_resource(BookDetail, '/books/<int:id>')
     api.add_resource(BookSearch, '/books/search')
+    api.add_resource(BookExport, '/books/export')
+    api.add_resource(BookBatch, '/books/batch')
     
     # Categories endpoints
     api.add_resource(Categories, '/categories')
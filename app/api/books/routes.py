@@ -1,7 +1,12 @@
-from flask import request
+from datetime import datetime, timezone
+from flask import current_app, request, Response, stream_with_context
 from flask_restful import Resource
 from flasgger import swag_from
 from app.models.book import Book
+from app.services.search import filter_books
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.utils.cache import conditional_get
+from app.utils.serialization import project_books, rows_to_dicts, parse_fields, InvalidFields, BOOK_FIELDS, iter_ndjson, iter_csv
 from sqlalchemy import desc
 import logging
 
@@ -22,6 +27,25 @@ class Books(Resource):
                 'in': 'query',
                 'type': 'integer',
                 'default': 20
+            },
+            {
+                'name': 'after',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Modo cursor: vazio para a primeira página, depois o next_cursor da resposta anterior'
+            },
+            {
+                'name': 'count',
+                'in': 'query',
+                'type': 'boolean',
+                'default': False,
+                'description': 'Modo cursor: inclui o total de livros (COUNT)'
+            },
+            {
+                'name': 'fields',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Campos retornados, separados por vírgula (ex.: price,rating,category)'
             }
         ],
         'responses': {
@@ -41,20 +65,36 @@ class Books(Resource):
             }
         }
     })
+    @conditional_get
     def get(self):
         """Lista todos os livros disponíveis na base de dados"""
         try:
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 20, type=int)
+            after = request.args.get('after')
+            fields = parse_fields(request.args.get('fields'))
+
+            if after is not None:
+                # Modo cursor: seek por id, sem OFFSET e sem COUNT por padrão
+                books, pagination = keyset_paginate(
+                    project_books(Book.query, fields, extra=('id',)), (Book.id,), after, per_page,
+                    with_count=request.args.get('count', 'false').lower() in ('1', 'true'),
+                    max_per_page=current_app.config.get('BOOKS_PER_PAGE_MAX', 100)
+                )
+                return {
+                    'books': rows_to_dicts(books, fields),
+                    'pagination': pagination
+                }, 200
             
-            books = Book.query.paginate(
+            # Só as colunas serializadas, como tuplas (sem hidratar objetos Book)
+            books = project_books(Book.query, fields).paginate(
                 page=page, 
                 per_page=per_page, 
                 error_out=False
             )
             
             return {
-                'books': [book.to_dict() for book in books.items],
+                'books': rows_to_dicts(books.items, fields),
                 'pagination': {
                     'page': page,
                     'per_page': per_page,
@@ -62,7 +102,11 @@ class Books(Resource):
                     'pages': books.pages
                 }
             }, 200
-            
+
+        except InvalidCursor:
+            return {'error': 'cursor inválido'}, 400
+        except InvalidFields as e:
+            return {'error': f"Campos inválidos: {', '.join(e.args[0])}", 'allowed_fields': list(BOOK_FIELDS)}, 400
         except Exception as e:
             logger.error(f"Error fetching books: {e}")
             return {'error': 'Erro interno no servidor'}, 500
@@ -87,6 +131,7 @@ class BookDetail(Resource):
             }
         }
     })
+    @conditional_get
     def get(self, id):
         """Retorna detalhes completos de um livro específico pelo ID"""
         try:
@@ -96,14 +141,137 @@ class BookDetail(Resource):
             logger.error(f"Error fetching book {id}: {e}")
             return {'error': 'Livro nao encontrado'}, 404
 
+def _parse_ids(values):
+    """Lista de ids (aceita '1,2,3'), sem repetição e na ordem pedida"""
+    ids = []
+    for value in values:
+        for part in str(value).split(','):
+            if part.strip():
+                ids.append(int(part))
+    return list(dict.fromkeys(ids))
+
+def _fetch_batch(raw_ids):
+    try:
+        ids = _parse_ids(raw_ids)
+        fields = parse_fields(request.args.get('fields'))
+    except InvalidFields as e:
+        return {'error': f"Campos inválidos: {', '.join(e.args[0])}", 'allowed_fields': list(BOOK_FIELDS)}, 400
+    except (TypeError, ValueError):
+        return {'error': 'ids devem ser inteiros'}, 400
+
+    max_ids = current_app.config.get('BOOKS_BATCH_MAX', 100)
+    if not ids:
+        return {'error': 'Informe ao menos um id'}, 400
+    if len(ids) > max_ids:
+        return {'error': f'Máximo de {max_ids} ids por requisição'}, 400
+
+    # Uma query só: WHERE id IN (...); o id vai no fim da tupla para reordenar
+    rows = project_books(Book.query, fields, extra=('id',)).filter(Book.id.in_(ids)).all()
+    by_id = {row.id: row for row in rows}
+
+    return {
+        'books': rows_to_dicts([by_id[book_id] for book_id in ids if book_id in by_id], fields),
+        'missing': [book_id for book_id in ids if book_id not in by_id],
+        'requested': len(ids)
+    }, 200
+
+class BookBatch(Resource):
+    @swag_from({
+        'tags': ['Core'],
+        'parameters': [
+            {
+                'name': 'ids',
+                'in': 'query',
+                'type': 'string',
+                'required': True,
+                'description': 'Ids separados por vírgula (ex.: 1,5,42)'
+            },
+            {
+                'name': 'fields',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Campos retornados, separados por vírgula'
+            }
+        ],
+        'responses': {
+            200: {
+                'description': 'Livros na ordem pedida + ids não encontrados',
+                'examples': {
+                    'application/json': {
+                        'books': [],
+                        'missing': [42],
+                        'requested': 3
+                    }
+                }
+            },
+            400: {
+                'description': 'ids inválidos ou acima do limite'
+            }
+        }
+    })
+    @conditional_get
+    def get(self):
+        """Busca vários livros pelo id numa única consulta"""
+        try:
+            return _fetch_batch(request.args.getlist('ids'))
+        except Exception as e:
+            logger.error(f"Error fetching book batch: {e}")
+            return {'error': 'Erro interno no servidor'}, 500
+
+    @swag_from({
+        'tags': ['Core'],
+        'parameters': [
+            {
+                'name': 'body',
+                'in': 'body',
+                'required': True,
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'ids': {
+                            'type': 'array',
+                            'items': {'type': 'integer'}
+                        }
+                    }
+                }
+            }
+        ],
+        'responses': {
+            200: {
+                'description': 'Livros na ordem pedida + ids não encontrados'
+            },
+            400: {
+                'description': 'ids inválidos ou acima do limite'
+            }
+        }
+    })
+    def post(self):
+        """Mesmo que o GET, com os ids no corpo JSON (listas longas)"""
+        try:
+            data = request.get_json(silent=True) or {}
+            ids = data.get('ids')
+            if not isinstance(ids, list):
+                return {'error': 'Corpo deve ser {"ids": [...]}'}, 400
+            return _fetch_batch(ids)
+        except Exception as e:
+            logger.error(f"Error fetching book batch: {e}")
+            return {'error': 'Erro interno no servidor'}, 500
+
 class BookSearch(Resource):
     @swag_from({
         'tags': ['Core'],
         'parameters': [
+            {
+                'name': 'q',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Busca textual em título e descrição, ordenada por relevância'
+            },
             {
                 'name': 'title',
                 'in': 'query',
-                'type': 'string'
+                'type': 'string',
+                'description': 'Mesmo que q (mantido por compatibilidade)'
             },
             {
                 'name': 'category',
@@ -115,6 +283,25 @@ class BookSearch(Resource):
                 'in': 'query',
                 'type': 'integer',
                 'default': 1
+            },
+            {
+                'name': 'after',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Modo cursor: vazio para a primeira página, depois o next_cursor da resposta anterior'
+            },
+            {
+                'name': 'count',
+                'in': 'query',
+                'type': 'boolean',
+                'default': False,
+                'description': 'Modo cursor: inclui o total de livros (COUNT)'
+            },
+            {
+                'name': 'fields',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Campos retornados, separados por vírgula (ex.: price,rating,category)'
             }
         ],
         'responses': {
@@ -123,32 +310,35 @@ class BookSearch(Resource):
             }
         }
     })
+    @conditional_get
     def get(self):
-        """Busca livros por título E/OU categoria (combinado quando ambos informados)"""
+        """Busca livros por texto (título/descrição) E/OU categoria (combinado quando ambos informados)"""
         try:
-            title = request.args.get('title', '')
+            title = request.args.get('q') or request.args.get('title', '')
             category = request.args.get('category', '')
             page = request.args.get('page', 1, type=int)
+            fields = parse_fields(request.args.get('fields'))
             
-            query = Book.query
-            
-            if title and category:
-                query = query.filter(
-                    Book.title.ilike(f'%{title}%'),
-                    Book.category.ilike(f'%{category}%')
+            query, search_type = filter_books(Book.query, title, category)
+            query = project_books(query, fields, extra=('id',))
+
+            after = request.args.get('after')
+            if after is not None:
+                # Modo cursor: ordena por id (a relevância vale só no modo page)
+                books, pagination = keyset_paginate(
+                    query, (Book.id,), after, 20,
+                    with_count=request.args.get('count', 'false').lower() in ('1', 'true')
                 )
-                search_type = "título E categoria"
-            elif title:
-                # Apenas título
-                query = query.filter(Book.title.ilike(f'%{title}%'))
-                search_type = "título"
-            elif category:
-                # Apenas categoria
-                query = query.filter(Book.category.ilike(f'%{category}%'))
-                search_type = "categoria"
-            else:
-                query = query
-                search_type = "todos os livros"
+                return {
+                    'books': rows_to_dicts(books, fields),
+                    'pagination': pagination,
+                    'search_filters': {
+                        'title': title,
+                        'category': category
+                    },
+                    'search_type': search_type,
+                    'results_count': len(books)
+                }, 200
             
             books = query.paginate(
                 page=page, 
@@ -157,7 +347,7 @@ class BookSearch(Resource):
             )
             
             return {
-                'books': [book.to_dict() for book in books.items],
+                'books': rows_to_dicts(books.items, fields),
                 'pagination': {
                     'page': page,
                     'per_page': 20,
@@ -171,7 +361,99 @@ class BookSearch(Resource):
                 'search_type': search_type,
                 'results_count': len(books.items)
             }, 200
-            
+
+        except InvalidCursor:
+            return {'error': 'cursor inválido'}, 400
+        except InvalidFields as e:
+            return {'error': f"Campos inválidos: {', '.join(e.args[0])}", 'allowed_fields': list(BOOK_FIELDS)}, 400
         except Exception as e:
             logger.error(f"Error searching books: {e}")
-            return {'error': 'Erro interno no servidor'}, 500
\ No newline at end of file
+            return {'error': 'Erro interno no servidor'}, 500
+
+def _parse_since(value):
+    """Data ISO 8601; com fuso, convertida para UTC sem fuso (como scraped_at)"""
+    since = datetime.fromisoformat(value)
+    if since.tzinfo:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', iter_ndjson),
+    'csv': ('text/csv', iter_csv),
+}
+
+class BookExport(Resource):
+    @swag_from({
+        'tags': ['Core'],
+        'parameters': [
+            {
+                'name': 'format',
+                'in': 'query',
+                'type': 'string',
+                'enum': ['ndjson', 'csv'],
+                'default': 'ndjson'
+            },
+            {
+                'name': 'q',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Mesmos filtros da busca: texto em título e descrição'
+            },
+            {
+                'name': 'category',
+                'in': 'query',
+                'type': 'string'
+            },
+            {
+                'name': 'since',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Só livros coletados ou alterados a partir desta data (ISO 8601, ex.: 2025-11-01T00:00:00)'
+            },
+            {
+                'name': 'fields',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Campos exportados, separados por vírgula'
+            }
+        ],
+        'responses': {
+            200: {
+                'description': 'Catálogo completo em streaming (NDJSON ou CSV)'
+            },
+            400: {
+                'description': 'Formato, campos ou data inválidos'
+            }
+        }
+    })
+    @conditional_get
+    def get(self):
+        """Exporta o catálogo inteiro em streaming, com memória constante"""
+        try:
+            export_format = request.args.get('format', 'ndjson').lower()
+            if export_format not in EXPORT_FORMATS:
+                return {'error': f"Formato inválido: use {', '.join(EXPORT_FORMATS)}"}, 400
+
+            fields = parse_fields(request.args.get('fields'))
+            title = request.args.get('q') or request.args.get('title', '')
+            query, _ = filter_books(Book.query, title, request.args.get('category', ''))
+
+            since = request.args.get('since')
+            if since:
+                query = query.filter(Book.scraped_at >= _parse_since(since))
+
+            # Cursor no servidor: as linhas chegam em lotes, nunca a tabela inteira em memória
+            query = project_books(query, fields).order_by(None).order_by(Book.id).yield_per(1000)
+            mimetype, serializer = EXPORT_FORMATS[export_format]
+
+            response = Response(stream_with_context(serializer(query, fields)), mimetype=mimetype)
+            response.headers['Content-Disposition'] = f'attachment; filename=books.{export_format}'
+            return response
+
+        except InvalidFields as e:
+            return {'error': f"Campos inválidos: {', '.join(e.args[0])}", 'allowed_fields': list(BOOK_FIELDS)}, 400
+        except ValueError:
+            return {'error': 'since deve ser uma data ISO 8601'}, 400
+        except Exception as e:
+            logger.error(f"Error exporting books: {e}")
+            return {'error': 'Erro interno no servidor'}, 500
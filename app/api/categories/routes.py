@@ -1,7 +1,7 @@
 from flask_restful import Resource
 from flasgger import swag_from
-from app.models.book import db, Book
-from sqlalchemy import func
+from app.utils.cache import cached_response, conditional_get
+from app.services.stats import get_snapshot
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,20 +15,19 @@ class Categories(Resource):
             }
         }
     })
+    @conditional_get
+    @cached_response
     def get(self):
         """Lista todas as categorias de livros disponíveis"""
         try:
-            categories = db.session.query(
-                Book.category, 
-                func.count(Book.id).label('book_count')
-            ).group_by(Book.category).all()
+            categories = sorted(get_snapshot()['categories'].items())
             
             return {
                 'categories': [
                     {
-                        'name': category[0],
-                        'book_count': category[1]
-                    } for category in categories
+                        'name': name,
+                        'book_count': entry['book_count']
+                    } for name, entry in categories
                 ],
                 'total_categories': len(categories)
             }, 200
@@ -46,26 +45,24 @@ class CategoryStats(Resource):
             }
         }
     })
+    @conditional_get
+    @cached_response
     def get(self):
         """Estatísticas detalhadas por categoria"""
         try:
-            stats = db.session.query(
-                Book.category,
-                func.count(Book.id).label('book_count'),
-                func.avg(Book.price).label('avg_price'),
-                func.max(Book.price).label('max_price'),
-                func.min(Book.price).label('min_price')
-            ).group_by(Book.category).all()
+            # Snapshot pré-calculado na ingestão: uma leitura por chave primária
+            stats = sorted(get_snapshot()['categories'].items())
             
             return {
                 'category_stats': [
                     {
-                        'category': stat.category,
-                        'book_count': stat.book_count,
-                        'avg_price': round(float(stat.avg_price or 0), 2),
-                        'max_price': round(float(stat.max_price or 0), 2),
-                        'min_price': round(float(stat.min_price or 0), 2)
-                    } for stat in stats
+                        'category': name,
+                        'book_count': entry['book_count'],
+                        'avg_price': entry['avg_price'],
+                        'max_price': round(float(entry['max_price']), 2),
+                        'min_price': round(float(entry['min_price']), 2),
+                        'percentiles': entry['percentiles']
+                    } for name, entry in stats
                 ]
             }, 200
             
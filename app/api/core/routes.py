@@ -1,5 +1,5 @@
 import datetime
-from flask import Response, json, jsonify
+from flask import Response, json, jsonify, request, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flasgger import swag_from
@@ -8,6 +8,9 @@ import logging
 from config import Config
 from datetime import datetime, timezone 
 from sqlalchemy import text 
+from app.models.book import db
+from app.models.scraping_job import ScrapingJob
+from app.services.jobs import active_job, create_job, get_job_runner
 
 logger = logging.getLogger(__name__)
 
@@ -44,13 +47,30 @@ class ScrapingTrigger(Resource):
     @swag_from({
         'tags': ['Adicional'],
         'security': [{'Bearer Auth': []}],
+        'parameters': [
+            {
+                'name': 'body',
+                'in': 'body',
+                'required': False,
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'max_minutes': {'type': 'number'},
+                        'target_books': {'type': 'integer'},
+                        'reset': {'type': 'boolean'}
+                    }
+                }
+            }
+        ],
         'responses': {
-            200: {
-                'description': 'Scraping triggered successfully',
+            202: {
+                'description': 'Crawl enfileirado (ou o job que já está em andamento)',
                 'examples': {
                     'application/json': {
-                        'message': 'Scraping iniciado com sucesso',
-                        'status': 'started',
+                        'message': 'Scraping enfileirado',
+                        'status': 'queued',
+                        'job_id': 1,
+                        'status_url': '/api/v1/scraping/jobs/1',
                         'triggered_by': 'admin'
                     }
                 }
@@ -75,15 +95,60 @@ class ScrapingTrigger(Resource):
                 logger.warning(f"Non-admin user attempted scraping: {username}")
                 return {'error': 'Admin access required'}, 403
             
-            logger.info(f"Scraping triggered by admin: {username}")
-            
+            data = request.get_json(silent=True) or {}
+            params = {
+                'max_minutes': data.get('max_minutes'),
+                'target_books': data.get('target_books'),
+                'reset': bool(data.get('reset', False))
+            }
+
+            # Um crawl por vez: devolve o que já está na fila/rodando
+            job = active_job()
+            message = 'Já existe um scraping em andamento'
+            if job is None:
+                job = create_job(username, params)
+                get_job_runner(current_app._get_current_object()).submit(job.id)
+                message = 'Scraping enfileirado'
+                logger.info(f"Scraping job {job.id} triggered by admin: {username}")
+
             return {
-                'message': 'Scraping triggered successfully',
-                'status': 'started',
-                'triggered_by': username,
-                'timestamp': '2024-01-01T00:00:00Z'  
-            }, 200
+                'message': message,
+                'status': job.status,
+                'job_id': job.id,
+                'status_url': f'/api/v1/scraping/jobs/{job.id}',
+                'triggered_by': job.triggered_by,
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }, 202
             
         except Exception as e:
             logger.error(f"Scraping trigger error: {e}")
-            return {'error': 'Erro interno no servidor'}, 500
\ No newline at end of file
+            return {'error': 'Erro interno no servidor'}, 500
+
+class ScrapingJobStatus(Resource):
+    @jwt_required()
+    @swag_from({
+        'tags': ['Adicional'],
+        'security': [{'Bearer Auth': []}],
+        'parameters': [
+            {
+                'name': 'job_id',
+                'in': 'path',
+                'type': 'integer',
+                'required': True
+            }
+        ],
+        'responses': {
+            200: {
+                'description': 'Progresso do job: categorias e páginas feitas, livros novos, taxa e ETA'
+            },
+            404: {
+                'description': 'Job não encontrado'
+            }
+        }
+    })
+    def get(self, job_id):
+        """Status e progresso de um job de scraping"""
+        job = db.session.get(ScrapingJob, job_id)
+        if job is None:
+            return {'error': 'Job não encontrado'}, 404
+        return job.to_dict(datetime.now(timezone.utc).replace(tzinfo=None)), 200
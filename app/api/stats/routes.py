@@ -1,8 +1,12 @@
 from flask import request
 from flask_restful import Resource
 from flasgger import swag_from
-from app.models.book import db, Book
-from sqlalchemy import func, desc
+from app.models.book import Book
+from sqlalchemy import desc
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.utils.cache import cached_response, conditional_get
+from app.services.stats import get_snapshot
+from app.utils.serialization import project_books, rows_to_dicts, parse_fields, InvalidFields, BOOK_FIELDS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,32 +20,13 @@ class StatsOverview(Resource):
             }
         }
     })
+    @conditional_get
+    @cached_response
     def get(self):
         """Estatísticas gerais"""
         try:
-            total_books = Book.query.count()
-            avg_price = db.session.query(func.avg(Book.price)).scalar() or 0
-            max_price = db.session.query(func.max(Book.price)).scalar() or 0
-            min_price = db.session.query(func.min(Book.price)).scalar() or 0
-            
-            # Distribuição dos ratings
-            rating_dist = db.session.query(
-                Book.rating, 
-                func.count(Book.id)
-            ).group_by(Book.rating).all()
-            
-            return {
-                'total_books': total_books,
-                'price_statistics': {
-                    'average': round(float(avg_price), 2),
-                    'max': round(float(max_price), 2),
-                    'min': round(float(min_price), 2)
-                },
-                'rating_distribution': [
-                    {'rating': rating, 'count': count} 
-                    for rating, count in rating_dist
-                ]
-            }, 200
+            # Snapshot pré-calculado na ingestão (inclui percentis de preço)
+            return get_snapshot()['overview'], 200
             
         except Exception as e:
             logger.error(f"Error - overview stats: {e}")
@@ -56,6 +41,12 @@ class TopRatedBooks(Resource):
                 'in': 'query',
                 'type': 'integer',
                 'default': 10
+            },
+            {
+                'name': 'fields',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Campos retornados, separados por vírgula (ex.: price,rating,category)'
             }
         ],
         'responses': {
@@ -64,21 +55,26 @@ class TopRatedBooks(Resource):
             }
         }
     })
+    @conditional_get
+    @cached_response
     def get(self):
         """Lista os livros com melhor avaliação"""
         try:
             limit = request.args.get('limit', 10, type=int)
+            fields = parse_fields(request.args.get('fields'))
             
-            top_books = Book.query.order_by(
+            top_books = project_books(Book.query, fields).order_by(
                 desc(Book.rating), 
                 desc(Book.price)
             ).limit(limit).all()
             
             return {
-                'books': [book.to_dict() for book in top_books],
+                'books': rows_to_dicts(top_books, fields),
                 'limit': limit
             }, 200
             
+        except InvalidFields as e:
+            return {'error': f"Campos inválidos: {', '.join(e.args[0])}", 'allowed_fields': list(BOOK_FIELDS)}, 400
         except Exception as e:
             logger.error(f"Error - top rated books: {e}")
             return {'error': 'Erro interno no servidor'}, 500
@@ -104,6 +100,25 @@ class PriceRangeBooks(Resource):
                 'in': 'query',
                 'type': 'integer',
                 'default': 1
+            },
+            {
+                'name': 'after',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Modo cursor: vazio para a primeira página, depois o next_cursor da resposta anterior'
+            },
+            {
+                'name': 'count',
+                'in': 'query',
+                'type': 'boolean',
+                'default': False,
+                'description': 'Modo cursor: inclui o total de livros (COUNT)'
+            },
+            {
+                'name': 'fields',
+                'in': 'query',
+                'type': 'string',
+                'description': 'Campos retornados, separados por vírgula (ex.: price,rating,category)'
             }
         ],
         'responses': {
@@ -112,26 +127,44 @@ class PriceRangeBooks(Resource):
             }
         }
     })
+    @conditional_get
     def get(self):
         """Filtra livros dentro de uma faixa de preço específica"""
         try:
             min_price = request.args.get('min', type=float)
             max_price = request.args.get('max', type=float)
             page = request.args.get('page', 1, type=int)
+            fields = parse_fields(request.args.get('fields'))
             
             if min_price is None or max_price is None:
                 return {'error': 'min and max price são obrigatorios'}, 400
             
-            books = Book.query.filter(
-                Book.price.between(min_price, max_price)
-            ).paginate(
+            query = project_books(Book.query, fields, extra=('price', 'id')).filter(Book.price.between(min_price, max_price))
+
+            after = request.args.get('after')
+            if after is not None:
+                # Modo cursor: seek em (price, id), coberto pelo índice de preço
+                books, pagination = keyset_paginate(
+                    query, (Book.price, Book.id), after, 20,
+                    with_count=request.args.get('count', 'false').lower() in ('1', 'true')
+                )
+                return {
+                    'books': rows_to_dicts(books, fields),
+                    'pagination': pagination,
+                    'price_range': {
+                        'min': min_price,
+                        'max': max_price
+                    }
+                }, 200
+
+            books = query.paginate(
                 page=page, 
                 per_page=20, 
                 error_out=False
             )
             
             return {
-                'books': [book.to_dict() for book in books.items],
+                'books': rows_to_dicts(books.items, fields),
                 'pagination': {
                     'page': page,
                     'per_page': 20,
@@ -143,7 +176,11 @@ class PriceRangeBooks(Resource):
                     'max': max_price
                 }
             }, 200
-            
+
+        except InvalidCursor:
+            return {'error': 'cursor inválido'}, 400
+        except InvalidFields as e:
+            return {'error': f"Campos inválidos: {', '.join(e.args[0])}", 'allowed_fields': list(BOOK_FIELDS)}, 400
         except Exception as e:
             logger.error(f"Error filtering by price range: {e}")
             return {'error': 'Erro interno no servidor'}, 500
\ No newline at end of file
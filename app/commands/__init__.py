@@ -1,5 +1,13 @@
 from .scrape_command import scrape_books_command
+from .database_command import ensure_indexes_command
+from .warmup_command import warmup_command
+from .retry_command import retry_failed_command
+from .backfill_command import backfill_descriptions_command
 
 def register_commands(app):
     """Registra comandos CLI personalizados"""
-    app.cli.add_command(scrape_books_command)
\ No newline at end of file
+    app.cli.add_command(scrape_books_command)
+    app.cli.add_command(ensure_indexes_command)
+    app.cli.add_command(warmup_command)
+    app.cli.add_command(retry_failed_command)
+    app.cli.add_command(backfill_descriptions_command)
\ No newline at end of file
@@ -0,0 +1,47 @@
+import logging
+import click
+from flask.cli import with_appcontext
+from app.models.book import db
+from app.services.descriptions import backfill_descriptions, pending_descriptions
+from app.services.locks import exclusive_lock, lock_heartbeat, LockBusy, DESCRIPTIONS_LOCK, CRAWL_LOCK_TTL
+from app.services.rate_limit import AdaptiveRateLimiter
+from app.services.scraper import BookScraper
+
+logger = logging.getLogger(__name__)
+
+@click.command('backfill-descriptions')
+@click.option('--limit', default=None, type=int, help='Máximo de livros nesta execução')
+@click.option('--batch-size', default=50, type=int, help='Livros por lote (um commit por lote)')
+@click.option('--workers', default=2, type=int, help='Threads buscando as páginas dos livros')
+@click.option('--rate', default=1.0, type=float, help='Teto de requisições por segundo (prioridade baixa)')
+@with_appcontext
+def backfill_descriptions_command(limit, batch_size, workers, rate):
+    """Busca as descrições que o crawl 'scrape-books --fields listing' deixou para depois"""
+    pending = pending_descriptions().count()
+    click.echo(f">>> Descrições pendentes: {pending}")
+    if not pending:
+        return
+
+    try:
+        with exclusive_lock(DESCRIPTIONS_LOCK, CRAWL_LOCK_TTL) as owner:
+            # Taxa fixa e baixa: não disputa o site com o crawl de listagem
+            scraper = BookScraper(
+                detail_workers=workers,
+                rate_limiter=AdaptiveRateLimiter(rate=rate, max_rate=rate)
+            )
+            try:
+                stats = backfill_descriptions(
+                    scraper, limit=limit, batch_size=batch_size,
+                    progress=lock_heartbeat(DESCRIPTIONS_LOCK, owner)
+                )
+            finally:
+                scraper.close()
+    except LockBusy as e:
+        raise click.ClickException(f"Outro backfill em andamento: {e}")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"ERRO no backfill: {e}")
+        raise click.ClickException(f"Backfill falhou: {e}")
+
+    click.echo(f">>> Descrições: +{stats['updated']} | Falhas: {stats['failed']} "
+               f"| Pendentes: {pending_descriptions().count()}")
@@ -0,0 +1,16 @@
+import logging
+import click
+from flask.cli import with_appcontext
+from app.services.database import ensure_schema
+
+logger = logging.getLogger(__name__)
+
+@click.command('ensure-indexes')
+@with_appcontext
+def ensure_indexes_command():
+    """Cria tabelas e índices que faltam (idempotente - seguro em todo deploy)"""
+    created = ensure_schema()
+    if created:
+        click.echo(f"Índices criados: {', '.join(created)}")
+    else:
+        click.echo("Schema já atualizado - nenhum índice criado")
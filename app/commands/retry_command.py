@@ -0,0 +1,33 @@
+import logging
+import click
+from flask.cli import with_appcontext
+from app.models.book import db
+from app.services.dead_letters import retry_dead_letters
+from app.services.locks import exclusive_lock, crawl_heartbeat, LockBusy, CRAWL_LOCK, CRAWL_LOCK_TTL
+from app.services.scraper import BookScraper
+
+logger = logging.getLogger(__name__)
+
+@click.command('retry-failed')
+@click.option('--limit', default=None, type=int, help='Máximo de URLs nesta passada')
+@click.option('--max-attempts', default=5, type=int, help='Ignora URLs que já falharam esse número de vezes')
+@with_appcontext
+def retry_failed_command(limit, max_attempts):
+    """Tenta de novo as URLs que falharam nos crawls anteriores (tabela failed_fetches)"""
+    try:
+        with exclusive_lock(CRAWL_LOCK, CRAWL_LOCK_TTL) as owner:
+            scraper = BookScraper(detail_workers=4)
+            try:
+                stats = retry_dead_letters(scraper, limit=limit, max_attempts=max_attempts,
+                                           progress=crawl_heartbeat(owner))
+            finally:
+                scraper.close()
+    except LockBusy as e:
+        raise click.ClickException(f"Outro crawl em andamento: {e}")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"ERRO na passada de falhas: {e}")
+        raise click.ClickException(f"Passada falhou: {e}")
+
+    click.echo(f">>> {stats['resolved']}/{stats['retried']} resolvidas | Falharam de novo: {stats['failed']} "
+               f"| Livros: +{stats['books_added']} | Descrições: {stats['descriptions_updated']}")
@@ -1,9 +1,18 @@
 import os
+import asyncio
 import logging
 import click
 from flask.cli import with_appcontext
 from app.models.book import Book, db
-from app.services.scraper import BookScraper
+from app.services.scraper import BookScraper, FIELD_MODES
+from app.services.http_cache import FileCache
+from app.services.crawl_state import CrawlStateStore
+from app.services.pipeline import crawl_catalogue
+from app.services.ingest import bulk_upsert_books
+from app.services.dead_letters import save_dead_letters
+from app.services.catalogue import bump_generation
+from app.services.stats import refresh_stats
+from app.services.locks import exclusive_lock, crawl_heartbeat, LockBusy, CRAWL_LOCK, CRAWL_LOCK_TTL
 
 logger = logging.getLogger(__name__)
 
@@ -11,8 +20,17 @@ logger = logging.getLogger(__name__)
 @click.option('--max-categories', default=None, type=int, help='Limitar categorias para teste')
 @click.option('--clean', is_flag=True, default=False, help='Limpar banco antes (só no RAILWAY)')
 @click.option('--offset', default=0, type=int, help='Pular X primeiras categorias')
+@click.option('--concurrency', default=10, type=int, help='Requisições simultâneas no crawl assíncrono (--clean)')
+@click.option('--per-host', default=5, type=int, help='Requisições simultâneas por host no crawl assíncrono (--clean)')
+@click.option('--workers', default=4, type=int, help='Threads para buscar as páginas de detalhe em paralelo')
+@click.option('--cache-dir', default=None, help='Diretório do cache HTTP em disco (default: SCRAPER_CACHE_DIR)')
+@click.option('--offline', is_flag=True, default=False, help='Servir do cache sem revalidar (só TTL)')
+@click.option('--parser', 'parser_name', default='lxml', type=click.Choice(['lxml', 'html.parser']), help='Backend de extração do HTML')
+@click.option('--reset', is_flag=True, default=False, help='Ignorar o checkpoint salvo e começar um crawl novo')
+@click.option('--fields', default='full', type=click.Choice(FIELD_MODES),
+              help="'listing': só as páginas de listagem, descrições depois com backfill-descriptions")
 @with_appcontext
-def scrape_books_command(max_categories, clean, offset):
+def scrape_books_command(max_categories, clean, offset, concurrency, per_host, workers, cache_dir, offline, parser_name, reset, fields):
     """Comando pra popular o banco - EXECUTAR APENAS NO RAILWAY"""
     try:
         if not os.environ.get('RAILWAY_ENVIRONMENT') and not os.environ.get('RAILWAY_SERVICE_NAME'):
@@ -22,107 +40,76 @@ def scrape_books_command(max_categories, clean, offset):
         
         logger.info("Ambiente Railway detectado - Iniciando scraping...")
         
-        scraper = BookScraper()
+        scraper = BookScraper(
+            max_concurrency=concurrency,
+            per_host_limit=per_host,
+            detail_workers=workers,
+            http_cache=FileCache(cache_dir) if cache_dir else None,
+            offline=offline or None,
+            parser=parser_name,
+            fields=fields
+        )
         
-        # OBTÉM CATEGORIAS COM OFFSET
-        all_categories = scraper.get_categories()
-        logger.info(f"📂 Total de categorias encontradas: {len(all_categories)}")
+        try:
+            # OBTÉM CATEGORIAS COM OFFSET
+            all_categories = scraper.get_categories()
+            logger.info(f"📂 Total de categorias encontradas: {len(all_categories)}")
         
-        # APLICA OFFSET - pula X primeiras categorias
-        if offset > 0:
-            categories_to_process = dict(list(all_categories.items())[offset:])
-            logger.info(f"⏩ Pulando {offset} categorias, processando {len(categories_to_process)} restantes")
-        else:
-            categories_to_process = all_categories
+            # APLICA OFFSET - pula X primeiras categorias
+            if offset > 0:
+                categories_to_process = dict(list(all_categories.items())[offset:])
+                logger.info(f"⏩ Pulando {offset} categorias, processando {len(categories_to_process)} restantes")
+            else:
+                categories_to_process = all_categories
         
-        # APLICA MAX CATEGORIES - limita quantas processar
-        if max_categories:
-            categories_to_process = dict(list(categories_to_process.items())[:max_categories])
-            logger.info(f"🔢 Limitando para {max_categories} categorias")
+            # APLICA MAX CATEGORIES - limita quantas processar
+            if max_categories:
+                categories_to_process = dict(list(categories_to_process.items())[:max_categories])
+                logger.info(f"🔢 Limitando para {max_categories} categorias")
         
-        logger.info(f"Processando {len(categories_to_process)} categorias...")
+            logger.info(f"Processando {len(categories_to_process)} categorias...")
         
-        if clean:
-            logger.info("Modo limpeza - removendo todos os livros...")
-            deleted_count = Book.query.delete()
-            
-            # Scraping completo das categorias selecionadas
-            books_data = []
-            for cat_name, cat_url in categories_to_process.items():
-                cat_books = scraper.scrape_single_category(cat_name, cat_url)
-                books_data.extend(cat_books)
-            
-            added_count = 0
-            for book_data in books_data:
-                book = Book(**book_data)
-                db.session.add(book)
-                added_count += 1
-            
-            db.session.commit()
-            logger.info(f"✅ Limpeza completa: {deleted_count} removidos, {added_count} adicionados")
-            
-        else:
-            total_added = 0
-            total_existing = 0
-            skipped_count = 0
-            processed_categories = 0
+            # Um crawl por vez entre instâncias (warm-up e jobs da API usam o mesmo lock)
+            with exclusive_lock(CRAWL_LOCK, CRAWL_LOCK_TTL) as owner:
+                if clean:
+                    # Scraping completo das categorias selecionadas (crawl assíncrono, lock renovado a cada página)
+                    # O heartbeat faz commit: a limpeza só acontece depois, junto com a gravação
+                    books_by_category = asyncio.run(scraper.crawl_async(
+                        categories_to_process, progress=crawl_heartbeat(owner)
+                    ))
+                    books_data = [book for cat_books in books_by_category.values() for book in cat_books]
+
+                    logger.info("Modo limpeza - removendo todos os livros...")
+                    deleted_count = Book.query.delete()
+                    CrawlStateStore().reset()
+                    bump_generation()
+                    refresh_stats()
             
-            for i, (category_name, category_url) in enumerate(categories_to_process.items(), offset + 1):
-                logger.info(f"📦 Processando categoria {i}/{len(all_categories)}: {category_name}")
-                
-                try:
-                    # Scraping apenas desta categoria
-                    category_books = scraper.scrape_single_category(category_name, category_url)
-                    
-                    if not category_books:
-                        logger.info(f" {category_name}: Nenhum livro encontrado - pulando")
-                        skipped_count += 1
-                        continue
-                    
-                    category_added = 0
-                    category_existing = 0
-                    
-                    for book_data in category_books:
-                        try:
-                            # Busca livro existente (titulo + categoria como chave única)
-                            existing_book = Book.query.filter_by(
-                                title=book_data['title'],
-                                category=book_data['category']
-                            ).first()
-                            
-                            if existing_book:
-                                # LIVRO JÁ EXISTE - NÃO ATUALIZA, SÓ PULA
-                                category_existing += 1
-                            else:
-                                # ADICIONA NOVO livro
-                                book = Book(**book_data)
-                                db.session.add(book)
-                                category_added += 1
-                                
-                        except Exception as e:
-                            skipped_count += 1
-                            logger.warning(f"⚠️  Erro no livro: {str(e)[:100]}")
-                            continue
-                    
-                    # COMMIT APÓS CADA CATEGORIA
+                    added_count, _, _ = bulk_upsert_books(books_data, commit=False)
+                    failed_count = save_dead_letters(scraper.dead_letters.drain())
                     db.session.commit()
-                    
-                    total_added += category_added
-                    total_existing += category_existing
-                    processed_categories += 1
-                    
-                    logger.info(f" {category_name}: +{category_added} novos, ⏩{category_existing} existentes (pulados)")
-                    
-                except Exception as e:
-                    skipped_count += 1
-                    logger.error(f" Erro na categoria {category_name}: {e}")
-                    db.session.rollback()  # Rollback apenas desta categoria
-                    continue
+                    logger.info(f"✅ Limpeza completa: {deleted_count} removidos, {added_count} adicionados")
+                    if failed_count:
+                        logger.warning(f"📬 {failed_count} URLs falharam - rode 'flask retry-failed'")
+            
+                else:
+                    # Crawl com checkpoint: retoma de onde o último run parou (tabela crawl_state)
+                    stats = crawl_catalogue(scraper, categories_to_process, reset=reset, progress=crawl_heartbeat(owner))
             
-            # Estatísticas 
-            total_books_processed = len(categories_to_process) * 20  # Estimativa
-            success_rate = (total_added / total_books_processed) * 100 if total_books_processed > 0 else 0
+                    logger.info(f" Páginas: {stats['pages_done']} | Categorias concluídas: {stats['categories_done']} "
+                                f"| Falhas: {stats['categories_failed']}")
+                    logger.info(f" Livros: +{stats['books_added']} novos, ~{stats['books_updated']} atualizados, "
+                                f"⏩{stats['books_existing']} inalterados (pulados)")
+                    if stats['dead_letters']:
+                        logger.warning(f"📬 {stats['dead_letters']} URLs falharam - rode 'flask retry-failed'")
+
+                if fields == 'listing':
+                    logger.info("📝 Descrições pendentes - rode 'flask backfill-descriptions'")
+        finally:
+            scraper.close()
             
+    except LockBusy as e:
+        raise click.ClickException(f"Outro crawl em andamento: {e}")
     except Exception as e:
         db.session.rollback()
         logger.error(f"ERRO no scraping: {e}")
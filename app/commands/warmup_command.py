@@ -0,0 +1,69 @@
+import time
+import logging
+import click
+from flask.cli import with_appcontext
+from app.models.book import Book, db
+from app.services.database import ensure_schema
+from app.services.crawl_state import CrawlStateStore
+from app.services.locks import exclusive_lock, crawl_heartbeat, LockBusy, CRAWL_LOCK, CRAWL_LOCK_TTL
+from app.services.pipeline import crawl_catalogue
+from app.services.scraper import BookScraper
+
+logger = logging.getLogger(__name__)
+
+def warmup(target_books, max_minutes):
+    """
+    Migração + crawl até a meta, fora do processo da API
+    Só uma instância crawla por vez (lock no banco); as outras apenas saem
+    """
+    created_indexes = ensure_schema()
+    click.echo(f">>> Tabelas ok | Índices novos: {created_indexes or 'nenhum'}")
+
+    book_count = Book.query.count()
+    click.echo(f">>> Livros: {book_count} | Checkpoint: {CrawlStateStore().summary()}")
+
+    if book_count >= target_books:
+        click.echo(f">>> Meta atingida: {book_count}/{target_books} livros - scraping não necessário")
+        return None
+
+    try:
+        with exclusive_lock(CRAWL_LOCK, CRAWL_LOCK_TTL) as owner:
+            scraper = BookScraper(detail_workers=4)
+            try:
+                # Retoma pelo checkpoint (crawl_state) de onde o último run parou
+                stats = crawl_catalogue(
+                    scraper, max_minutes=max_minutes, target_books=target_books,
+                    progress=crawl_heartbeat(owner)
+                )
+            finally:
+                scraper.close()
+    except LockBusy as e:
+        click.echo(f">>> Outro processo já está crawlando ({e}) - nada a fazer")
+        return None
+
+    final_count = Book.query.count()
+    click.echo(f">>> Páginas: {stats['pages_done']} | Categorias concluídas: {stats['categories_done']} "
+                f"| Livros: +{stats['books_added']} ~{stats['books_updated']} | Total: {final_count}/{target_books}")
+    if stats['stopped_by'] == 'time_limit':
+        click.echo(f">>> Limite de {max_minutes} minutos atingido - o próximo warm-up continua do checkpoint")
+    return stats
+
+@click.command('warmup')
+@click.option('--target-books', default=1000, type=int, help='Meta de livros na base')
+@click.option('--max-minutes', default=15, type=float, help='Tempo máximo de crawl por execução')
+@click.option('--interval', default=0, type=int, help='Minutos entre execuções (0 = executa uma vez e sai)')
+@with_appcontext
+def warmup_command(target_books, max_minutes, interval):
+    """Prepara o banco e completa o catálogo (processo separado da API)"""
+    while True:
+        try:
+            warmup(target_books, max_minutes)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f">>> Erro no warm-up: {e}")
+            if not interval:
+                raise click.ClickException(f"Warm-up falhou: {e}")
+
+        if not interval:
+            break
+        time.sleep(interval * 60)
@@ -0,0 +1,10 @@
+from app.models.book import db
+
+class AppLock(db.Model):
+    """Lock entre processos/instâncias (lease com expiração, some sozinho se o dono morrer)"""
+    __tablename__ = 'app_locks'
+
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(200), nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
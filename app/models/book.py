@@ -13,9 +13,23 @@ class Book(db.Model):
     availability = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(200), nullable=False)
     image_url = db.Column(db.String(500))
-    description = db.Column(db.Text)
+    description = db.Column(db.Text)  # None = ainda não buscada (crawl só de listagem)
+    source_url = db.Column(db.String(500))  # página do livro no site
+    content_hash = db.Column(db.String(40))  # sha1 dos campos da listagem (recrawl incremental)
     scraped_at = db.Column(db.DateTime, server_default=db.func.now())
     
+    # Bancos já existentes recebem estes índices via `flask ensure-indexes`
+    __table_args__ = (
+        # Chave natural - usada pelo upsert em lote (ON CONFLICT)
+        db.Index('uq_books_title_category', title, category, unique=True),
+        # Filtros por categoria (busca, /categories, /stats/categories)
+        db.Index('ix_books_category', category),
+        # Faixa de preço (/books/price-range)
+        db.Index('ix_books_price', price),
+        # Ordenação do /books/top-rated
+        db.Index('ix_books_rating_price', rating.desc(), price.desc()),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
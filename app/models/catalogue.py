@@ -0,0 +1,9 @@
+from app.models.book import db
+
+class CatalogueState(db.Model):
+    """Versão (geração) do catálogo: incrementada a cada commit que altera os livros"""
+    __tablename__ = 'catalogue_state'
+
+    id = db.Column(db.Integer, primary_key=True)  # linha única (id = 1)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
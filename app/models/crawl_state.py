@@ -0,0 +1,32 @@
+from app.models.book import db
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+
+class CrawlState(db.Model):
+    """Checkpoint do crawl: cada categoria e cada página de listagem com seu status"""
+    __tablename__ = 'crawl_state'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'url', name='uq_crawl_state_kind_url'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'category' ou 'page'
+    url = db.Column(db.String(500), nullable=False)
+    category = db.Column(db.String(200), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)  # ordem no site
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'url': self.url,
+            'category': self.category,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
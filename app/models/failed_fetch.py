@@ -0,0 +1,26 @@
+from app.models.book import db
+
+class FailedFetch(db.Model):
+    """Dead letter do scraper: URL que falhou mesmo após as novas tentativas"""
+    __tablename__ = 'failed_fetches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(500), nullable=False, unique=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'page' ou 'description'
+    category = db.Column(db.String(200))
+    title = db.Column(db.String(500))  # livro da descrição
+    error = db.Column(db.String(500))
+    attempts = db.Column(db.Integer, nullable=False, default=1)
+    first_failed_at = db.Column(db.DateTime, nullable=False)
+    last_failed_at = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'kind': self.kind,
+            'category': self.category,
+            'title': self.title,
+            'error': self.error,
+            'attempts': self.attempts,
+            'last_failed_at': self.last_failed_at.isoformat() if self.last_failed_at else None
+        }
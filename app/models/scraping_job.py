@@ -0,0 +1,73 @@
+from app.models.book import db
+
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+
+class ScrapingJob(db.Model):
+    """Crawl disparado pela API, executado em segundo plano, com o progresso persistido"""
+    __tablename__ = 'scraping_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=QUEUED)
+    triggered_by = db.Column(db.String(100))
+    params = db.Column(db.JSON, nullable=False, default=dict)  # max_minutes, target_books, reset
+
+    categories_total = db.Column(db.Integer, nullable=False, default=0)
+    categories_done = db.Column(db.Integer, nullable=False, default=0)
+    categories_failed = db.Column(db.Integer, nullable=False, default=0)
+    pages_done = db.Column(db.Integer, nullable=False, default=0)
+    books_added = db.Column(db.Integer, nullable=False, default=0)
+    books_updated = db.Column(db.Integer, nullable=False, default=0)
+    books_existing = db.Column(db.Integer, nullable=False, default=0)  # inalterados
+    stopped_by = db.Column(db.String(30))
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def progress(self, now):
+        """Taxa (páginas/min, livros/min) e ETA estimado pelas categorias restantes"""
+        if not self.started_at:
+            return {'percent': 0.0, 'pages_per_minute': None, 'books_per_minute': None, 'eta_seconds': None}
+
+        elapsed = ((self.finished_at or now) - self.started_at).total_seconds()
+        handled = self.categories_done + self.categories_failed
+        minutes = elapsed / 60 if elapsed > 0 else None
+
+        eta = None
+        if self.status == RUNNING and handled:
+            eta = round(elapsed / handled * max(self.categories_total - handled, 0))
+
+        return {
+            'percent': round(100 * handled / self.categories_total, 1) if self.categories_total else 0.0,
+            'pages_per_minute': round(self.pages_done / minutes, 1) if minutes else None,
+            'books_per_minute': round(self.books_added / minutes, 1) if minutes else None,
+            'eta_seconds': eta
+        }
+
+    def to_dict(self, now):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'triggered_by': self.triggered_by,
+            'params': self.params,
+            'categories': {
+                'total': self.categories_total,
+                'done': self.categories_done,
+                'failed': self.categories_failed
+            },
+            'pages_done': self.pages_done,
+            'books_added': self.books_added,
+            'books_updated': self.books_updated,
+            'books_existing': self.books_existing,
+            'progress': self.progress(now),
+            'stopped_by': self.stopped_by,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
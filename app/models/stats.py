@@ -0,0 +1,10 @@
+from app.models.book import db
+
+class StatsSnapshot(db.Model):
+    """Estatísticas pré-calculadas do catálogo (linha única, atualizada na ingestão)"""
+    __tablename__ = 'stats_snapshot'
+
+    id = db.Column(db.Integer, primary_key=True)  # linha única (id = 1)
+    overview = db.Column(db.JSON, nullable=False)
+    categories = db.Column(db.JSON, nullable=False)  # {categoria: agregados}
+    computed_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
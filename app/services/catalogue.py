@@ -0,0 +1,39 @@
+import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from flask import current_app, has_app_context
+from app.models.book import db
+from app.models.catalogue import CatalogueState
+
+logger = logging.getLogger(__name__)
+
+STATE_ID = 1
+
+def read_generation():
+    """Geração atual do catálogo (0 se nada foi gravado ainda)"""
+    return db.session.query(CatalogueState.generation).filter_by(id=STATE_ID).scalar() or 0
+
+def bump_generation(session=None):
+    """
+    Marca o catálogo como alterado, na mesma transação da escrita (não faz commit)
+    Os caches só enxergam a nova geração depois do commit
+    """
+    session = session or db.session
+    updated = session.query(CatalogueState).filter_by(id=STATE_ID).update(
+        {CatalogueState.generation: CatalogueState.generation + 1}
+    )
+    if not updated:
+        session.add(CatalogueState(id=STATE_ID, generation=1))
+    session.flush()
+    session.info['catalogue_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _catalogue_committed(session):
+    if session.info.pop('catalogue_changed', False) and has_app_context():
+        cache = current_app.extensions.get('response_cache')
+        if cache is not None:
+            cache.expire_generation()
+
+@event.listens_for(Session, 'after_rollback')
+def _catalogue_rolled_back(session):
+    session.info.pop('catalogue_changed', None)
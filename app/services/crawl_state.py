@@ -0,0 +1,107 @@
+import logging
+from datetime import datetime, timezone
+from app.models.book import db
+from app.models.crawl_state import CrawlState, PENDING, IN_FLIGHT, DONE
+
+logger = logging.getLogger(__name__)
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class CrawlStateStore:
+    """
+    Estado persistente do crawl (tabela crawl_state)
+
+    Os métodos não fazem commit: o pipeline grava o checkpoint da página
+    na mesma transação dos livros, então retomar nunca pula nem duplica trabalho
+    """
+
+    def __init__(self, session=None):
+        self.session = session or db.session
+
+    def _get(self, kind, url):
+        return self.session.query(CrawlState).filter_by(kind=kind, url=url).first()
+
+    def seed_categories(self, categories):
+        """Registra como pendentes as categorias que ainda não estão no estado"""
+        existing = {
+            row.url for row in self.session.query(CrawlState.url).filter_by(kind='category')
+        }
+        for position, (name, url) in enumerate(categories.items()):
+            if url not in existing:
+                self.session.add(CrawlState(kind='category', url=url, category=name, position=position))
+        self.session.flush()
+
+    def pending_categories(self):
+        """{categoria: url} ainda não concluídas, na ordem do site"""
+        rows = self.session.query(CrawlState).filter(
+            CrawlState.kind == 'category',
+            CrawlState.status != DONE
+        ).order_by(CrawlState.position).all()
+        return {row.category: row.url for row in rows}
+
+    def is_cycle_complete(self):
+        """True quando existe estado e todas as categorias estão concluídas"""
+        categories = self.session.query(CrawlState).filter_by(kind='category')
+        return categories.count() > 0 and categories.filter(CrawlState.status != DONE).count() == 0
+
+    def resume_point(self, category_name, category_url):
+        """Página por onde continuar a categoria (a primeira se nada foi feito)"""
+        row = self.session.query(CrawlState).filter(
+            CrawlState.kind == 'page',
+            CrawlState.category == category_name,
+            CrawlState.status != DONE
+        ).order_by(CrawlState.position).first()
+        return row.url if row else category_url
+
+    def start_category(self, category_url):
+        row = self._get('category', category_url)
+        if row and row.status == PENDING:
+            row.status = IN_FLIGHT
+            row.started_at = _now()
+
+    def finish_category(self, category_url):
+        row = self._get('category', category_url)
+        if row:
+            row.status = DONE
+            row.finished_at = _now()
+
+    def start_page(self, page_url, category_name):
+        row = self._get('page', page_url)
+        if not row:
+            row = CrawlState(kind='page', url=page_url, category=category_name, position=self._next_position(category_name))
+            self.session.add(row)
+        row.status = IN_FLIGHT
+        row.started_at = _now()
+
+    def finish_page(self, page_url, category_name, next_url=None):
+        """Conclui a página e deixa a próxima registrada como pendente"""
+        row = self._get('page', page_url)
+        if row:
+            row.status = DONE
+            row.finished_at = _now()
+        if next_url and not self._get('page', next_url):
+            self.session.add(CrawlState(
+                kind='page', url=next_url, category=category_name,
+                position=self._next_position(category_name)
+            ))
+
+    def _next_position(self, category_name):
+        last = self.session.query(db.func.max(CrawlState.position)).filter_by(
+            kind='page', category=category_name
+        ).scalar()
+        return 0 if last is None else last + 1
+
+    def reset(self):
+        """Começa um ciclo novo de crawl"""
+        deleted = self.session.query(CrawlState).delete()
+        logger.info(f"Estado do crawl reiniciado ({deleted} registros removidos)")
+
+    def summary(self):
+        rows = self.session.query(
+            CrawlState.kind, CrawlState.status, db.func.count(CrawlState.id)
+        ).group_by(CrawlState.kind, CrawlState.status).all()
+        summary = {}
+        for kind, status, count in rows:
+            summary.setdefault(kind, {})[status] = count
+        return summary
@@ -0,0 +1,76 @@
+import logging
+from sqlalchemy import inspect, text
+from app.models.book import Book, db
+from app.services.search import ensure_search_index
+from app.services.catalogue import bump_generation
+from app.services.stats import refresh_stats, SNAPSHOT_ID
+from app.models.stats import StatsSnapshot
+
+logger = logging.getLogger(__name__)
+
+def _existing_indexes(table_name):
+    return {index['name'] for index in inspect(db.engine).get_indexes(table_name)}
+
+def _add_missing_columns(table):
+    """ALTER TABLE ADD COLUMN para as colunas do modelo que o banco ainda não tem (sempre anuláveis)"""
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+    added = []
+    with db.engine.begin() as connection:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            added.append(column.name)
+            logger.info(f"Coluna criada: {table.name}.{column.name}")
+    return added
+
+def remove_duplicate_books():
+    """Mantém só o livro mais antigo (menor id) de cada (título, categoria)"""
+    result = db.session.execute(text(
+        "DELETE FROM books WHERE id NOT IN "
+        "(SELECT MIN(id) FROM books GROUP BY title, category)"
+    ))
+    if result.rowcount:
+        bump_generation()
+        refresh_stats()
+    db.session.commit()
+    return result.rowcount
+
+def ensure_schema():
+    """
+    Migração idempotente: cria as tabelas, colunas e índices declarados nos modelos que faltam
+    Pode rodar a cada deploy - o que já existe não é recriado
+
+    Retorna a lista de índices criados
+    """
+    db.create_all()
+    for table in db.metadata.sorted_tables:
+        _add_missing_columns(table)
+
+    existing = _existing_indexes(Book.__tablename__)
+    created = []
+
+    for index in sorted(Book.__table__.indexes, key=lambda ix: ix.name):
+        if index.name in existing:
+            continue
+
+        if index.unique:
+            removed = remove_duplicate_books()
+            if removed:
+                logger.warning(f"{removed} livros duplicados (título + categoria) removidos antes de {index.name}")
+
+        index.create(bind=db.engine, checkfirst=True)
+        created.append(index.name)
+        logger.info(f"Índice criado: {index.name}")
+
+    # Busca textual: GIN (PostgreSQL) ou FTS5 (SQLite)
+    with db.engine.begin() as connection:
+        ensure_search_index(connection)
+
+    # Snapshot de estatísticas para bancos que já tinham livros
+    if db.session.get(StatsSnapshot, SNAPSHOT_ID) is None:
+        refresh_stats()
+        db.session.commit()
+
+    return created
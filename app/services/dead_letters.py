@@ -0,0 +1,82 @@
+import logging
+from app.models.book import Book, db
+from app.models.failed_fetch import FailedFetch
+from app.services.catalogue import bump_generation
+from app.services.extraction import DESCRICAO_PADRAO
+from app.services.ingest import bulk_upsert_books
+from app.services.resilience import CircuitOpen
+
+logger = logging.getLogger(__name__)
+
+def save_dead_letters(entries, session=None):
+    """
+    Grava as falhas do scraper (DeadLetterQueue.drain()) em failed_fetches (não faz commit)
+    A mesma URL falhando de novo só incrementa as tentativas
+    """
+    session = session or db.session
+    for entry in entries:
+        row = session.query(FailedFetch).filter_by(url=entry['url']).first()
+        if row is None:
+            session.add(FailedFetch(
+                url=entry['url'], kind=entry['kind'], category=entry['category'], title=entry['title'],
+                error=entry['error'], attempts=1,
+                first_failed_at=entry['failed_at'], last_failed_at=entry['failed_at']
+            ))
+            session.flush()
+        else:
+            row.attempts += 1
+            row.error = entry['error']
+            row.last_failed_at = entry['failed_at']
+    return len(entries)
+
+def retry_dead_letters(scraper, limit=None, max_attempts=5, progress=None):
+    """
+    Passada posterior sobre failed_fetches (um commit por URL)
+
+    - page: recoleta a categoria a partir da página que falhou e grava os livros novos
+    - description: busca de novo e atualiza o livro que ficou com a descrição padrão
+    URLs que falham de novo continuam na tabela até max_attempts tentativas
+    progress(stats) é chamado depois de cada URL (ex.: renovar o lock do crawl)
+
+    Retorna as estatísticas da passada
+    """
+    query = FailedFetch.query.filter(FailedFetch.attempts < max_attempts).order_by(FailedFetch.id)
+    if limit:
+        query = query.limit(limit)
+
+    stats = {'retried': 0, 'resolved': 0, 'failed': 0, 'books_added': 0, 'descriptions_updated': 0}
+
+    for entry in query.all():
+        stats['retried'] += 1
+        try:
+            if entry.kind == 'page':
+                books_data = scraper.scrape_single_category(entry.category, entry.url)
+                added, _, _ = bulk_upsert_books(books_data, commit=False)
+                stats['books_added'] += added
+            elif entry.kind == 'description':
+                description = scraper.get_book_description(entry.url, entry.title, entry.category)
+                if description != DESCRICAO_PADRAO:
+                    updated = Book.query.filter_by(
+                        title=entry.title, category=entry.category, description=DESCRICAO_PADRAO
+                    ).update({'description': description, 'scraped_at': db.func.now()})
+                    if updated:
+                        bump_generation()
+                    stats['descriptions_updated'] += updated
+        except CircuitOpen as e:
+            db.session.rollback()
+            logger.warning(f"⏹️  Passada interrompida: {e}")
+            break
+
+        failures = scraper.dead_letters.drain()
+        if any(failure['url'] == entry.url for failure in failures):
+            stats['failed'] += 1
+        else:
+            db.session.delete(entry)
+            stats['resolved'] += 1
+        save_dead_letters(failures)
+        db.session.commit()
+        if progress is not None:
+            progress(dict(stats))
+
+    logger.info(f"📬 Dead letters: {stats['resolved']}/{stats['retried']} resolvidas, {stats['failed']} falharam de novo")
+    return stats
@@ -0,0 +1,60 @@
+import logging
+from sqlalchemy import update
+from app.models.book import Book, db
+from app.services.catalogue import bump_generation
+from app.services.dead_letters import save_dead_letters
+from app.services.resilience import CircuitOpen
+
+logger = logging.getLogger(__name__)
+
+def pending_descriptions():
+    """Livros gravados pelo crawl só de listagem que ainda não têm descrição"""
+    return Book.query.filter(Book.description.is_(None), Book.source_url.isnot(None))
+
+def backfill_descriptions(scraper, limit=None, batch_size=50, progress=None):
+    """
+    Busca só as descrições que faltam (description None), em lotes de batch_size livros
+    Um commit por lote; páginas que falham ficam com a descrição padrão e vão para failed_fetches
+
+    Retorna as estatísticas da passada
+    """
+    stats = {'updated': 0, 'failed': 0, 'stopped_by': None}
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        rows = pending_descriptions().with_entities(
+            Book.id, Book.title, Book.category, Book.source_url
+        ).order_by(Book.id).limit(size).all()
+        if not rows:
+            break
+
+        fetch = scraper.detail_pool.map if scraper.detail_pool else map
+        try:
+            descriptions = list(fetch(
+                scraper.get_book_description,
+                [row.source_url for row in rows], [row.title for row in rows], [row.category for row in rows]
+            ))
+        except CircuitOpen as e:
+            scraper.dead_letters.drain()
+            stats['stopped_by'] = 'circuit_open'
+            logger.error(f"⏹️  Backfill interrompido: {e}")
+            break
+
+        db.session.execute(update(Book).values(scraped_at=db.func.now()), [
+            {'id': row.id, 'description': description} for row, description in zip(rows, descriptions)
+        ])
+        failures = scraper.dead_letters.drain()
+        save_dead_letters(failures)
+        bump_generation()
+        db.session.commit()
+
+        stats['failed'] += len(failures)
+        stats['updated'] += len(rows) - len(failures)
+        if remaining is not None:
+            remaining -= len(rows)
+        if progress is not None:
+            progress(dict(stats))
+
+    logger.info(f"📝 Backfill: {stats['updated']} descrições, {stats['failed']} falhas")
+    return stats
@@ -0,0 +1,324 @@
+"""
+Extração de dados do books.toscrape.com - fonte única para o scraper e a conciliação
+(scripts/concilia_scraping.py). Dois backends com a mesma saída: BeautifulSoup e lxml.
+"""
+import re
+import hashlib
+import logging
+from functools import lru_cache
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "http://books.toscrape.com/"
+DESCRICAO_PADRAO = "Descrição não disponível"
+
+# Campos que entram no hash do conteúdo (a descrição vem de outra página e do backfill)
+HASH_FIELDS = ('title', 'price', 'rating', 'availability', 'category', 'image_url', 'source_url')
+
+# Classe CSS do p.star-rating -> nota
+RATINGS = {'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5}
+
+_PARENT_DIRS = re.compile(r'^(?:\.\./)+')
+# li.current da paginação: "Page 1 of 50"
+_PAGE_OF = re.compile(r'Page\s+(\d+)\s+of\s+(\d+)', re.IGNORECASE)
+
+
+# ---------------------------------------------------------------------------
+# Normalização comum aos dois backends
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=8192)
+def resolve_catalogue_url(base_url, relative_url):
+    """Converte '../../x/index.html' em '<base>/catalogue/x/index.html' (memoizado)"""
+    relative_url = _PARENT_DIRS.sub('', relative_url)
+
+    if not relative_url.startswith('catalogue/'):
+        relative_url = f'catalogue/{relative_url}'
+
+    return urljoin(base_url, relative_url)
+
+def parse_price(price_text):
+    try:
+        return float(price_text.replace('£', ''))
+    except Exception:
+        return 0.0
+
+def parse_rating(rating_classes):
+    """['star-rating', 'Three'] -> 3 (0 quando não há classe de nota)"""
+    rating = 0
+    for cls in rating_classes:
+        rating = RATINGS.get(cls, rating)
+    return rating
+
+def truncate_description(text):
+    return text[:500] + "..." if len(text) > 500 else text
+
+def safe_parse_book(parser, book_element, category_name):
+    """Um livro com HTML quebrado não derruba a página inteira"""
+    try:
+        return parser.parse_book_element(book_element, category_name)
+    except Exception as e:
+        logger.error(f"Erro ao extrair detalhes do livro: {e}")
+        return None
+
+def parse_page_of(text):
+    """'Page 2 of 50' -> (2, 50); None se o texto não tiver a contagem"""
+    match = _PAGE_OF.search(text or '')
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+def page_urls(page_url, current, total):
+    """URLs page-K.html das páginas depois da atual (mesmo diretório da categoria)"""
+    directory = page_url.rsplit('/', 1)[0]
+    return [f"{directory}/page-{page}.html" for page in range(current + 1, total + 1)]
+
+def content_hash(book_data):
+    """
+    Impressão digital estável do livro: sha1 dos campos da listagem normalizados + URL da página
+    Preço com 2 casas, nota inteira e espaços colapsados - o mesmo HTML sempre gera o mesmo hash
+    """
+    parts = []
+    for field in HASH_FIELDS:
+        value = book_data.get(field)
+        if field == 'price':
+            parts.append(f"{float(value or 0):.2f}")
+        elif field == 'rating':
+            parts.append(str(int(value or 0)))
+        else:
+            parts.append(' '.join(str(value or '').split()))
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+def build_book(title, price, availability, rating, category_name, image_url):
+    """Dicionário no formato do modelo Book (descrição vem da página do produto)"""
+    return {
+        'title': title,
+        'price': price,
+        'availability': availability,
+        'rating': rating,
+        'description': None,
+        'category': category_name,
+        'image_url': image_url
+    }
+
+
+# ---------------------------------------------------------------------------
+# Backend BeautifulSoup (html.parser) - comportamento original do scraper
+# ---------------------------------------------------------------------------
+
+class SoupParser:
+    name = 'html.parser'
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def parse_listing_page(self, content, page_url, category_name):
+        """
+        Retorna ([(url_do_livro, dados), ...], url_da_proxima_pagina, paginação)
+        paginação: (página atual, total) do li.current, lida do mesmo documento; None sem ela
+        """
+        soup = BeautifulSoup(content, 'html.parser')
+
+        books = []
+        for book_element in soup.select('article.product_pod'):
+            parsed = safe_parse_book(self, book_element, category_name)
+            if parsed:
+                books.append(parsed)
+
+        next_button = soup.select_one('li.next a')
+        next_url = urljoin(page_url, next_button['href']) if next_button else None
+
+        return books, next_url, self._pagination(soup)
+
+    def parse_pagination(self, content):
+        """(página atual, total de páginas) do li.current; None sem paginação"""
+        return self._pagination(BeautifulSoup(content, 'html.parser'))
+
+    @staticmethod
+    def _pagination(soup):
+        current = soup.select_one('li.current')
+        return parse_page_of(current.get_text()) if current else None
+
+    def parse_book_element(self, book_element, category_name):
+        """Extrai (url_do_livro, dados) de um article.product_pod"""
+        book_link = book_element.select_one('h3 a')
+        if not book_link:
+            return None
+
+        book_url = resolve_catalogue_url(self.base_url, book_link['href'])
+        title = book_link.get('title', '').strip()
+
+        price_element = book_element.select_one('.price_color')
+        price = parse_price(price_element.get_text(strip=True) if price_element else "£0.00")
+
+        availability = book_element.select_one('.instock.availability')
+        availability = availability.get_text(strip=True) if availability else "Out of stock"
+
+        rating_element = book_element.select_one('p.star-rating')
+        rating = parse_rating(rating_element.get('class', [])) if rating_element else 0
+
+        image_element = book_element.select_one('img')
+        image_url = ""
+        if image_element and image_element.get('src'):
+            image_url = resolve_catalogue_url(self.base_url, image_element['src'])
+
+        return book_url, build_book(title, price, availability, rating, category_name, image_url)
+
+    def parse_description(self, content):
+        soup = BeautifulSoup(content, 'html.parser')
+
+        description = soup.select_one('#product_description + p')
+        if description:
+            text = description.get_text(strip=True)
+            if text:
+                return truncate_description(text)
+
+        for p in soup.find_all('p'):
+            text = p.get_text(strip=True)
+            if text and len(text) > 50:
+                return truncate_description(text)
+
+        return DESCRICAO_PADRAO
+
+    def parse_categories(self, content):
+        soup = BeautifulSoup(content, 'html.parser')
+        return {
+            category.get_text(strip=True): urljoin(self.base_url, category['href'])
+            for category in soup.select('.side_categories ul li ul li a')
+        }
+
+
+# ---------------------------------------------------------------------------
+# Backend lxml - XPath pré-compilado, mesma saída do SoupParser
+# ---------------------------------------------------------------------------
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_BOOKS = etree.XPath(f"//article[{_has_class('product_pod')}]")
+_BOOK_LINK = etree.XPath(".//h3//a")
+_PRICE = etree.XPath(f".//*[{_has_class('price_color')}]")
+_AVAILABILITY = etree.XPath(f".//*[{_has_class('instock')} and {_has_class('availability')}]")
+_RATING = etree.XPath(f".//p[{_has_class('star-rating')}]")
+_IMAGE = etree.XPath(".//img")
+_NEXT_LINK = etree.XPath(f"//li[{_has_class('next')}]//a")
+_CURRENT_PAGE = etree.XPath(f"//li[{_has_class('current')}]")
+_DESCRIPTION = etree.XPath("//*[@id='product_description']/following-sibling::*[1][self::p]")
+_PARAGRAPHS = etree.XPath("//p")
+_CATEGORIES = etree.XPath(f"//*[{_has_class('side_categories')}]//ul//li//ul//li//a")
+
+# O site declara UTF-8; sem isso o libxml2 assume latin-1 em páginas sem meta charset
+_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+def _text(element):
+    """Equivalente ao get_text(strip=True) do BeautifulSoup"""
+    return ''.join(part.strip() for part in element.itertext())
+
+def _first(xpath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+
+class LxmlParser:
+    name = 'lxml'
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def _document(self, content):
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return lxml_html.document_fromstring(content, parser=_HTML_PARSER)
+
+    def parse_listing_page(self, content, page_url, category_name):
+        """Retorna ([(url_do_livro, dados), ...], url_da_proxima_pagina, paginação)"""
+        document = self._document(content)
+
+        books = []
+        for book_element in _BOOKS(document):
+            parsed = safe_parse_book(self, book_element, category_name)
+            if parsed:
+                books.append(parsed)
+
+        next_button = _first(_NEXT_LINK, document)
+        next_url = urljoin(page_url, next_button.get('href')) if next_button is not None else None
+
+        return books, next_url, self._pagination(document)
+
+    def parse_pagination(self, content):
+        return self._pagination(self._document(content))
+
+    @staticmethod
+    def _pagination(document):
+        current = _first(_CURRENT_PAGE, document)
+        return parse_page_of(_text(current)) if current is not None else None
+
+    def parse_book_element(self, book_element, category_name):
+        book_link = _first(_BOOK_LINK, book_element)
+        if book_link is None:
+            return None
+
+        book_url = resolve_catalogue_url(self.base_url, book_link.get('href'))
+        title = book_link.get('title', '').strip()
+
+        price_element = _first(_PRICE, book_element)
+        price = parse_price(_text(price_element) if price_element is not None else "£0.00")
+
+        availability = _first(_AVAILABILITY, book_element)
+        availability = _text(availability) if availability is not None else "Out of stock"
+
+        rating_element = _first(_RATING, book_element)
+        rating = parse_rating(rating_element.get('class', '').split()) if rating_element is not None else 0
+
+        image_element = _first(_IMAGE, book_element)
+        image_url = ""
+        if image_element is not None and image_element.get('src'):
+            image_url = resolve_catalogue_url(self.base_url, image_element.get('src'))
+
+        return book_url, build_book(title, price, availability, rating, category_name, image_url)
+
+    def parse_description(self, content):
+        document = self._document(content)
+
+        description = _first(_DESCRIPTION, document)
+        if description is not None:
+            text = _text(description)
+            if text:
+                return truncate_description(text)
+
+        for p in _PARAGRAPHS(document):
+            text = _text(p)
+            if text and len(text) > 50:
+                return truncate_description(text)
+
+        return DESCRICAO_PADRAO
+
+    def parse_categories(self, content):
+        document = self._document(content)
+        return {
+            _text(category): urljoin(self.base_url, category.get('href'))
+            for category in _CATEGORIES(document)
+        }
+
+
+PARSERS = {
+    SoupParser.name: SoupParser,
+    LxmlParser.name: LxmlParser,
+}
+
+@lru_cache(maxsize=None)
+def get_parser(name, base_url=BASE_URL):
+    """Backend de parsing ('html.parser' ou 'lxml') - sem estado, então é reaproveitado"""
+    try:
+        return PARSERS[name](base_url)
+    except KeyError:
+        raise ValueError(f"Parser desconhecido: {name} (opções: {', '.join(PARSERS)})")
+
+def extract_listing(content, page_url, category_name, base_url=BASE_URL, parser='lxml'):
+    """
+    API em lote: extrai todos os livros de um documento de listagem de uma vez
+    Retorna ([(url_do_livro, dados), ...], url_da_proxima_pagina)
+    """
+    books, next_url, _ = get_parser(parser, base_url).parse_listing_page(content, page_url, category_name)
+    return books, next_url
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Headers guardados junto do corpo (o corpo já vem descomprimido, então sem Content-Encoding)
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class FileCache:
+    """
+    Cache de respostas em disco, uma entrada por URL:
+    <diretório>/<sha256(url)>.json (metadados) + <sha256(url)>.body (corpo)
+
+    Qualquer objeto com get/set/touch pode substituir esta classe no CachingAdapter
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.body"
+
+    def get(self, url):
+        """Retorna a entrada (metadados + 'body') ou None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['body'] = f.read()
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def set(self, url, body, headers):
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'headers': {name: headers[name] for name in STORED_HEADERS if name in headers},
+            'stored_at': time.time()
+        }
+        # Escrita atômica: o crawl concorrente pode ler a mesma URL
+        self._write(body_path, body, 'wb')
+        self._write(meta_path, json.dumps(entry), 'w')
+
+    def touch(self, url, headers=None):
+        """Renova a entrada após um 304 (e atualiza validadores, se vierem)"""
+        entry = self.get(url)
+        if not entry:
+            return
+        body = entry.pop('body')
+        merged = dict(entry['headers'])
+        for name in ('ETag', 'Last-Modified'):
+            if headers and name in headers:
+                merged[name] = headers[name]
+        self.set(url, body, merged)
+
+    def _write(self, path, data, mode):
+        tmp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(tmp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class CachingAdapter(BaseAdapter):
+    """
+    Adapter do requests com cache HTTP persistente
+
+    - Dentro do TTL a resposta sai do disco, sem tocar a rede
+    - Depois do TTL revalida com If-None-Match / If-Modified-Since (304 = corpo do cache)
+    - offline=True: serve tudo que estiver em cache, independente da idade (só TTL, sem revalidar)
+    """
+
+    def __init__(self, cache, ttl=3600, offline=False, upstream=None):
+        super().__init__()
+        self.cache = cache
+        self.ttl = ttl
+        self.offline = offline
+        self.upstream = upstream or HTTPAdapter()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return self.upstream.send(request, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry:
+            age = time.time() - entry['stored_at']
+            if self.offline or age < self.ttl:
+                self.hits += 1
+                return self._build_response(request, entry)
+
+            # Requisição condicional
+            validators = entry['headers']
+            if 'ETag' in validators:
+                request.headers['If-None-Match'] = validators['ETag']
+            if 'Last-Modified' in validators:
+                request.headers['If-Modified-Since'] = validators['Last-Modified']
+
+        response = self.upstream.send(request, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.revalidated += 1
+            self.cache.touch(request.url, response.headers)
+            response.close()
+            return self._build_response(request, entry)
+
+        if response.status_code == 200:
+            self.misses += 1
+            try:
+                self.cache.set(request.url, response.content, response.headers)
+            except OSError as e:
+                logger.warning(f"Não foi possível gravar o cache de {request.url}: {e}")
+
+        return response
+
+    def _build_response(self, request, entry):
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['body']
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    def close(self):
+        self.upstream.close()
@@ -0,0 +1,125 @@
+import logging
+from sqlalchemy import case, or_, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.book import Book, db
+from app.services.catalogue import bump_generation
+from app.services.extraction import DESCRICAO_PADRAO, content_hash
+from app.services.stats import refresh_stats
+
+logger = logging.getLogger(__name__)
+
+# Colunas gravadas a partir do scraping (id e scraped_at ficam com o banco)
+BOOK_FIELDS = ('title', 'price', 'rating', 'availability', 'category', 'image_url', 'description', 'source_url',
+               'content_hash')
+NATURAL_KEY = ('title', 'category')
+# Atualizadas quando o hash ou a descrição mudam (a descrição só se vier uma de verdade)
+UPDATE_FIELDS = ('price', 'rating', 'availability', 'image_url', 'source_url', 'content_hash')
+
+INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+def _insert_statement():
+    dialect = db.session.get_bind().dialect.name
+    try:
+        return INSERTS[dialect](Book.__table__)
+    except KeyError:
+        raise RuntimeError(f"Upsert em lote não suportado para o banco '{dialect}'")
+
+def _upsert_statement(batch):
+    """INSERT ... ON CONFLICT (title, category) DO UPDATE só das colunas da listagem"""
+    statement = _insert_statement().values(batch)
+    excluded = statement.excluded
+    current = Book.__table__.c
+
+    set_ = {field: excluded[field] for field in UPDATE_FIELDS}
+    # Crawl só de listagem (None) ou página de produto que falhou não apagam a descrição gravada
+    set_['description'] = case(
+        (or_(excluded.description.is_(None), excluded.description == DESCRICAO_PADRAO), current.description),
+        else_=excluded.description
+    )
+    set_['scraped_at'] = db.func.now()
+    return statement.on_conflict_do_update(index_elements=NATURAL_KEY, set_=set_)
+
+def _missing_description(description):
+    return description is None or description == DESCRICAO_PADRAO
+
+def _normalise_description(description):
+    """Espaços colapsados, como no content_hash; None se não há descrição de verdade"""
+    return None if _missing_description(description) else ' '.join(description.split())
+
+def _stored_hashes(batch):
+    """
+    {(título, categoria): (content_hash, descrição normalizada)} dos livros do lote que já estão no banco
+    A descrição fica fora do hash (vem da página do produto): é comparada à parte
+    """
+    keys = [(row['title'], row['category']) for row in batch]
+    stored = db.session.query(Book.title, Book.category, Book.content_hash, Book.description).filter(
+        tuple_(Book.title, Book.category).in_(keys)
+    )
+    return {
+        (title, category): (stored_hash, _normalise_description(description))
+        for title, category, stored_hash, description in stored
+    }
+
+def bulk_upsert_books(books_data, batch_size=500, commit=True, percentiles=True):
+    """
+    Recrawl incremental: compara o content_hash de cada livro com o gravado
+    - novo: INSERT
+    - hash diferente (ou livro antigo sem hash): UPDATE no lugar
+    - hash igual, mas chegou uma descrição diferente da gravada (ou a que faltava): UPDATE
+    - hash igual: nada é escrito
+    Geração do catálogo e estatísticas só mudam quando algo foi escrito
+    percentiles=False não recalcula os percentis gerais (ver refresh_stats)
+
+    Retorna (novos, atualizados, inalterados) - contados sobre o lote sem duplicados,
+    então batem com as linhas do banco
+    """
+    # Remove duplicados dentro do próprio lote (mantém o primeiro)
+    rows = {}
+    for book_data in books_data:
+        key = (book_data['title'], book_data['category'])
+        if key not in rows:
+            rows[key] = {field: book_data.get(field) for field in BOOK_FIELDS}
+            rows[key]['content_hash'] = rows[key]['content_hash'] or content_hash(rows[key])
+    rows = list(rows.values())
+
+    added = updated = 0
+    changed_categories = set()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        stored = _stored_hashes(batch)
+
+        changed = []
+        for row in batch:
+            key = (row['title'], row['category'])
+            if key not in stored:
+                added += 1
+            else:
+                stored_hash, stored_description = stored[key]
+                # None/padrão na entrada nunca sobrescreve a descrição gravada
+                description = _normalise_description(row['description'])
+                new_description = description is not None and description != stored_description
+                if stored_hash == row['content_hash'] and not new_description:
+                    continue
+                updated += 1
+            changed.append(row)
+            changed_categories.add(row['category'])
+
+        if changed:
+            db.session.execute(_upsert_statement(changed))
+
+    if changed_categories:
+        bump_generation()
+        # Recalcula só as categorias que mudaram, na mesma transação dos livros
+        refresh_stats(changed_categories, percentiles=percentiles)
+
+    if commit:
+        db.session.commit()
+
+    unchanged = len(rows) - added - updated
+    duplicates = len(books_data) - len(rows)
+    logger.info(f"Ingestão em lote: +{added} novos, ~{updated} atualizados, {unchanged} inalterados"
+                + (f", {duplicates} duplicados ignorados" if duplicates else ""))
+    return added, updated, unchanged
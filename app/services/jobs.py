@@ -0,0 +1,152 @@
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from app.models.book import db
+from app.models.scraping_job import ScrapingJob, QUEUED, RUNNING, FINISHED, FAILED
+from app.services.pipeline import crawl_catalogue
+from app.services.locks import exclusive_lock, crawl_heartbeat, CRAWL_LOCK, CRAWL_LOCK_TTL
+
+logger = logging.getLogger(__name__)
+
+# Job "running" sem progresso há mais que isso é de um processo que morreu
+STALE_AFTER = timedelta(minutes=15)
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def active_job():
+    """
+    Job na fila ou rodando (ignora os abandonados por um processo que caiu)
+    Na fila conta desde a criação; rodando, desde o último progresso
+    """
+    jobs = ScrapingJob.query.filter(ScrapingJob.status.in_((QUEUED, RUNNING))).order_by(ScrapingJob.id).all()
+    found = None
+    for job in jobs:
+        last_seen = job.created_at if job.status == QUEUED else job.updated_at or job.created_at
+        if last_seen is None or _now() - last_seen < STALE_AFTER:
+            found = job
+            break
+        job.error = ('Nunca iniciado (processo reiniciado antes de pegar o job?)' if job.status == QUEUED
+                     else 'Interrompido (sem progresso - processo reiniciado?)')
+        job.status = FAILED
+        job.finished_at = _now()
+    db.session.commit()
+    return found
+
+def create_job(triggered_by, params):
+    job = ScrapingJob(triggered_by=triggered_by, params=params, status=QUEUED)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def _default_scraper():
+    from app.services.scraper import BookScraper
+    return BookScraper(detail_workers=4)
+
+class JobRunner:
+    """
+    Fila local de crawls: uma thread por processo executa os jobs em ordem
+    O estado fica na tabela scraping_jobs, então qualquer worker do gunicorn responde o status
+    """
+
+    def __init__(self, app, scraper_factory=_default_scraper):
+        self.app = app
+        self.scraper_factory = scraper_factory
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name='scraping-jobs', daemon=True)
+                self._thread.start()
+        self.queue.put(job_id)
+
+    def _work(self):
+        while True:
+            job_id = self.queue.get()
+            with self.app.app_context():
+                try:
+                    self.run(job_id)
+                except Exception as e:
+                    logger.error(f"Job {job_id} falhou fora do crawl: {e}")
+                    self._mark_failed(job_id, e)
+                finally:
+                    db.session.remove()
+            self.queue.task_done()
+
+    def _mark_failed(self, job_id, error):
+        """Job que nem chegou ao crawl não pode ficar 'queued' para sempre"""
+        try:
+            db.session.rollback()
+            job = db.session.get(ScrapingJob, job_id)
+            if job is not None and job.status in (QUEUED, RUNNING):
+                job.status = FAILED
+                job.error = str(error)
+                job.finished_at = job.updated_at = _now()
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Não foi possível marcar o job {job_id} como falho: {e}")
+
+    def run(self, job_id):
+        """Executa o job (na thread da fila; nos testes, direto)"""
+        job = db.session.get(ScrapingJob, job_id)
+        if job is None or job.status != QUEUED:
+            return
+
+        job.status = RUNNING
+        job.started_at = job.updated_at = _now()
+        db.session.commit()
+        logger.info(f"🚀 Job {job_id} iniciado ({job.params})")
+
+        heartbeat = None
+
+        def progress(stats):
+            job.categories_total = stats['categories_pending']
+            job.categories_done = stats['categories_done']
+            job.categories_failed = stats['categories_failed']
+            job.pages_done = stats['pages_done']
+            job.books_added = stats['books_added']
+            job.books_updated = stats['books_updated']
+            job.books_existing = stats['books_existing']
+            job.updated_at = _now()
+            db.session.commit()
+            if heartbeat:
+                heartbeat(stats)
+
+        scraper = None
+        try:
+            scraper = self.scraper_factory()
+            # Lock entre instâncias: warm-up e scrape-books não rodam junto com o job
+            with exclusive_lock(CRAWL_LOCK, CRAWL_LOCK_TTL) as owner:
+                heartbeat = crawl_heartbeat(owner)
+                stats = crawl_catalogue(
+                    scraper,
+                    max_minutes=job.params.get('max_minutes'),
+                    target_books=job.params.get('target_books'),
+                    reset=job.params.get('reset', False),
+                    progress=progress
+                )
+                heartbeat = None
+            progress(stats)
+            job.status = FINISHED
+            job.stopped_by = stats['stopped_by']
+            logger.info(f"✅ Job {job_id} concluído: +{stats['books_added']} livros")
+        except Exception as e:
+            db.session.rollback()
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"Job {job_id} falhou: {e}")
+        finally:
+            if scraper is not None and hasattr(scraper, 'close'):
+                scraper.close()
+            job.finished_at = job.updated_at = _now()
+            db.session.commit()
+
+def get_job_runner(app):
+    runner = app.extensions.get('scraping_jobs')
+    if runner is None:
+        runner = app.extensions['scraping_jobs'] = JobRunner(app)
+    return runner
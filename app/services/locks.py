@@ -0,0 +1,77 @@
+import os
+import uuid
+import socket
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from app.models.book import db
+from app.models.app_lock import AppLock
+
+logger = logging.getLogger(__name__)
+
+# Só um crawl por vez em todas as instâncias (warm-up, jobs da API e scrape-books)
+CRAWL_LOCK = 'crawl'
+# Renovado a cada página; se o processo morrer o lock expira nesse tempo
+CRAWL_LOCK_TTL = timedelta(minutes=30)
+# Backfill de descrições: roda à parte do crawl, um por vez
+DESCRIPTIONS_LOCK = 'descriptions'
+
+class LockBusy(RuntimeError):
+    """Outro processo detém o lock"""
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def acquire_lock(name, ttl):
+    """
+    Tenta pegar o lock por ttl (timedelta); retorna o owner ou None se ocupado
+    Um lock expirado (dono morreu sem liberar) é assumido
+    """
+    now = _now()
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    db.session.query(AppLock).filter(AppLock.name == name, AppLock.expires_at < now).delete()
+    try:
+        db.session.execute(insert(AppLock).values(name=name, owner=owner, acquired_at=now, expires_at=now + ttl))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return owner
+
+def extend_lock(name, owner, ttl):
+    """Renova o lease (heartbeat de processos longos)"""
+    updated = db.session.query(AppLock).filter_by(name=name, owner=owner).update(
+        {AppLock.expires_at: _now() + ttl}
+    )
+    db.session.commit()
+    return bool(updated)
+
+def release_lock(name, owner):
+    db.session.query(AppLock).filter_by(name=name, owner=owner).delete()
+    db.session.commit()
+
+@contextmanager
+def exclusive_lock(name, ttl):
+    """with exclusive_lock(CRAWL_LOCK, timedelta(...)) as owner: ... (LockBusy se ocupado)"""
+    owner = acquire_lock(name, ttl)
+    if owner is None:
+        holder = db.session.get(AppLock, name)
+        raise LockBusy(f"Lock '{name}' em uso por {holder.owner if holder else 'outro processo'}")
+    logger.info(f"🔒 Lock '{name}' adquirido ({owner})")
+    try:
+        yield owner
+    finally:
+        db.session.rollback()
+        release_lock(name, owner)
+        logger.info(f"🔓 Lock '{name}' liberado")
+
+def lock_heartbeat(name, owner, ttl=CRAWL_LOCK_TTL):
+    """Callback de progresso que renova o lock a cada chamada"""
+    return lambda stats: extend_lock(name, owner, ttl)
+
+def crawl_heartbeat(owner):
+    """Callback de progresso do crawl_catalogue que renova o lock do crawl"""
+    return lock_heartbeat(CRAWL_LOCK, owner)
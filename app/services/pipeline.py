@@ -0,0 +1,162 @@
+import time
+import logging
+from app.models.book import Book, db
+from app.services.crawl_state import CrawlStateStore
+from app.services.ingest import bulk_upsert_books
+from app.services.dead_letters import save_dead_letters
+from app.services.resilience import CircuitOpen
+from app.services.stats import refresh_overview
+
+logger = logging.getLogger(__name__)
+
+def crawl_catalogue(scraper, categories=None, store=None, max_minutes=None, target_books=None, reset=False,
+                    progress=None):
+    """
+    Crawl com checkpoint por página: retoma exatamente de onde um run anterior parou
+
+    - categories: {nome: url}; default = todas as categorias do site
+    - max_minutes / target_books: interrompem o run entre páginas (o resto fica pendente)
+    - reset: ignora o estado salvo e começa um ciclo novo
+      (um ciclo concluído também recomeça sozinho no próximo run)
+    - progress: chamado com as estatísticas parciais após cada página e categoria
+    - URLs que falharam mesmo com novas tentativas vão para failed_fetches;
+      se o circuit breaker desistir do host o run termina (stopped_by='circuit_open')
+
+    Retorna as estatísticas do run
+    """
+    store = store or CrawlStateStore()
+    start_time = time.time()
+
+    if categories is None:
+        categories = scraper.get_categories()
+
+    if reset or store.is_cycle_complete():
+        store.reset()
+
+    store.seed_categories(categories)
+    db.session.commit()
+
+    pending = {
+        name: url for name, url in store.pending_categories().items()
+        if name in categories
+    }
+    logger.info(f"📂 Categorias pendentes: {len(pending)}/{len(categories)}")
+
+    stats = {
+        'categories_pending': len(pending),
+        'categories_done': 0,
+        'categories_failed': 0,
+        'pages_done': 0,
+        'books_added': 0,
+        'books_updated': 0,
+        'books_existing': 0,
+        'dead_letters': 0,
+        'stopped_by': None
+    }
+
+    def report():
+        if progress is not None:
+            progress(dict(stats))
+
+    # Cada página atualiza as estatísticas da categoria; os percentis gerais
+    # (leitura da coluna price inteira) só ao fim da categoria ou do run
+    stale_overview = False
+
+    def flush_overview():
+        nonlocal stale_overview
+        if stale_overview:
+            refresh_overview()
+            stale_overview = False
+
+    report()
+
+    def should_stop():
+        if max_minutes is not None and (time.time() - start_time) / 60 >= max_minutes:
+            return 'time_limit'
+        if target_books is not None and Book.query.count() >= target_books:
+            return 'target_reached'
+        return None
+
+    for category_name, category_url in pending.items():
+        page_url = store.resume_point(category_name, category_url)
+        if page_url != category_url:
+            logger.info(f"⏩ {category_name}: retomando em {page_url}")
+
+        pages = _iter_pages(scraper, page_url, category_name)
+        try:
+            store.start_category(category_url)
+
+            while page_url:
+                stats['stopped_by'] = should_stop()
+                if stats['stopped_by']:
+                    flush_overview()
+                    db.session.commit()
+                    logger.info(f"⏹️  Crawl interrompido ({stats['stopped_by']}) - próximo run continua de {page_url}")
+                    return stats
+
+                # As páginas seguintes já podem estar sendo baixadas em paralelo; a gravação segue a ordem
+                page_url, books_data, next_url = next(pages)
+                store.start_page(page_url, category_name)
+                added, updated, unchanged = bulk_upsert_books(books_data, commit=False, percentiles=False)
+                stale_overview = stale_overview or bool(added or updated)
+
+                # Livros + checkpoint + falhas da página na mesma transação
+                store.finish_page(page_url, category_name, next_url)
+                stats['dead_letters'] += save_dead_letters(_drain_failures(scraper))
+                db.session.commit()
+
+                stats['pages_done'] += 1
+                stats['books_added'] += added
+                stats['books_updated'] += updated
+                stats['books_existing'] += unchanged
+                page_url = next_url
+                report()
+
+            store.finish_category(category_url)
+            flush_overview()
+            db.session.commit()
+            stats['categories_done'] += 1
+            logger.info(f"✅ {category_name}: concluída")
+            report()
+
+        except CircuitOpen as e:
+            db.session.rollback()
+            _drain_failures(scraper)  # a página volta inteira no próximo run
+            stats['stopped_by'] = 'circuit_open'
+            flush_overview()
+            db.session.commit()
+            logger.error(f"⏹️  Crawl interrompido: {e} - {category_name} fica pendente para o próximo run")
+            report()
+            return stats
+
+        except Exception as e:
+            db.session.rollback()
+            _drain_failures(scraper)
+            stats['categories_failed'] += 1
+            logger.error(f"Erro na categoria {category_name}: {e} - fica pendente para o próximo run")
+            report()
+
+        finally:
+            pages.close()
+
+    # Categorias que falharam no meio ainda deixaram páginas gravadas
+    flush_overview()
+    db.session.commit()
+    return stats
+
+def _iter_pages(scraper, page_url, category_name):
+    """(url, livros, próxima) de cada página a partir de page_url - em paralelo se o scraper suportar"""
+    iter_category_pages = getattr(scraper, 'iter_category_pages', None)
+    if iter_category_pages is not None:
+        yield from iter_category_pages(page_url, category_name)
+        return
+
+    while page_url:
+        books_data, next_url = scraper.scrape_listing_page(page_url, category_name)
+        yield page_url, books_data, next_url
+        page_url = next_url
+
+def _drain_failures(scraper):
+    """Falhas acumuladas pelo scraper desde a última página gravada"""
+    dead_letters = getattr(scraper, 'dead_letters', None)
+    return dead_letters.drain() if dead_letters is not None else []
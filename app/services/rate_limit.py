@@ -0,0 +1,119 @@
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+class _Bucket:
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket por host com taxa adaptativa (AIMD)
+
+    - cada requisição consome um token; os tokens voltam a `rate` por segundo
+    - resposta rápida (< target_latency): taxa sobe `increase` req/s, até max_rate
+    - resposta lenta (> slow_latency), 429, 5xx ou erro de rede: taxa cai pela metade, até min_rate
+    - 429 com Retry-After: o host fica pausado pelo tempo pedido
+
+    Thread-safe: o mesmo limiter é compartilhado pelo pool de detalhes e pelo crawl assíncrono
+    """
+
+    def __init__(self, rate=2.0, min_rate=0.2, max_rate=10.0, burst=2.0, target_latency=0.5,
+                 slow_latency=2.0, increase=0.25, decrease=0.5, clock=time.monotonic, sleep=time.sleep):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.target_latency = target_latency
+        self.slow_latency = slow_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host, now):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.initial_rate, self.burst, now)
+        return bucket
+
+    def rate(self, url):
+        """Taxa atual (req/s) do host da URL"""
+        host = urlparse(url).netloc
+        with self._lock:
+            return self._bucket(host, self.clock()).rate
+
+    def acquire(self, url):
+        """Reserva um token e espera até ele estar disponível; retorna o tempo esperado"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(host, now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            # Saldo negativo = fila: cada thread espera a sua vez
+            bucket.tokens -= 1
+            wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def record(self, url, latency, status_code=None, retry_after=None):
+        """Ajusta a taxa do host conforme a resposta (status_code None = erro de rede)"""
+        host = urlparse(url).netloc
+        throttled = status_code is None or status_code == 429 or status_code >= 500
+
+        with self._lock:
+            bucket = self._bucket(host, self.clock())
+            previous = bucket.rate
+
+            if throttled or latency > self.slow_latency:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            elif latency < self.target_latency:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+            if retry_after:
+                bucket.tokens = min(bucket.tokens, -retry_after * bucket.rate)
+
+        if bucket.rate < previous:
+            logger.warning(f"🐢 {host}: taxa reduzida {previous:.2f} -> {bucket.rate:.2f} req/s "
+                           f"(status {status_code}, {latency:.2f}s)")
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+class RateLimitedAdapter(BaseAdapter):
+    """Adapter do requests que passa cada requisição de rede pelo limiter (abaixo do cache HTTP)"""
+
+    def __init__(self, limiter, upstream=None):
+        super().__init__()
+        self.limiter = limiter
+        self.upstream = upstream or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire(request.url)
+        start = time.monotonic()
+        try:
+            response = self.upstream.send(request, **kwargs)
+        except Exception:
+            self.limiter.record(request.url, time.monotonic() - start)
+            raise
+
+        retry_after = _retry_after(response) if response.status_code == 429 else None
+        self.limiter.record(request.url, time.monotonic() - start, response.status_code, retry_after)
+        return response
+
+    def close(self):
+        self.upstream.close()
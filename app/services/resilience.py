@@ -0,0 +1,162 @@
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Status que valem nova tentativa (o resto dos 4xx é definitivo)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+class CircuitOpen(Exception):
+    """O host falhou seguidamente e as pausas se esgotaram - o crawl deve parar"""
+
+def is_retryable(error):
+    """Timeout, erro de conexão, 429 e 5xx são transitórios"""
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUS
+    return False
+
+class _Circuit:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.opens = 0
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host
+
+    - failure_threshold falhas transitórias seguidas abrem o circuito
+    - aberto: quem for ao host espera cooldown segundos (o crawl pausa) e tenta de novo
+    - uma resposta boa fecha o circuito; depois de max_pauses pausas seguidas sem
+      sucesso as chamadas levantam CircuitOpen e o run termina (o checkpoint continua depois)
+    """
+
+    def __init__(self, failure_threshold=10, cooldown=30.0, max_pauses=3, clock=time.monotonic, sleep=time.sleep):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_pauses = max_pauses
+        self.clock = clock
+        self.sleep = sleep
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, url):
+        host = urlparse(url).netloc
+        return host, self._circuits.setdefault(host, _Circuit())
+
+    def is_open(self, url):
+        with self._lock:
+            _, circuit = self._circuit(url)
+            return circuit.opened_at is not None
+
+    def before_request(self, url):
+        """Espera o fim da pausa se o circuito estiver aberto; retorna o tempo esperado"""
+        with self._lock:
+            host, circuit = self._circuit(url)
+            if circuit.opened_at is None:
+                return 0.0
+            if circuit.opens > self.max_pauses:
+                raise CircuitOpen(f"{host}: {circuit.failures} falhas seguidas, {self.max_pauses} pausas sem sucesso")
+            wait = circuit.opened_at + self.cooldown - self.clock()
+
+        if wait > 0:
+            self.sleep(wait)
+        return max(wait, 0.0)
+
+    def record_success(self, url):
+        with self._lock:
+            host, circuit = self._circuit(url)
+            reopened = circuit.opened_at is not None
+            circuit.failures = 0
+            circuit.opened_at = None
+            circuit.opens = 0
+        if reopened:
+            logger.info(f"🟢 {host}: circuito fechado")
+
+    def record_failure(self, url):
+        with self._lock:
+            host, circuit = self._circuit(url)
+            circuit.failures += 1
+            now = self.clock()
+            # Fechado, ou meia-aberto (pausa acabou) e a tentativa falhou: abre de novo
+            if circuit.failures >= self.failure_threshold and (
+                    circuit.opened_at is None or now - circuit.opened_at >= self.cooldown):
+                circuit.opened_at = now
+                circuit.opens += 1
+                opens = circuit.opens
+            else:
+                return
+        logger.warning(f"🔴 {host}: circuito aberto ({opens}/{self.max_pauses}) - pausa de {self.cooldown:.0f}s")
+
+class RetryPolicy:
+    """Novas tentativas com backoff exponencial e jitter (só para erros transitórios)"""
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30.0, sleep=time.sleep, jitter=random.random):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """backoff * 2^tentativa, limitado a max_backoff, com jitter de até 50% para baixo"""
+        base = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return base * (0.5 + self.jitter() / 2)
+
+    def call(self, func, url, breaker=None):
+        for attempt in range(self.retries + 1):
+            if breaker is not None:
+                breaker.before_request(url)
+            try:
+                result = func()
+            except Exception as e:
+                retryable = is_retryable(e)
+                if breaker is not None and retryable:
+                    breaker.record_failure(url)
+                if not retryable or attempt == self.retries:
+                    raise
+                delay = self.delay(attempt)
+                logger.warning(f"🔁 {url}: {e} - tentativa {attempt + 2}/{self.retries + 1} em {delay:.1f}s")
+                self.sleep(delay)
+            else:
+                if breaker is not None:
+                    breaker.record_success(url)
+                return result
+
+class DeadLetterQueue:
+    """
+    URLs que falharam mesmo depois das tentativas, para uma passada posterior
+    Em memória e thread-safe; o pipeline persiste o conteúdo (tabela failed_fetches)
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def add(self, url, kind, category=None, title=None, error=None):
+        entry = {
+            'url': url,
+            'kind': kind,
+            'category': category,
+            'title': title,
+            'error': str(error)[:500] if error is not None else None,
+            'failed_at': datetime.now(timezone.utc).replace(tzinfo=None)
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def drain(self):
+        """Retorna e esvazia as entradas acumuladas"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        return entries
+
+    def __len__(self):
+        return len(self._entries)
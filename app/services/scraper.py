@@ -1,16 +1,81 @@
+import os
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-import time
+from requests.adapters import HTTPAdapter
 import logging
-from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from app.services.http_cache import CachingAdapter, FileCache
+from app.services.rate_limit import AdaptiveRateLimiter, RateLimitedAdapter
+from app.services.resilience import CircuitBreaker, CircuitOpen, DeadLetterQueue, RetryPolicy
+from app.services.extraction import BASE_URL, DESCRICAO_PADRAO, content_hash, get_parser, page_urls
+
+# 'full': listagem + página de cada livro (descrição); 'listing': só as páginas de listagem
+FIELD_MODES = ('full', 'listing')
 
 class BookScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, max_concurrency=10, per_host_limit=5, detail_workers=1, page_workers=4,
+                 http_cache=None, cache_ttl=None, offline=None, parser='lxml', rate_limiter=None,
+                 retry_policy=None, breaker=None, timeout=None, fields='full'):
         """
         Inicializa o scraper com configurações básicas
+        max_concurrency / per_host_limit valem para o crawl assíncrono (crawl_async)
+        detail_workers > 1 busca as páginas de produto em paralelo (pool compartilhado)
+        page_workers > 1 busca de uma vez as páginas de listagem de cada categoria ("Page 1 of N")
+        http_cache: backend de cache HTTP (ex: FileCache); sem ele usa SCRAPER_CACHE_DIR se definido
+        parser: backend de extração - 'lxml' (XPath, default) ou 'html.parser' (BeautifulSoup)
+        rate_limiter: AdaptiveRateLimiter; default lê SCRAPER_RATE / SCRAPER_MIN_RATE / SCRAPER_MAX_RATE
+        retry_policy / breaker: novas tentativas com backoff e circuit breaker por host (default: SCRAPER_RETRIES)
+        timeout: (conexão, leitura) em segundos de cada requisição; default (5, SCRAPER_TIMEOUT)
+        fields: 'listing' não abre a página de cada livro - description fica None (backfill depois)
         """
-        self.base_url = "http://books.toscrape.com/"
+        if fields not in FIELD_MODES:
+            raise ValueError(f"fields deve ser um de {FIELD_MODES}")
+        self.fields = fields
+        self.base_url = BASE_URL
+        self.parser = get_parser(parser, self.base_url)
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+
+        # RESILIÊNCIA - falhas transitórias são repetidas; as definitivas vão para dead_letters
+        self.retry_policy = retry_policy or RetryPolicy(retries=int(os.environ.get('SCRAPER_RETRIES', 3)))
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = timeout or (5, float(os.environ.get('SCRAPER_TIMEOUT', 15)))
+        self.dead_letters = DeadLetterQueue()
+
+        # Pool compartilhado entre categorias para as páginas de detalhe
+        self.detail_workers = detail_workers
+        self.detail_pool = ThreadPoolExecutor(max_workers=detail_workers) if detail_workers > 1 else None
+        # Pool separado para as listagens: cada página usa o detail_pool para as descrições
+        self.page_pool = ThreadPoolExecutor(max_workers=page_workers) if page_workers > 1 else None
+
         self.session = requests.Session()
+        # Pool de conexões do tamanho da concorrência máxima (default do requests é 10)
+        pool_size = max(max_concurrency, detail_workers + page_workers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+        # RATE LIMIT adaptativo por host - só requisições que vão à rede (abaixo do cache)
+        if rate_limiter is None:
+            rate_limiter = AdaptiveRateLimiter(
+                rate=float(os.environ.get('SCRAPER_RATE', 2)),
+                min_rate=float(os.environ.get('SCRAPER_MIN_RATE', 0.2)),
+                max_rate=float(os.environ.get('SCRAPER_MAX_RATE', 10))
+            )
+        self.rate_limiter = rate_limiter
+        adapter = RateLimitedAdapter(rate_limiter, upstream=adapter)
+        
+        # CACHE HTTP em disco (opcional) - revalida com ETag/Last-Modified
+        if http_cache is None and os.environ.get('SCRAPER_CACHE_DIR'):
+            http_cache = FileCache(os.environ['SCRAPER_CACHE_DIR'])
+        if http_cache is not None:
+            if cache_ttl is None:
+                cache_ttl = int(os.environ.get('SCRAPER_CACHE_TTL', 3600))
+            if offline is None:
+                offline = os.environ.get('SCRAPER_CACHE_OFFLINE', '').lower() in ('1', 'true')
+            adapter = CachingAdapter(http_cache, ttl=cache_ttl, offline=offline, upstream=adapter)
+        
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
         # HEADERS necessário para evitar bloqueio
         self.headers = {
@@ -32,164 +97,298 @@ class BookScraper:
         
         self.logger.info(" >>> BookScraper inicializado com sucesso")
 
-    def get_book_description(self, url):
+    def close(self):
+        """Libera os pools de threads e as conexões"""
+        if self.page_pool:
+            self.page_pool.shutdown(wait=True, cancel_futures=True)
+            self.page_pool = None
+        if self.detail_pool:
+            self.detail_pool.shutdown(wait=True)
+            self.detail_pool = None
+        self.session.close()
+
+    def fetch(self, url, timeout=None):
+        """
+        GET de uma URL com os headers do scraper - ponto único de acesso à rede
+        Timeout, 429 e 5xx são repetidos com backoff; levanta a última falha (ou CircuitOpen)
+        """
+        def get():
+            response = self.session.get(url, headers=self.headers, timeout=timeout or self.timeout)
+            response.raise_for_status()
+            return response
+
+        return self.retry_policy.call(get, url, self.breaker)
+
+    def get_book_description(self, url, title=None, category=None):
         """
         Obtém a descrição do livro (limitando a 500 caracteres)
+        Se a página falhar, a URL vai para dead_letters e a descrição fica a padrão
         """
         try:
-            response = self.session.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            description = soup.select_one('#product_description + p')
-            if description:
-                text = description.get_text(strip=True)
-                if text and text != "":
-                    return text[:500] + "..." if len(text) > 500 else text
-            
-            all_paragraphs = soup.find_all('p')
-            for p in all_paragraphs:
-                text = p.get_text(strip=True)
-                if text and len(text) > 50:
-                    return text[:500] + "..." if len(text) > 500 else text
-            
-            return "Descrição não disponível"
-            
+            response = self.fetch(url)
+            return self.parser.parse_description(response.content)
+
+        except CircuitOpen:
+            raise
         except Exception as e:
             self.logger.error(f"Erro ao obter descrição de {url}: {e}")
-            return "Descrição não disponível"
+            self.dead_letters.add(url, 'description', category=category, title=title, error=e)
+            return DESCRICAO_PADRAO
 
     def get_categories(self):
-        """Obtém todas as categorias de livros"""
-        try:
-            response = self.session.get(self.base_url, headers=self.headers)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            categories = {}
-            sidebar = soup.select('.side_categories ul li ul li a')
-            
-            for category in sidebar:
-                category_name = category.get_text(strip=True)
-                category_url = urljoin(self.base_url, category['href'])
-                categories[category_name] = category_url
-                
-            self.logger.info(f"Encontradas {len(categories)} categorias")
-            return categories
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao obter categorias: {e}")
-            return {}
+        """Obtém todas as categorias de livros (levanta a falha - sem categorias não há crawl)"""
+        response = self.fetch(self.base_url)
+        categories = self.parser.parse_categories(response.content)
+
+        self.logger.info(f"Encontradas {len(categories)} categorias")
+        return categories
 
     def scrape_single_category(self, category_name, category_url):
         """
         NOVO MÉTODO: Faz scraping de UMA categoria específica
         Retorna lista de livros apenas desta categoria
+        Uma página que falha vai para dead_letters: a passada posterior continua dela
         """
         books_data = []
+        self.logger.info(f"Scraping categoria: {category_name}")
+        page_url = category_url
         try:
-            self.logger.info(f"Scraping categoria: {category_name}")
-            page_url = category_url
-            
-            while page_url:
-                self.logger.info(f"Scraping página: {page_url}")
-                response = self.session.get(page_url, headers=self.headers)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Encontra todos os livros na página
-                books = soup.select('article.product_pod')
-                
-                for book in books:
-                    book_data = self.scrape_book_details(book, category_name)
-                    if book_data:
-                        books_data.append(book_data)
-                
-                # Verifica se há próxima página
-                next_button = soup.select_one('li.next a')
-                if next_button:
-                    page_url = urljoin(page_url, next_button['href'])
-                else:
-                    page_url = None
-                
-                time.sleep(1)  # Rate limiting
-                    
+            for _, page_books, next_url in self.iter_category_pages(category_url, category_name):
+                books_data.extend(page_books)
+                page_url = next_url
+
+        except CircuitOpen:
+            raise
         except Exception as e:
             self.logger.error(f"Erro ao fazer scraping da categoria {category_name}: {e}")
+            self.dead_letters.add(page_url, 'page', category=category_name, error=e)
         
         self.logger.info(f"✅ {category_name}: {len(books_data)} livros coletados")
         return books_data
 
+    def iter_category_pages(self, start_url, category_name):
+        """
+        Páginas da categoria a partir de start_url, em ordem: (url, livros, url_da_proxima)
+
+        Lê "Page K of N" da primeira página e manda todas as page-K.html restantes
+        ao page_pool de uma vez; sem a contagem (ou sem pool) segue o link next
+        Uma página que falha levanta a exceção ao chegar a vez dela
+        """
+        page_books, next_url, pagination = self._scrape_listing(start_url, category_name)
+        remaining = self._remaining_pages(pagination, start_url, next_url) if self.page_pool else []
+        futures = [self.page_pool.submit(self._scrape_listing, url, category_name) for url in remaining]
+        if futures:
+            self.logger.info(f"⚡ {category_name}: {len(remaining)} páginas em paralelo")
+
+        try:
+            yield start_url, page_books, next_url
+            for position, (page_url, future) in enumerate(zip(remaining, futures), start=1):
+                page_books, next_url, _ = future.result()
+                if position < len(remaining):
+                    next_url = remaining[position]
+                yield page_url, page_books, next_url
+        finally:
+            for future in futures:
+                future.cancel()
+
+        # Sem contagem, ou o site tem mais páginas que o anunciado: link next
+        page_url = next_url
+        while page_url:
+            page_books, next_url = self.scrape_listing_page(page_url, category_name)
+            yield page_url, page_books, next_url
+            page_url = next_url
+
+    def _remaining_pages(self, pagination, page_url, next_url):
+        """URLs das páginas seguintes pela contagem do li.current ([] = seguir o link next)"""
+        if not next_url or not pagination:
+            return []
+        urls = page_urls(page_url, *pagination)
+        # Só confia no padrão page-K.html se ele bate com o link next da própria página
+        return urls if urls and urls[0] == next_url else []
+
+    def scrape_listing_page(self, page_url, category_name):
+        """
+        Faz scraping de UMA página de listagem (com as descrições, exceto no modo 'listing')
+        Retorna (livros, url_da_proxima_pagina) - None na última página
+        """
+        page_books, next_url, _ = self._scrape_listing(page_url, category_name)
+        return page_books, next_url
+
+    def _scrape_listing(self, page_url, category_name):
+        """scrape_listing_page + a paginação (página atual, total) lida do mesmo documento"""
+        self.logger.info(f"Scraping página: {page_url}")
+        response = self.fetch(page_url)
+        
+        # Primeiro a listagem, depois as descrições (em paralelo se houver pool)
+        parsed_books, next_url, pagination = self.parser.parse_listing_page(response.content, page_url, category_name)
+        parsed_books = self._with_fingerprint(parsed_books)
+        if self.fields == 'listing':
+            return [book_data for _, book_data in parsed_books], next_url, pagination
+
+        book_urls = [book_url for book_url, _ in parsed_books]
+        titles = [book_data['title'] for _, book_data in parsed_books]
+        categories = [category_name] * len(parsed_books)
+        
+        if self.detail_pool:
+            # map devolve na mesma ordem da listagem
+            descriptions = self.detail_pool.map(self.get_book_description, book_urls, titles, categories)
+        else:
+            descriptions = map(self.get_book_description, book_urls, titles, categories)
+        
+        books_data = []
+        for (_, book_data), description in zip(parsed_books, descriptions):
+            book_data['description'] = description
+            books_data.append(book_data)
+        
+        return books_data, next_url, pagination
+
+    @staticmethod
+    def _with_fingerprint(parsed_books):
+        """URL da página do livro (backfill de descrições) + hash do conteúdo (recrawl incremental)"""
+        for book_url, book_data in parsed_books:
+            book_data['source_url'] = book_url
+            book_data['content_hash'] = content_hash(book_data)
+        return parsed_books
+
     def scrape_book_details(self, book_element, category_name):
-        """Extrai detalhes de um livro individual com URL corrigida"""
+        """Extrai detalhes de um livro individual (elemento BeautifulSoup) com URL corrigida"""
         try:
-            # URL do livro
-            book_link = book_element.select_one('h3 a')
-            if not book_link:
+            parsed = get_parser('html.parser', self.base_url).parse_book_element(book_element, category_name)
+            if not parsed:
                 return None
 
-            # CORREÇÃO: Lidar com URLs relativas
-            book_relative_url = book_link['href']
-            while book_relative_url.startswith('../'):
-                book_relative_url = book_relative_url[3:]
-
-            if not book_relative_url.startswith('catalogue/'):
-                book_relative_url = f'catalogue/{book_relative_url}'
-
-            book_url = urljoin(self.base_url, book_relative_url)
-
-            # Informações básicas
-            title = book_link.get('title', '').strip()
-
-            # Preço - converte para float
-            price_element = book_element.select_one('.price_color')
-            price_text = price_element.get_text(strip=True) if price_element else "£0.00"
-            try:
-                price = float(price_text.replace('£', ''))
-            except:
-                price = 0.0
-
-            # Disponibilidade
-            availability = book_element.select_one('.instock.availability')
-            availability = availability.get_text(strip=True) if availability else "Out of stock"
-
-            # Rating - converte texto para número
-            rating_element = book_element.select_one('p.star-rating')
-            rating = 0  # Default
-            if rating_element:
-                rating_classes = rating_element.get('class', [])
-                for cls in rating_classes:
-                    if cls.startswith('One'): rating = 1
-                    elif cls.startswith('Two'): rating = 2
-                    elif cls.startswith('Three'): rating = 3
-                    elif cls.startswith('Four'): rating = 4
-                    elif cls.startswith('Five'): rating = 5
-
-            image_element = book_element.select_one('img')
-            image_url = ""
-            if image_element and image_element.get('src'):
-                image_relative_url = image_element['src']
-                while image_relative_url.startswith('../'):
-                    image_relative_url = image_relative_url[3:]
-                if not image_relative_url.startswith('catalogue/'):
-                    image_relative_url = f'catalogue/{image_relative_url}'
-                image_url = urljoin(self.base_url, image_relative_url)
-
-            description = self.get_book_description(book_url)
-
-            return {
-                'title': title,
-                'price': price,
-                'availability': availability,
-                'rating': rating,  
-                'description': description,
-                'category': category_name,
-                'image_url': image_url
-            }
+            book_url, book_data = parsed
+            book_data['source_url'] = book_url
+            book_data['content_hash'] = content_hash(book_data)
+            book_data['description'] = self.get_book_description(book_url, book_data['title'], category_name)
+            return book_data
 
         except Exception as e:
             self.logger.error(f"Erro ao extrair detalhes do livro: {e}")
             return None
-        
+
+    async def crawl_async(self, categories=None, max_concurrency=None, per_host_limit=None, progress=None):
+        """
+        Crawl assíncrono das categorias com concorrência limitada (global e por host)
+        Retorna {categoria: [livros]} com os mesmos dicts de scrape_single_category
+        progress: chamado com {'pages_done': n} após cada página (ex.: crawl_heartbeat renovando o lock)
+
+        Uso: books_by_category = asyncio.run(scraper.crawl_async())
+        """
+        max_concurrency = max_concurrency or self.max_concurrency
+        per_host_limit = per_host_limit or self.per_host_limit
+
+        loop = asyncio.get_running_loop()
+        global_limit = asyncio.Semaphore(max_concurrency)
+        host_limits = {}
+        stats = {'pages_done': 0}
+
+        def page_done():
+            # Roda no loop (thread principal): o callback pode usar a sessão do banco
+            stats['pages_done'] += 1
+            if progress is not None:
+                progress(dict(stats))
+
+        # O requests é bloqueante: cada GET roda numa thread do executor,
+        # os semáforos garantem os limites de concorrência
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            async def fetch(url):
+                host = urlparse(url).netloc
+                host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_limit))
+                async with global_limit, host_limit:
+                    return await loop.run_in_executor(executor, self.fetch, url)
+
+            if categories is None:
+                categories = await loop.run_in_executor(executor, self.get_categories)
+
+            self.logger.info(f"🚀 Crawl assíncrono: {len(categories)} categorias "
+                             f"(concorrência {max_concurrency}, {per_host_limit} por host)")
+
+            results = await asyncio.gather(*(
+                self._crawl_category_async(category_name, category_url, fetch, page_done)
+                for category_name, category_url in categories.items()
+            ))
+
+        return dict(zip(categories.keys(), results))
+
+    async def _crawl_category_async(self, category_name, category_url, fetch, page_done=None):
+        """Versão assíncrona de scrape_single_category (páginas pela contagem, todas de uma vez)"""
+        books_data = []
+        try:
+            page_url = category_url
+            page_books, next_url, pagination = await self._crawl_page_async(page_url, category_name, fetch, page_done)
+            books_data.extend(page_books)
+
+            remaining = self._remaining_pages(pagination, page_url, next_url)
+            if remaining:
+                next_url = None
+                results = await asyncio.gather(*(
+                    self._crawl_page_async(url, category_name, fetch, page_done) for url in remaining
+                ), return_exceptions=True)
+                for url, result in zip(remaining, results):
+                    if isinstance(result, CircuitOpen):
+                        raise result
+                    if isinstance(result, Exception):
+                        self.logger.error(f"Erro na página {url} de {category_name}: {result}")
+                        self.dead_letters.add(url, 'page', category=category_name, error=result)
+                        continue
+                    page_books, page_next_url, _ = result
+                    books_data.extend(page_books)
+                    if url == remaining[-1]:
+                        next_url = page_next_url
+
+            # Sem contagem (ou mais páginas que o anunciado): link next
+            page_url = next_url
+            while page_url:
+                page_books, page_url, _ = await self._crawl_page_async(page_url, category_name, fetch, page_done)
+                books_data.extend(page_books)
+
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            self.logger.error(f"Erro ao fazer scraping da categoria {category_name}: {e}")
+            self.dead_letters.add(page_url, 'page', category=category_name, error=e)
+
+        self.logger.info(f"✅ {category_name}: {len(books_data)} livros coletados")
+        return books_data
+
+    async def _crawl_page_async(self, page_url, category_name, fetch, page_done=None):
+        """Uma página de listagem com as descrições: (livros, url_da_proxima, paginação)"""
+        self.logger.info(f"Scraping página: {page_url}")
+        response = await fetch(page_url)
+        parsed_books, next_url, pagination = self.parser.parse_listing_page(response.content, page_url, category_name)
+        parsed_books = self._with_fingerprint(parsed_books)
+
+        # Descrições da página inteira em paralelo
+        if self.fields == 'listing':
+            descriptions = [None] * len(parsed_books)
+        else:
+            descriptions = await asyncio.gather(*(
+                self._fetch_description_async(book_url, fetch, book_data['title'], category_name)
+                for book_url, book_data in parsed_books
+            ))
+
+        books_data = []
+        for (_, book_data), description in zip(parsed_books, descriptions):
+            book_data['description'] = description
+            books_data.append(book_data)
+
+        if page_done is not None:
+            page_done()
+        return books_data, next_url, pagination
+
+    async def _fetch_description_async(self, url, fetch, title=None, category=None):
+        """Versão assíncrona de get_book_description"""
+        try:
+            response = await fetch(url)
+            return self.parser.parse_description(response.content)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            self.logger.error(f"Erro ao obter descrição de {url}: {e}")
+            self.dead_letters.add(url, 'description', category=category, title=title, error=e)
+            return DESCRICAO_PADRAO
+
     def get_all_books(self, max_categories=None):
         """
         MÉTODO LEGADO - Para uso no comando manual
@@ -210,11 +409,10 @@ class BookScraper:
             self.logger.info(f"📦 Processando categoria {i}/{total_categories}: {category_name}")
             category_books = self.scrape_single_category(category_name, category_url)
             books_data.extend(category_books)
-            time.sleep(2)  # Rate limiting entre categorias
             
         # Estatísticas finais
         total_books = len(books_data)
-        with_desc = len([b for b in books_data if "Descrição não disponível" not in b['description']])
+        with_desc = len([b for b in books_data if b['description'] and "Descrição não disponível" not in b['description']])
         success_rate = (with_desc / total_books) * 100 if total_books else 0
         
         self.logger.info(f"🎊 SCRAPING COMPLETO!")
@@ -0,0 +1,115 @@
+import re
+import logging
+from sqlalchemy import column, desc, event, func, literal_column, or_, table, text
+from app.models.book import Book, db
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'books_fts'
+
+# PostgreSQL: índice GIN sobre a mesma expressão usada na busca (o planner só usa o índice
+# se a expressão da query for idêntica à do índice)
+PG_DOCUMENT = "to_tsvector('simple', coalesce(books.title, '') || ' ' || coalesce(books.description, ''))"
+PG_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_books_search ON books USING GIN ({PG_DOCUMENT.replace('books.', '')})",
+]
+
+# SQLite: tabela FTS5 com conteúdo externo (a própria books) + triggers de sincronização
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, content='books', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE ON books BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+_TOKENS = re.compile(r'\w+', re.UNICODE)
+
+def _sqlite_has_fts(connection):
+    return connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {'name': FTS_TABLE}).first() is not None
+
+def ensure_search_index(connection):
+    """Cria o índice de busca textual do banco atual (idempotente)"""
+    dialect = connection.dialect.name
+
+    if dialect == 'postgresql':
+        for statement in PG_DDL:
+            connection.execute(text(statement))
+
+    elif dialect == 'sqlite':
+        existed = _sqlite_has_fts(connection)
+        try:
+            for statement in SQLITE_DDL:
+                connection.execute(text(statement))
+        except Exception as e:
+            # SQLite compilado sem FTS5: a busca cai no ILIKE
+            logger.warning(f"FTS5 indisponível, busca usará LIKE: {e}")
+            return
+        if not existed:
+            # Indexa os livros que já estavam na tabela
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+@event.listens_for(Book.__table__, 'after_create')
+def _create_search_index(target, connection, **kwargs):
+    ensure_search_index(connection)
+
+@event.listens_for(Book.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kwargs):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+def apply_text_search(query, term):
+    """
+    Filtra a query de Book pelo termo (título + descrição) e ordena por relevância
+    PostgreSQL: tsvector/GIN | SQLite: FTS5 (bm25) | fallback: ILIKE
+    Cada palavra é buscada como prefixo ('pyth' encontra 'python')
+    """
+    tokens = _TOKENS.findall(term.lower())
+    if not tokens:
+        return _ilike_search(query, term)
+
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+
+    if dialect == 'postgresql':
+        document = literal_column(PG_DOCUMENT)
+        ts_query = func.to_tsquery('simple', ' & '.join(f'{token}:*' for token in tokens))
+        return query.filter(document.op('@@')(ts_query)).order_by(
+            desc(func.ts_rank(document, ts_query)), Book.id
+        )
+
+    if dialect == 'sqlite' and _sqlite_has_fts(connection):
+        fts = table(FTS_TABLE, column('rowid'), column('rank'))
+        fts_query = ' '.join(f'"{token}"*' for token in tokens)
+        return query.join(fts, fts.c.rowid == Book.id).filter(
+            literal_column(FTS_TABLE).op('MATCH')(fts_query)
+        ).order_by(fts.c.rank, Book.id)
+
+    return _ilike_search(query, term)
+
+def _ilike_search(query, term):
+    return query.filter(or_(
+        Book.title.ilike(f'%{term}%'),
+        Book.description.ilike(f'%{term}%')
+    ))
+
+def filter_books(query, title='', category=''):
+    """
+    Filtros da busca (texto E/OU categoria), compartilhados por /books/search e /books/export
+    Retorna (query, tipo de busca)
+    """
+    # Texto: índice full-text (tsvector/FTS5) ordenado por relevância
+    if title and category:
+        query = apply_text_search(query, title).filter(Book.category.ilike(f'%{category}%'))
+        return query, "título E categoria"
+    if title:
+        return apply_text_search(query, title), "título"
+    if category:
+        return query.filter(Book.category.ilike(f'%{category}%')), "categoria"
+    return query, "todos os livros"
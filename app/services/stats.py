@@ -0,0 +1,127 @@
+import logging
+from itertools import groupby
+from app.models.book import Book, db
+from app.models.stats import StatsSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = 1
+PERCENTILES = (25, 50, 75, 90)
+
+def percentiles(sorted_values):
+    """Percentis com interpolação linear (mesma regra do percentile_cont)"""
+    result = {}
+    for p in PERCENTILES:
+        if not sorted_values:
+            result[f'p{p}'] = 0.0
+            continue
+        position = (len(sorted_values) - 1) * p / 100
+        low = int(position)
+        high = min(low + 1, len(sorted_values) - 1)
+        value = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+        result[f'p{p}'] = round(value, 2)
+    return result
+
+def _category_entry(rows):
+    prices = [price for price, _ in rows if price is not None]
+    ratings = {}
+    for _, rating in rows:
+        ratings[str(rating)] = ratings.get(str(rating), 0) + 1
+    return {
+        'book_count': len(rows),
+        'price_count': len(prices),
+        'price_sum': sum(prices),
+        'avg_price': round(sum(prices) / len(prices), 2) if prices else 0.0,
+        'max_price': max(prices, default=0.0),
+        'min_price': min(prices, default=0.0),
+        'ratings': ratings,
+        'percentiles': percentiles(prices)
+    }
+
+def _aggregate_categories(categories=None):
+    """Agregados por categoria, lendo só as categorias informadas (None = todas)"""
+    query = db.session.query(Book.category, Book.price, Book.rating).order_by(Book.category, Book.price)
+    if categories is not None:
+        query = query.filter(Book.category.in_(categories))
+
+    return {
+        category: _category_entry([(price, rating) for _, price, rating in rows])
+        for category, rows in groupby(query, key=lambda row: row[0])
+    }
+
+def _overview(entries, price_percentiles=None):
+    """Resumo geral a partir dos agregados por categoria; price_percentiles None = recalcula"""
+    total = sum(entry['book_count'] for entry in entries.values())
+    price_sum = sum(entry['price_sum'] for entry in entries.values())
+    priced = [entry for entry in entries.values() if entry['book_count']]
+
+    ratings = {}
+    for entry in entries.values():
+        for rating, count in entry['ratings'].items():
+            ratings[rating] = ratings.get(rating, 0) + count
+
+    # Snapshots antigos não têm price_count
+    priced_count = sum(entry.get('price_count', entry['book_count']) for entry in entries.values())
+
+    # Percentis gerais precisam da distribuição inteira: uma leitura só da coluna price
+    if price_percentiles is None:
+        price_percentiles = percentiles([price for (price,) in db.session.query(Book.price).filter(
+            Book.price.isnot(None)).order_by(Book.price)])
+
+    return {
+        'total_books': total,
+        'price_statistics': {
+            'average': round(price_sum / priced_count, 2) if priced_count else 0.0,
+            'max': max((entry['max_price'] for entry in priced), default=0.0),
+            'min': min((entry['min_price'] for entry in priced), default=0.0),
+            'percentiles': price_percentiles
+        },
+        'rating_distribution': [
+            {'rating': None if rating == 'None' else int(rating), 'count': count}
+            for rating, count in sorted(ratings.items())
+        ]
+    }
+
+def compute_snapshot():
+    """Estatísticas calculadas na hora (sem gravar)"""
+    entries = _aggregate_categories()
+    return {'overview': _overview(entries), 'categories': entries}
+
+def refresh_stats(categories=None, percentiles=True):
+    """
+    Atualiza o snapshot na transação atual (não faz commit)
+    Com categories, recalcula só essas categorias e remonta o resumo geral
+    percentiles=False mantém os percentis gerais gravados (evita ler a coluna price inteira
+    a cada página do crawl - o pipeline chama refresh_overview ao fim de cada categoria)
+    """
+    snapshot = db.session.get(StatsSnapshot, SNAPSHOT_ID)
+
+    if snapshot is None or categories is None:
+        entries = _aggregate_categories()
+    else:
+        categories = set(categories)
+        entries = {name: entry for name, entry in snapshot.categories.items() if name not in categories}
+        if categories:
+            entries.update(_aggregate_categories(categories))
+
+    keep = snapshot.overview['price_statistics']['percentiles'] if snapshot is not None and not percentiles else None
+    overview = _overview(entries, keep)
+    if snapshot is None:
+        db.session.add(StatsSnapshot(id=SNAPSHOT_ID, overview=overview, categories=entries))
+    else:
+        # Atribui objetos novos para o SQLAlchemy detectar a mudança nas colunas JSON
+        snapshot.overview = overview
+        snapshot.categories = entries
+    db.session.flush()
+    logger.info(f"📊 Estatísticas atualizadas ({len(categories) if categories is not None else 'todas as'} categorias)")
+
+def refresh_overview():
+    """Só o resumo geral (percentis da coluna price), sem reler nenhuma categoria"""
+    refresh_stats(categories=())
+
+def get_snapshot():
+    """Snapshot gravado (uma leitura por chave primária) ou calculado na hora se ainda não existe"""
+    snapshot = db.session.get(StatsSnapshot, SNAPSHOT_ID)
+    if snapshot is None:
+        return compute_snapshot()
+    return {'overview': snapshot.overview, 'categories': snapshot.categories}
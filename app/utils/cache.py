@@ -0,0 +1,154 @@
+import time
+import hashlib
+import logging
+import threading
+from functools import wraps
+from collections import OrderedDict
+from flask import current_app, request, make_response, Response
+
+logger = logging.getLogger(__name__)
+
+ETAG_ENCODINGS = ('gzip', 'br')
+
+class ResponseCache:
+    """
+    Cache LRU em memória das respostas dos endpoints de leitura
+
+    As entradas valem para uma geração do catálogo: quando o ingest faz commit
+    a geração muda e o cache inteiro é descartado. A geração lida do banco fica
+    memorizada por generation_ttl segundos (outros processos enxergam a
+    mudança em até esse tempo; o próprio processo, imediatamente)
+    """
+
+    def __init__(self, max_entries=256, generation_ttl=2.0):
+        self.max_entries = max_entries
+        self.generation_ttl = generation_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation_read_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self):
+        """Geração atual do catálogo (None se não foi possível ler)"""
+        from app.services.catalogue import read_generation
+
+        now = time.monotonic()
+        if self._generation is not None and now - self._generation_read_at < self.generation_ttl:
+            return self._generation
+
+        try:
+            generation = read_generation()
+        except Exception as e:
+            logger.warning(f"Geração do catálogo indisponível, cache ignorado: {e}")
+            return None
+
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+            self._generation = generation
+            self._generation_read_at = now
+        return generation
+
+    def expire_generation(self):
+        """Força reler a geração na próxima requisição (chamado após o commit do ingest)"""
+        self._generation_read_at = 0.0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # o catálogo mudou enquanto a resposta era montada
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+def init_response_cache(app):
+    app.extensions['response_cache'] = ResponseCache(
+        max_entries=app.config.get('RESPONSE_CACHE_SIZE', 256),
+        generation_ttl=app.config.get('CATALOGUE_GENERATION_TTL', 2.0)
+    )
+
+def cache_key():
+    """Endpoint + query args normalizados (ordem dos parâmetros não importa)"""
+    args = tuple(sorted((name, tuple(values)) for name, values in request.args.lists()))
+    return request.endpoint, args
+
+def cached_response(view):
+    """Cacheia as respostas 200 de um método get de Resource"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = current_app.extensions.get('response_cache')
+        if cache is None or cache.max_entries <= 0:
+            return view(*args, **kwargs)
+
+        generation = cache.generation()
+        if generation is None:
+            return view(*args, **kwargs)
+
+        key = cache_key() + (tuple(sorted(kwargs.items())),)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = view(*args, **kwargs)
+        if isinstance(response, tuple) and len(response) > 1 and response[1] == 200:
+            cache.set(key, response, generation)
+        return response
+    return wrapper
+
+def compute_etag(generation):
+    """ETag forte: geração do catálogo + caminho + query args normalizados"""
+    raw = f"{generation}|{request.path}|{cache_key()[1]}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:32]
+
+def _etag_variants(etag):
+    return (etag,) + tuple(f'{etag}-{encoding}' for encoding in ETAG_ENCODINGS)
+
+def conditional_get(view):
+    """
+    ETag derivado da geração do catálogo: If-None-Match igual vira 304
+    sem consultar os livros nem serializar o corpo
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = current_app.extensions.get('response_cache')
+        generation = cache.generation() if cache is not None else None
+        if generation is None:
+            return view(*args, **kwargs)
+
+        etag = compute_etag(generation)
+        # Variantes comprimidas têm o ETag com sufixo da codificação (-gzip, -br)
+        matched = next((tag for tag in _etag_variants(etag) if tag in request.if_none_match), None)
+        if matched:
+            response = make_response('', 304)
+            response.set_etag(matched)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        response = view(*args, **kwargs)
+        if isinstance(response, tuple) and len(response) == 2 and response[1] == 200:
+            return response[0], 200, {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+        if isinstance(response, Response) and response.status_code == 200:
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,120 @@
+import gzip
+import json
+import zlib
+import logging
+from flask import current_app, make_response, request
+from app.utils.cache import ResponseCache
+from app.utils.serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/', 'application/javascript')
+
+def output_json(data, code, headers=None):
+    """JSON compacto; indentado só com ?pretty (ou em modo debug)"""
+    if 'pretty' in request.args or current_app.debug:
+        settings = dict(current_app.config.get('RESTFUL_JSON', {}))
+        settings.setdefault('indent', 4)
+        body = json.dumps(data, **settings) + "\n"
+    else:
+        body = dumps(data) + b"\n"
+
+    response = make_response(body, code)
+    response.headers.extend(headers or {})
+    return response
+
+def choose_encoding():
+    """Melhor codificação aceita pelo cliente (br > gzip)"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+def compress(body, encoding, level):
+    if encoding == 'br':
+        # brotli vai de 0 a 11; o nível configurado é o do gzip (1-9)
+        return brotli.compress(body, quality=min(11, level + 2))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def compress_stream(chunks, encoding, level):
+    """Comprime um corpo em streaming pedaço a pedaço (memória constante)"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=min(11, level + 2))
+        process, finish = compressor.process, compressor.finish
+    else:
+        # wbits=31: formato gzip (cabeçalho + CRC), o mesmo do gzip.compress
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        data = process(chunk.encode() if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield finish()
+
+def _is_compressible(response):
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if response.direct_passthrough:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    return response.mimetype.startswith(COMPRESSIBLE_TYPES)
+
+def setup_compression(app):
+    """
+    Compressão negociada por Accept-Encoding (after_request)
+
+    - só comprime corpos acima de COMPRESS_MIN_SIZE bytes, com nível COMPRESS_LEVEL
+    - respostas com ETag (derivado da geração do catálogo) têm o corpo comprimido
+      guardado por (ETag, codificação): o mesmo payload não é recomprimido a cada hit
+    - o ETag ganha o sufixo da codificação (cada variante é um recurso diferente)
+    - respostas em streaming (/books/export) são comprimidas pedaço a pedaço, sem limite de tamanho
+    """
+    app.extensions['compressed_cache'] = ResponseCache(max_entries=app.config.get('COMPRESS_CACHE_SIZE', 128))
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config.get('COMPRESS_ENABLED', True) or not _is_compressible(response):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding()
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        if response.is_streamed:
+            # Tamanho desconhecido de antemão: comprime sem ler o corpo inteiro
+            response.response = compress_stream(response.response, encoding, app.config.get('COMPRESS_LEVEL', 6))
+            response.headers['Content-Encoding'] = encoding
+            response.headers.pop('Content-Length', None)
+            if etag:
+                response.set_etag(f'{etag}-{encoding}', weak=weak)
+            return response
+
+        body = response.get_data()
+        if len(body) < app.config.get('COMPRESS_MIN_SIZE', 500):
+            return response
+
+        cache = app.extensions['compressed_cache']
+        key = (etag, encoding)
+
+        compressed = cache.get(key) if etag else None
+        if compressed is None:
+            compressed = compress(body, encoding, app.config.get('COMPRESS_LEVEL', 6))
+            if etag:
+                cache.set(key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak=weak)
+        return response
@@ -2,9 +2,17 @@ import logging
 import json
 import time
 import os
-from flask import request, g
+from flask import request, g, current_app, has_app_context
 from datetime import datetime, timezone
 
+class _SkipTesting(logging.Filter):
+    """Não grava no arquivo as requisições de apps com TESTING nem as feitas durante o pytest"""
+
+    def filter(self, record):
+        if 'PYTEST_CURRENT_TEST' in os.environ:
+            return False
+        return not (has_app_context() and current_app.testing)
+
 class StructuredLogger:
     def __init__(self, testing=False):
         self.logger = logging.getLogger('book_api')
@@ -28,6 +36,7 @@ class StructuredLogger:
                 log_file = os.path.join(log_dir, 'api_monitor.log')
                 file_handler = logging.FileHandler(log_file)
                 file_handler.setFormatter(formatter)
+                file_handler.addFilter(_SkipTesting())
                 self.logger.addHandler(file_handler)
             except Exception as e:
                 print(f" Não foi possível criar arquivo de log: {e}")
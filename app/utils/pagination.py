@@ -0,0 +1,55 @@
+import json
+import base64
+from sqlalchemy import tuple_
+
+class InvalidCursor(ValueError):
+    """Cursor recebido em after= não pôde ser decodificado"""
+
+def encode_cursor(values):
+    """Cursor opaco: valores das chaves de ordenação do último item da página"""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+    if not isinstance(values, list):
+        raise InvalidCursor('cursor malformado')
+    return values
+
+def keyset_paginate(query, columns, after=None, per_page=20, with_count=False, max_per_page=100):
+    """
+    Paginação por cursor (keyset): WHERE (chave, id) > (:ultima_chave, :ultimo_id)
+
+    - columns: colunas de ordenação ascendente; a última precisa ser única (Book.id)
+    - after: cursor devolvido pela página anterior ('' ou None = primeira página)
+    - with_count: só faz o COUNT(*) quando pedido
+    - per_page é limitado ao intervalo 1..max_per_page
+
+    Retorna (itens, dict de paginação)
+    """
+    per_page = max(1, min(per_page, max_per_page))
+    total = query.order_by(None).count() if with_count else None
+
+    if after:
+        values = decode_cursor(after)
+        if len(values) != len(columns):
+            raise InvalidCursor('cursor não corresponde a esta ordenação')
+        query = query.filter(tuple_(*columns) > tuple_(*values))
+
+    # Um item a mais só para saber se existe próxima página
+    rows = query.order_by(None).order_by(*columns).limit(per_page + 1).all()
+    items = rows[:per_page]
+    has_more = len(rows) > per_page
+
+    pagination = {
+        'per_page': per_page,
+        'next_cursor': encode_cursor([getattr(items[-1], c.key) for c in columns]) if has_more else None,
+        'has_more': has_more
+    }
+    if total is not None:
+        pagination['total'] = total
+    return items, pagination
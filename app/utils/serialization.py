@@ -0,0 +1,69 @@
+import io
+import csv
+import json
+from app.models.book import Book
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele usa o json da stdlib
+    orjson = None
+
+# Mesma ordem de chaves do Book.to_dict()
+BOOK_FIELDS = ('id', 'title', 'price', 'rating', 'availability', 'category', 'image_url', 'description')
+
+class InvalidFields(ValueError):
+    """?fields= com campos que não existem no livro"""
+
+def parse_fields(value):
+    """?fields=title,price -> campos na ordem do to_dict (vazio = todos)"""
+    if not value:
+        return BOOK_FIELDS
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = requested - set(BOOK_FIELDS)
+    if unknown:
+        raise InvalidFields(sorted(unknown))
+    return tuple(field for field in BOOK_FIELDS if field in requested)
+
+def project_books(query, fields=BOOK_FIELDS, extra=()):
+    """
+    Troca a entidade Book pelas colunas pedidas (tuplas, sem hidratar objetos ORM)
+    extra: colunas necessárias só para a query (ex.: chaves do cursor), vão no fim da tupla
+    """
+    columns = fields + tuple(field for field in extra if field not in fields)
+    return query.with_entities(*(getattr(Book, field) for field in columns))
+
+def rows_to_dicts(rows, fields=BOOK_FIELDS):
+    return [dict(zip(fields, row)) for row in rows]
+
+def dumps(data):
+    """JSON compacto em bytes (orjson se instalado; a saída é a mesma nos dois caminhos)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass  # tipo que o orjson não serializa: cai no json da stdlib
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def iter_ndjson(rows, fields=BOOK_FIELDS, chunk_size=500):
+    """Um objeto JSON por linha, em blocos de chunk_size linhas"""
+    chunk = []
+    for row in rows:
+        chunk.append(dumps(dict(zip(fields, row))))
+        if len(chunk) >= chunk_size:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
+def iter_csv(rows, fields=BOOK_FIELDS, chunk_size=500):
+    """CSV com cabeçalho, em blocos de chunk_size linhas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row[:len(fields)])
+        if count % chunk_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
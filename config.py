@@ -35,9 +35,23 @@ class Config:
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
     JSON_AS_ASCII = False  
-    JSONIFY_PRETTYPRINT_REGULAR = True 
     JSON_SORT_KEYS = False
 
+    # Cache de respostas (0 desliga) e por quantos segundos a geração do catálogo é memorizada
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+    CATALOGUE_GENERATION_TTL = float(os.environ.get('CATALOGUE_GENERATION_TTL', 2))
+
+    # Máximo de ids por chamada do /books/batch
+    BOOKS_BATCH_MAX = int(os.environ.get('BOOKS_BATCH_MAX', 100))
+    # Máximo de livros por página do /books no modo cursor (per_page maior é limitado a ele)
+    BOOKS_PER_PAGE_MAX = int(os.environ.get('BOOKS_PER_PAGE_MAX', 100))
+
+    # Compressão das respostas (gzip / brotli se instalado)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_CACHE_SIZE = int(os.environ.get('COMPRESS_CACHE_SIZE', 128))
+
     @classmethod
     def check_environment(cls):
         """Verifica se está em prod ou des"""
@@ -78,19 +78,45 @@ def get_api_base_url():
         return "http://book-api:5000"
     return "https://web-production-962ea.up.railway.app"
 
+@st.cache_resource
+def _etag_store():
+    """Última resposta de cada URL, para revalidar com If-None-Match"""
+    return {}
+
+def get_json_revalidated(url, timeout=10, parse=None):
+    """GET com ETag: se a API responder 304, reaproveita o JSON anterior"""
+    store = _etag_store()
+    cached = store.get(url)
+    headers = {'If-None-Match': cached[0]} if cached else {}
+
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        return 200, cached[1]
+
+    data = (parse or requests.Response.json)(response) if response.status_code == 200 else None
+    etag = response.headers.get('ETag')
+    if etag and data is not None:
+        store[url] = (etag, data)
+    return response.status_code, data
+
 @st.cache_data(ttl=300)
 def fetch_corrected_data():
     """Busca dados na estrutura REAL da API"""
     base_url = get_api_base_url()
     
     try:
-        books_response = requests.get(f"{base_url}/api/v1/books?per_page=200", timeout=10)
-        categories_response = requests.get(f"{base_url}/api/v1/categories", timeout=10)
-        stats_response = requests.get(f"{base_url}/api/v1/stats/overview", timeout=10)
+        # Catálogo inteiro em NDJSON (antes só os 200 primeiros livros)
+        books_status, books_json = get_json_revalidated(
+            f"{base_url}/api/v1/books/export?fields=title,price,rating,category",
+            timeout=30,
+            parse=lambda response: {'books': [json.loads(line) for line in response.iter_lines() if line]}
+        )
+        categories_status, categories_json = get_json_revalidated(f"{base_url}/api/v1/categories")
+        stats_status, stats_json = get_json_revalidated(f"{base_url}/api/v1/stats/overview")
         
-        books_data = books_response.json().get('books', []) if books_response.status_code == 200 else []
-        categories_data = categories_response.json().get('categories', []) if categories_response.status_code == 200 else []
-        stats_data = stats_response.json() if stats_response.status_code == 200 else {}
+        books_data = books_json.get('books', []) if books_status == 200 else []
+        categories_data = categories_json.get('categories', []) if categories_status == 200 else []
+        stats_data = stats_json if stats_status == 200 else {}
         
         return {
             'books': books_data,
@@ -0,0 +1,60 @@
+"""
+Micro-benchmark da serialização de listas de livros
+
+Compara o caminho antigo (objetos Book + to_dict + json da stdlib) com o novo
+(colunas como tuplas + orjson/json compacto) num SQLite em memória
+
+    python scripts/benchmark_serialization.py --books 1000 --repeat 20
+"""
+import os
+import sys
+import json
+import argparse
+import timeit
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from app import create_app
+from app.models.book import Book, db
+from app.utils.serialization import project_books, rows_to_dicts, dumps, orjson
+
+def seed(n):
+    db.session.add_all(Book(
+        title=f'Livro {i}', price=10 + i % 50 + 0.99, rating=i % 5 + 1, availability='In stock',
+        category=f'Categoria {i % 50}', image_url=f'http://books.toscrape.com/media/{i}.jpg',
+        description='Uma descrição longa de livro. ' * 20
+    ) for i in range(n))
+    db.session.commit()
+
+def orm_path():
+    db.session.expunge_all()  # sem identity map aquecido, como numa requisição nova
+    return json.dumps({'books': [book.to_dict() for book in Book.query.all()]}).encode()
+
+def tuple_path():
+    return dumps({'books': rows_to_dicts(project_books(Book.query))})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        seed(args.books)
+
+        assert json.loads(orm_path()) == json.loads(tuple_path())
+
+        print(f" {args.books} livros, {args.repeat} repetições (encoder: {'orjson' if orjson else 'json'})")
+        results = {}
+        for name, func in (('ORM + to_dict + json', orm_path), ('tuplas + encoder rápido', tuple_path)):
+            results[name] = min(timeit.repeat(func, number=1, repeat=args.repeat)) * 1000
+            print(f"   {name:<26} {results[name]:8.2f} ms")
+
+        old, new = results.values()
+        print(f" Ganho: {old / new:.1f}x")
+
+if __name__ == '__main__':
+    main()
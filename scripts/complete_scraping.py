@@ -1,5 +1,4 @@
 import os
-import time
 import sys
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,48 +9,14 @@ sys.path.insert(0, project_root)
 from app.utils.database import setup_database_environment
 setup_database_environment()
 
-from app import create_app, db
-from app.models.book import Book
-from app.services.scraper import BookScraper
+from app import create_app
+from app.commands.warmup_command import warmup
 
 app = create_app()
 
+TARGET_BOOKS = 1000
+MAX_TIME_MINUTES = 15
+
 with app.app_context():
-    book_count = Book.query.count()
-    categories_count = db.session.query(Book.category).distinct().count()
-    
-    TARGET_BOOKS = 1000
-    MAX_TIME_MINUTES = 15
-    
-    if book_count < TARGET_BOOKS:
-        print(f"Completando: {book_count} → {TARGET_BOOKS} livros")
-        
-        scraper = BookScraper()
-        categories = dict(list(scraper.get_categories().items())[categories_count:])
-        
-        start_time = time.time()
-        total_added = 0
-        
-        for name, url in categories.items():
-            if (time.time() - start_time) / 60 >= MAX_TIME_MINUTES:
-                break
-            if Book.query.count() >= TARGET_BOOKS:
-                break
-                
-            books = scraper.scrape_single_category(name, url)
-            added = sum(1 for book_data in books if not Book.query.filter_by(title=book_data['title'], category=name).first())
-            
-            for book_data in books:
-                if not Book.query.filter_by(title=book_data['title'], category=name).first():
-                    db.session.add(Book(**book_data))
-            
-            db.session.commit()
-            total_added += added
-            print(f"{name}: +{added}")
-            
-            time.sleep(1)
-        
-        print(f" Adicionados: {total_added} | Total: {Book.query.count()}")
-    
-    else:
-        print(" Base já completa!")
\ No newline at end of file
+    # Mesmo fluxo do `flask --app app warmup`: schema + crawl pelo checkpoint, com lock
+    warmup(TARGET_BOOKS, MAX_TIME_MINUTES)
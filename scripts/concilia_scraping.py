@@ -1,4 +1,3 @@
-import time
 import sys
 import os
 from datetime import datetime
@@ -13,8 +12,8 @@ sys.path.insert(0, project_root)
 from app.utils.database import setup_database_environment
 setup_database_environment()
 
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
+from app.services.extraction import extract_listing
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -71,8 +70,6 @@ class ScrapingReconciliation:
                 
                 logger.info(f"   ✅ {categoria_nome}: {len(livros_categoria)} livros")
                 
-                time.sleep(1)
-                
             except Exception as e:
                 logger.error(f"Erro ao obter livros de '{categoria_nome}': {e}")
                 livros_por_categoria_site[categoria_nome] = 0
@@ -111,107 +108,41 @@ class ScrapingReconciliation:
         
         try:
             while page_url:
-                response = self.scraper.session.get(page_url, headers=self.scraper.headers, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                books_elements = soup.select('article.product_pod')
+                response = self.scraper.fetch(page_url)
                 
-                for book_element in books_elements:
-                    livro_data = self._extrair_livro_com_url(book_element, categoria_nome)
-                    if livro_data:
-                        livros_detalhados.append(livro_data)
+                # Mesma extração do scraper principal, a página inteira de uma vez
+                livros_pagina, page_url = extract_listing(
+                    response.content, page_url, categoria_nome,
+                    base_url=self.scraper.base_url, parser=self.scraper.parser.name
+                )
                 
-                # Verifica próxima página
-                next_button = soup.select_one('li.next a')
-                if next_button:
-                    page_url = urljoin(page_url, next_button['href'])
-                else:
-                    page_url = None
-                
-                time.sleep(0.5)
+                for book_url, book_data in livros_pagina:
+                    livros_detalhados.append(self._com_campos_internos(book_url, book_data))
                     
         except Exception as e:
             logger.error(f"Erro no scraping detalhado de {categoria_nome}: {e}")
         
         return livros_detalhados
 
-    def _extrair_livro_com_url(self, book_element, categoria_nome):
-        """Extrai livro usando apenas campos válidos do modelo Book"""
-        try:
-            book_link = book_element.select_one('h3 a')
-            if not book_link:
-                return None
-
-            # Corrige URL 
-            book_relative_url = book_link['href']
-            while book_relative_url.startswith('../'):
-                book_relative_url = book_relative_url[3:]
-
-            if not book_relative_url.startswith('catalogue/'):
-                book_relative_url = f'catalogue/{book_relative_url}'
-
-            book_url = urljoin(self.scraper.base_url, book_relative_url)
-
-            # Extrai ID único da URL (apenas para comparação interna)
-            url_parts = urlparse(book_url)
-            path_parts = url_parts.path.split('/')
-            livro_id = path_parts[-2] if path_parts[-1] == '' else path_parts[-1]
-            livro_id = livro_id.replace('.html', '')
-
-            # Informações básicas 
-            title = book_link.get('title', '').strip()
-
-            # Preço
-            price_element = book_element.select_one('.price_color')
-            price_text = price_element.get_text(strip=True) if price_element else "£0.00"
-            try:
-                price = float(price_text.replace('£', ''))
-            except:
-                price = 0.0
-
-            # Disponibilidade
-            availability = book_element.select_one('.instock.availability')
-            availability = availability.get_text(strip=True) if availability else "Out of stock"
-
-            # Rating
-            rating_element = book_element.select_one('p.star-rating')
-            rating = 0
-            if rating_element:
-                rating_classes = rating_element.get('class', [])
-                for cls in rating_classes:
-                    if cls.startswith('One'): rating = 1
-                    elif cls.startswith('Two'): rating = 2
-                    elif cls.startswith('Three'): rating = 3
-                    elif cls.startswith('Four'): rating = 4
-                    elif cls.startswith('Five'): rating = 5
-
-            # Imagem
-            image_element = book_element.select_one('img')
-            image_url = ""
-            if image_element and image_element.get('src'):
-                image_relative_url = image_element['src']
-                while image_relative_url.startswith('../'):
-                    image_relative_url = image_relative_url[3:]
-                if not image_relative_url.startswith('catalogue/'):
-                    image_relative_url = f'catalogue/{image_relative_url}'
-                image_url = urljoin(self.scraper.base_url, image_relative_url)
-
-            return {
-                'title': title,
-                'price': price,
-                'availability': availability,
-                'rating': rating,
-                'description': "A ser coletada no salvamento",
-                'category': categoria_nome,
-                'image_url': image_url,
-                '_internal_url': book_url,
-                '_internal_url_id': livro_id,
-                '_internal_chave_unica': f"{title}||{livro_id}||{price}||{rating}"
-            }
-
-        except Exception as e:
-            logger.error(f"Erro ao extrair livro detalhado: {e}")
-            return None
+    def _com_campos_internos(self, book_url, book_data):
+        """Acrescenta ao livro extraído os campos internos usados só na comparação"""
+        # Extrai ID único da URL (apenas para comparação interna)
+        url_parts = urlparse(book_url)
+        path_parts = url_parts.path.split('/')
+        livro_id = path_parts[-2] if path_parts[-1] == '' else path_parts[-1]
+        livro_id = livro_id.replace('.html', '')
+
+        title = book_data['title']
+        price = book_data['price']
+        rating = book_data['rating']
+
+        return {
+            **book_data,
+            'description': "A ser coletada no salvamento",
+            '_internal_url': book_url,
+            '_internal_url_id': livro_id,
+            '_internal_chave_unica': f"{title}||{livro_id}||{price}||{rating}"
+        }
 
     def _mostrar_comparacao_completa(self, base_counts, site_counts):
         """Mostra comparação lado a lado entre base e site"""
@@ -469,7 +400,8 @@ class ScrapingReconciliation:
             return True
 
     def _salvar_livro(self, book_data):
-        from app.models.book import Book, db
+        from app.models.book import db
+        from app.services.ingest import bulk_upsert_books
 
         try:
             campos_validos = {
@@ -479,17 +411,19 @@ class ScrapingReconciliation:
                 'availability': book_data['availability'],
                 'category': book_data['category'],
                 'image_url': book_data.get('image_url', ''),
-                'description': book_data.get('description', 'Descrição não disponível')
+                'description': book_data.get('description', 'Descrição não disponível'),
+                'source_url': book_data.get('_internal_url')
             }
 
             # Remover campos None ou vazios
             campos_validos = {k: v for k, v in campos_validos.items() if v is not None and v != ''}
 
-            novo_livro = Book(**campos_validos)
-
-            db.session.add(novo_livro)
-            db.session.commit()
-            logger.info(f"✅ Livro salvo: {book_data['title']}")
+            # Mesmo upsert do scraping: (título, categoria) já existente só é atualizado se mudou
+            novos, _, _ = bulk_upsert_books([campos_validos])
+            if novos:
+                logger.info(f"✅ Livro salvo: {book_data['title']}")
+            else:
+                logger.info(f"⏩ Livro já existe (título + categoria): {book_data['title']}")
 
         except Exception as e:
             logger.error(f"❌ Erro ao salvar livro {book_data['title']}: {e}")
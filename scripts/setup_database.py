@@ -4,6 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app import create_app
 from app.models.book import db
+from app.services.database import ensure_schema
 from sqlalchemy import text  
 
 def setup_database():
@@ -11,9 +12,9 @@ def setup_database():
     
     with app.app_context():
         try:
-            # Criar todas as tabelas
-            db.create_all()
-            print("✅ Tabelas criadas com sucesso!")
+            # Criar todas as tabelas e índices (idempotente)
+            created = ensure_schema()
+            print(f"✅ Tabelas criadas com sucesso! Índices novos: {created or 'nenhum'}")
             
             # Testar conexão (CORRIGIDO)
             db.session.execute(text('SELECT 1'))
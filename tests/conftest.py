@@ -1,6 +1,54 @@
 import pytest
 import os
 from app import create_app, db
+from app.services import pipeline
+
+# Categorias do FakeScraper
+CATEGORIES = {
+    'Travel': 'http://site/travel/index.html',
+    'Poetry': 'http://site/poetry/index.html',
+}
+
+def book_data(title, category='Travel', price=10.0, rating=3, description=None):
+    """Dict de livro no formato do scraper (entrada do bulk_upsert_books)"""
+    return {
+        'title': title, 'price': price, 'rating': rating, 'availability': 'In stock',
+        'category': category, 'image_url': '', 'description': description
+    }
+
+class FakeClock:
+    """Relógio controlado pelos testes: sleep só avança o tempo"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class FakeScraper:
+    """Duas páginas por categoria, dois livros por página"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.requested = []
+
+    def get_categories(self):
+        return dict(CATEGORIES)
+
+    def scrape_listing_page(self, page_url, category_name):
+        self.requested.append(page_url)
+        if page_url == self.fail_on:
+            raise RuntimeError('timeout')
+
+        page = 2 if page_url.endswith('page-2.html') else 1
+        books = [book_data(f'{category_name} {page}-{i}', category_name, description='desc') for i in range(2)]
+        next_url = page_url.replace('index.html', 'page-2.html') if page == 1 else None
+        return books, next_url
 
 @pytest.fixture
 def app():
@@ -28,4 +76,13 @@ def client(app):
 @pytest.fixture
 def runner(app):
     """Runner para comandos CLI"""
-    return app.test_cli_runner()
\ No newline at end of file
+    return app.test_cli_runner()
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Pipeline sem as pausas entre categorias"""
+    monkeypatch.setattr(pipeline.time, 'sleep', lambda seconds: None)
@@ -0,0 +1,192 @@
+import json
+from datetime import datetime
+import pytest
+from app.models.book import Book, db
+
+BOOKS = [
+    ('Python Crash Course', 'Programming', 39.9, 5, 'A hands-on introduction to programming with Python.'),
+    ('Learning SQL', 'Programming', 29.5, 4, 'Queries, joins and indexes explained.'),
+    ('The Great Gatsby', 'Classics', 12.0, 3, 'A novel about Jay Gatsby and the jazz age.'),
+    ('Snakes of the World', 'Science', 18.0, 2, 'Pythons, boas and vipers: a field guide.'),
+    ('Poems', 'Poetry', 8.5, 1, None),
+]
+
+@pytest.fixture
+def books(app):
+    for title, category, price, rating, description in BOOKS:
+        db.session.add(Book(
+            title=title, category=category, price=price, rating=rating,
+            availability='In stock', image_url='', description=description
+        ))
+    db.session.commit()
+
+def _get(client, url):
+    response = client.get(url)
+    return response.status_code, json.loads(response.data)
+
+def test_busca_textual_titulo_e_descricao(client, books):
+    status, data = _get(client, '/api/v1/books/search?q=python')
+
+    assert status == 200
+    titles = [book['title'] for book in data['books']]
+    # 'python' no título e 'Pythons' (prefixo) na descrição
+    assert set(titles) == {'Python Crash Course', 'Snakes of the World'}
+    assert data['pagination']['total'] == 2
+    assert data['results_count'] == 2
+
+def test_busca_ordenada_por_relevancia(client, books):
+    _, data = _get(client, '/api/v1/books/search?title=python')
+    assert data['books'][0]['title'] == 'Python Crash Course'
+
+def test_busca_combinada_com_categoria(client, books):
+    _, data = _get(client, '/api/v1/books/search?q=python&category=science')
+
+    assert [book['title'] for book in data['books']] == ['Snakes of the World']
+    assert data['search_type'] == 'título E categoria'
+
+def test_busca_acompanha_alteracoes(client, books):
+    book = Book.query.filter_by(title='Poems').one()
+    book.description = 'Verses about gardens'
+    db.session.commit()
+
+    _, data = _get(client, '/api/v1/books/search?q=garden')
+    assert [book['title'] for book in data['books']] == ['Poems']
+
+def _walk(client, url):
+    """Percorre todas as páginas do modo cursor"""
+    titles, cursor = [], ''
+    while cursor is not None:
+        _, data = _get(client, f'{url}&after={cursor}')
+        titles += [book['title'] for book in data['books']]
+        cursor = data['pagination']['next_cursor']
+    return titles
+
+def test_cursor_percorre_todos_os_livros(client, books):
+    status, data = _get(client, '/api/v1/books?per_page=2&after=')
+
+    assert status == 200
+    assert len(data['books']) == 2
+    assert data['pagination']['has_more'] is True
+    assert 'total' not in data['pagination']
+    assert _walk(client, '/api/v1/books?per_page=2') == [book[0] for book in BOOKS]
+
+def test_cursor_com_contagem(client, books):
+    _, data = _get(client, '/api/v1/books?per_page=10&after=&count=true')
+
+    assert data['pagination']['total'] == len(BOOKS)
+    assert data['pagination']['has_more'] is False
+    assert data['pagination']['next_cursor'] is None
+
+def test_cursor_faixa_de_preco_ordenado_por_preco(client, books):
+    titles = _walk(client, '/api/v1/books/price-range?min=10&max=40')
+    assert titles == ['The Great Gatsby', 'Snakes of the World', 'Learning SQL', 'Python Crash Course']
+
+def test_cursor_na_busca(client, books):
+    _, data = _get(client, '/api/v1/books/search?q=python&after=')
+    assert {book['title'] for book in data['books']} == {'Python Crash Course', 'Snakes of the World'}
+
+def test_cursor_invalido(client, books):
+    status, data = _get(client, '/api/v1/books?after=nao-e-um-cursor')
+    assert status == 400
+
+@pytest.mark.parametrize('per_page, expected', [('0', 1), ('-1', 1), ('1000', 3)])
+def test_per_page_do_cursor_fica_no_intervalo(app, client, books, per_page, expected):
+    app.config['BOOKS_PER_PAGE_MAX'] = 3
+
+    status, data = _get(client, f'/api/v1/books?per_page={per_page}&after=')
+
+    assert status == 200
+    assert len(data['books']) == expected
+    # O per_page devolvido é o efetivamente usado
+    assert data['pagination']['per_page'] == expected
+
+def test_per_page_do_modo_page_nao_tem_teto(app, client, books):
+    """Modo page continua como antes: per_page alto devolve tudo, sem o teto do cursor"""
+    app.config['BOOKS_PER_PAGE_MAX'] = 3
+
+    status, data = _get(client, '/api/v1/books?per_page=200')
+
+    assert status == 200
+    assert len(data['books']) == len(BOOKS)
+    assert data['pagination']['per_page'] == 200
+
+def test_fields_projeta_colunas(client, books):
+    status, data = _get(client, '/api/v1/books?fields=rating,price,category')
+
+    assert status == 200
+    assert list(data['books'][0]) == ['price', 'rating', 'category']
+
+def test_fields_com_cursor_sem_as_chaves_de_ordenacao(client, books):
+    _, data = _get(client, '/api/v1/books/price-range?min=0&max=100&fields=title&after=')
+
+    assert data['books'][0] == {'title': 'Poems'}
+    _, data = _get(client, '/api/v1/books?fields=title&per_page=2&after=')
+    assert data['pagination']['next_cursor']
+
+def test_fields_na_busca_e_top_rated(client, books):
+    _, data = _get(client, '/api/v1/books/search?q=python&fields=title')
+    assert all(list(book) == ['title'] for book in data['books'])
+
+    _, data = _get(client, '/api/v1/books/top-rated?limit=1&fields=title,rating')
+    assert data['books'] == [{'title': 'Python Crash Course', 'rating': 5}]
+
+def test_fields_invalido(client, books):
+    status, data = _get(client, '/api/v1/books?fields=title,senha')
+
+    assert status == 400
+    assert 'senha' in data['error']
+    assert 'description' in data['allowed_fields']
+
+def test_export_ndjson_completo(client, books):
+    response = client.get('/api/v1/books/export')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [line['title'] for line in lines] == [book[0] for book in BOOKS]
+    assert list(lines[0]) == list(Book.query.first().to_dict())
+
+def test_export_csv_com_filtros_da_busca(client, books):
+    response = client.get('/api/v1/books/export?format=csv&q=python&fields=title,price')
+
+    assert response.mimetype == 'text/csv'
+    assert response.data.decode().splitlines() == [
+        'title,price', 'Python Crash Course,39.9', 'Snakes of the World,18.0'
+    ]
+
+def test_export_since(client, books):
+    old = Book.query.filter_by(title='Poems').one()
+    old.scraped_at = datetime(2020, 1, 1)
+    db.session.commit()
+
+    response = client.get('/api/v1/books/export?since=2021-01-01T00:00:00%2B00:00&fields=title')
+    titles = [json.loads(line)['title'] for line in response.data.decode().splitlines()]
+    assert 'Poems' not in titles and len(titles) == len(BOOKS) - 1
+
+    assert client.get('/api/v1/books/export?since=ontem').status_code == 400
+    assert client.get('/api/v1/books/export?format=xml').status_code == 400
+
+def test_batch_get_preserva_ordem_e_lista_ausentes(client, books):
+    ids = [book.id for book in Book.query.order_by(Book.id)]
+    status, data = _get(client, f'/api/v1/books/batch?ids={ids[2]},{ids[0]},9999,{ids[2]}')
+
+    assert status == 200
+    assert [book['id'] for book in data['books']] == [ids[2], ids[0]]
+    assert data['missing'] == [9999]
+    assert data['requested'] == 3
+
+def test_batch_post_com_fields(client, books):
+    ids = [book.id for book in Book.query.order_by(Book.id)]
+    response = client.post('/api/v1/books/batch?fields=title', json={'ids': [ids[1], ids[0]]})
+
+    data = json.loads(response.data)
+    assert data['books'] == [{'title': 'Learning SQL'}, {'title': 'Python Crash Course'}]
+
+def test_batch_limites(client, app, books):
+    app.config['BOOKS_BATCH_MAX'] = 2
+
+    assert client.get('/api/v1/books/batch?ids=1,2,3').status_code == 400
+    assert client.get('/api/v1/books/batch?ids=a,b').status_code == 400
+    assert client.get('/api/v1/books/batch').status_code == 400
+    assert client.post('/api/v1/books/batch', json={'ids': 'x'}).status_code == 400
@@ -0,0 +1,65 @@
+import gzip
+import json
+import pytest
+from app.services.ingest import bulk_upsert_books
+
+def _books(n):
+    return [{
+        'title': f'Book {i}', 'price': 10.0 + i, 'rating': 3, 'availability': 'In stock',
+        'category': 'Poetry', 'image_url': '', 'description': 'Lorem ipsum dolor sit amet ' * 5
+    } for i in range(n)]
+
+def test_gzip_quando_aceito(client):
+    bulk_upsert_books(_books(30))
+
+    plain = client.get('/api/v1/books?per_page=30')
+    response = client.get('/api/v1/books?per_page=30', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(response.data) < len(plain.data) / 5
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+
+def test_sem_accept_encoding_ou_abaixo_do_limite(client):
+    bulk_upsert_books(_books(30))
+
+    assert 'Content-Encoding' not in client.get('/api/v1/books?per_page=30').headers
+    small = client.get('/api/v1/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+def test_variante_comprimida_reaproveitada_e_revalidada(client, app):
+    bulk_upsert_books(_books(30))
+    headers = {'Accept-Encoding': 'gzip'}
+
+    first = client.get('/api/v1/books?per_page=30', headers=headers)
+    client.get('/api/v1/books?per_page=30', headers=headers)
+    assert app.extensions['compressed_cache'].hits == 1
+
+    etag = first.headers['ETag']
+    revalidated = client.get('/api/v1/books?per_page=30', headers={**headers, 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+
+def test_indentacao_so_com_pretty(client):
+    bulk_upsert_books(_books(1))
+
+    compact = client.get('/api/v1/books').data
+    pretty = client.get('/api/v1/books?pretty=1').data
+
+    assert b'\n ' not in compact
+    assert b'\n    ' in pretty
+    assert json.loads(compact) == json.loads(pretty)
+
+@pytest.mark.parametrize('export_format', ['ndjson', 'csv'])
+def test_export_em_streaming_comprimido(client, export_format):
+    bulk_upsert_books(_books(30))
+    url = f'/api/v1/books/export?format={export_format}'
+
+    plain = client.get(url).get_data()
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    body = response.get_data()
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == plain
+    assert len(body) < len(plain) / 5
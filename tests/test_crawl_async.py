@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+import pytest
+import requests_mock
+from app.services.extraction import DESCRICAO_PADRAO
+from app.services.resilience import RetryPolicy
+from app.services.scraper import BookScraper
+
+CATEGORIES = {
+    'Travel': 'http://books.toscrape.com/catalogue/category/books/travel_2/index.html',
+    'Poetry': 'http://books.toscrape.com/catalogue/category/books/poetry_23/index.html'
+}
+MIRROR_URL = 'http://mirror.toscrape.com/catalogue/category/books/poetry_23/index.html'
+PAGES = 3
+
+def _page_url(category_url, number):
+    return category_url if number == 1 else category_url.replace('index.html', f'page-{number}.html')
+
+def _book_url(slug):
+    return f'http://books.toscrape.com/catalogue/{slug}_1/index.html'
+
+def _page(category_name, number):
+    books = ''.join(f"""<li><article class="product_pod"><p class="star-rating Two"></p>
+    <h3><a href="../../../{category_name}-{number}-{i}_1/index.html" title="{category_name} {number}-{i}">x</a></h3>
+    <p class="price_color">£1{i}.00</p><p class="instock availability">In stock</p></article></li>""" for i in range(2))
+    next_link = f'<li class="next"><a href="page-{number + 1}.html">next</a></li>' if number < PAGES else ''
+    return (f'<html><head><meta charset="utf-8"></head><body><ol class="row">{books}</ol><ul class="pager">'
+            f'<li class="current">Page {number} of {PAGES}</li>{next_link}</ul></body></html>')
+
+def _product(slug):
+    return f"""<html><head><meta charset="utf-8"></head><body>
+    <div id="product_description"><h2>Product Description</h2></div>
+    <p>Descrição longa o bastante do livro {slug}.</p></body></html>"""
+
+def _mock_site(mock, categories):
+    """Listagens de cada categoria + páginas de produto"""
+    for category_name, category_url in categories.items():
+        for number in range(1, PAGES + 1):
+            mock.get(_page_url(category_url, number), text=_page(category_name, number))
+            for i in range(2):
+                slug = f'{category_name}-{number}-{i}'
+                mock.get(_book_url(slug), text=_product(slug))
+
+@pytest.fixture
+def scraper():
+    scraper = BookScraper(retry_policy=RetryPolicy(retries=0))
+    yield scraper
+    scraper.close()
+
+def test_crawl_async_devolve_os_mesmos_livros_que_o_sincrono(scraper):
+    with requests_mock.Mocker() as mock:
+        _mock_site(mock, CATEGORIES)
+        mock.get(_book_url('Poetry-2-1'), status_code=404)
+
+        expected = {name: scraper.scrape_single_category(name, url) for name, url in CATEGORIES.items()}
+        sync_failures = scraper.dead_letters.drain()
+        result = asyncio.run(scraper.crawl_async(CATEGORIES))
+
+    assert result == expected
+    assert [len(books) for books in result.values()] == [2 * PAGES, 2 * PAGES]
+    assert result['Poetry'][3]['description'] == DESCRICAO_PADRAO
+    assert [(entry['url'], entry['kind']) for entry in scraper.dead_letters.drain()] == [
+        (entry['url'], entry['kind']) for entry in sync_failures
+    ]
+
+def test_crawl_async_respeita_os_limites_de_concorrencia():
+    """Respostas lentas: nunca mais que max_concurrency no total nem per_host_limit por host"""
+    categories = {'Travel': CATEGORIES['Travel'], 'Poetry': MIRROR_URL}
+    lock = threading.Lock()
+    in_flight = Counter()
+    peaks = Counter()
+
+    scraper = BookScraper(max_concurrency=3, per_host_limit=2, retry_policy=RetryPolicy(retries=0))
+    fetch = scraper.fetch
+
+    # O requests_mock serializa os envios: a lentidão fica fora dele, no fetch que o crawl chama
+    def slow_fetch(url):
+        host = urlparse(url).netloc
+        with lock:
+            in_flight[host] += 1
+            in_flight['total'] += 1
+            for key in (host, 'total'):
+                peaks[key] = max(peaks[key], in_flight[key])
+        time.sleep(0.05)
+        with lock:
+            in_flight[host] -= 1
+            in_flight['total'] -= 1
+        return fetch(url)
+
+    scraper.fetch = slow_fetch
+    try:
+        with requests_mock.Mocker() as mock:
+            _mock_site(mock, categories)
+            result = asyncio.run(scraper.crawl_async(categories))
+    finally:
+        scraper.close()
+
+    assert [len(books) for books in result.values()] == [2 * PAGES, 2 * PAGES]
+    # Os dois hosts juntos chegam ao limite global, nenhum passa do seu
+    assert peaks['total'] == 3
+    assert peaks['books.toscrape.com'] <= 2
+    assert peaks['mirror.toscrape.com'] <= 2
+
+def test_descricoes_em_paralelo_voltam_na_ordem_da_listagem():
+    """detail_workers > 1: as páginas de produto terminam fora de ordem, as descrições não"""
+    scraper = BookScraper(detail_workers=4, page_workers=1, retry_policy=RetryPolicy(retries=0))
+    fetch = scraper.fetch
+    finished = []
+    delays = {_book_url('Travel-1-0'): 0.15, _book_url('Travel-1-1'): 0.0}
+
+    def slow_fetch(url):
+        time.sleep(delays.get(url, 0))
+        response = fetch(url)
+        finished.append(url)
+        return response
+
+    scraper.fetch = slow_fetch
+    try:
+        with requests_mock.Mocker() as mock:
+            _mock_site(mock, {'Travel': CATEGORIES['Travel']})
+            books, _ = scraper.scrape_listing_page(CATEGORIES['Travel'], 'Travel')
+    finally:
+        scraper.close()
+
+    assert finished[1:] == [_book_url('Travel-1-1'), _book_url('Travel-1-0')]
+    assert [book['title'] for book in books] == ['Travel 1-0', 'Travel 1-1']
+    assert [book['description'] for book in books] == [
+        'Descrição longa o bastante do livro Travel-1-0.', 'Descrição longa o bastante do livro Travel-1-1.'
+    ]
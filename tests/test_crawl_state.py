@@ -0,0 +1,48 @@
+import pytest
+from app.models.book import Book
+from app.services.crawl_state import CrawlStateStore
+from app.services.pipeline import crawl_catalogue
+from tests.conftest import CATEGORIES, FakeScraper
+
+pytestmark = pytest.mark.usefixtures('no_sleep')
+
+def test_crawl_completo(app):
+    stats = crawl_catalogue(FakeScraper())
+
+    assert stats['pages_done'] == 4
+    assert stats['books_added'] == 8
+    assert Book.query.count() == 8
+    assert CrawlStateStore().summary() == {'category': {'done': 2}, 'page': {'done': 4}}
+
+def test_retoma_na_pagina_que_falhou(app):
+    """Uma falha no meio da categoria retoma exatamente na página pendente"""
+    failing = FakeScraper(fail_on='http://site/travel/page-2.html')
+    stats = crawl_catalogue(failing)
+    assert stats['categories_failed'] == 1
+    assert Book.query.count() == 6
+
+    retry = FakeScraper()
+    stats = crawl_catalogue(retry)
+
+    assert retry.requested == ['http://site/travel/page-2.html']
+    assert stats['books_added'] == 2
+    assert Book.query.count() == 8
+
+def test_interrompido_pela_meta(app):
+    stats = crawl_catalogue(FakeScraper(), target_books=2)
+    assert stats['stopped_by'] == 'target_reached'
+    assert stats['pages_done'] == 1
+
+    retry = FakeScraper()
+    crawl_catalogue(retry)
+    assert retry.requested[0] == 'http://site/travel/page-2.html'
+    assert Book.query.count() == 8
+
+def test_ciclo_concluido_recomeca(app):
+    crawl_catalogue(FakeScraper())
+
+    again = FakeScraper()
+    stats = crawl_catalogue(again)
+
+    assert len(again.requested) == 4
+    assert stats['books_existing'] == 8
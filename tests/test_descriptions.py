@@ -0,0 +1,96 @@
+from datetime import datetime
+import pytest
+import requests_mock
+from sqlalchemy import inspect, text
+from app.models.book import Book, db
+from app.models.failed_fetch import FailedFetch
+from app.services.database import ensure_schema
+from app.services.descriptions import backfill_descriptions, pending_descriptions
+from app.services.extraction import DESCRICAO_PADRAO
+from app.services.ingest import bulk_upsert_books
+from app.services.resilience import RetryPolicy
+from app.services.scraper import BookScraper
+
+CATEGORY_URL = 'http://books.toscrape.com/catalogue/category/books/travel_2/index.html'
+BOOK_URLS = [f'http://books.toscrape.com/catalogue/livro-{i}_{i}/index.html' for i in range(3)]
+
+LISTING_HTML = '<html><head><meta charset="utf-8"></head><body><ol class="row">' + ''.join(f"""
+<li><article class="product_pod"><p class="star-rating Three"></p>
+<h3><a href="../../../livro-{i}_{i}/index.html" title="Livro {i}">Livro {i}</a></h3>
+<p class="price_color">£1{i}.00</p><p class="instock availability">In stock</p></article></li>""" for i in range(3)) + '</ol></body></html>'
+
+PRODUCT_HTML = """<html><head><meta charset="utf-8"></head><body>
+<div id="product_description"><h2>Product Description</h2></div>
+<p>Descrição completa e longa o suficiente deste livro.</p></body></html>"""
+
+@pytest.fixture
+def scraper():
+    scraper = BookScraper(fields='listing', retry_policy=RetryPolicy(retries=0))
+    yield scraper
+    scraper.close()
+
+def test_modo_listing_nao_abre_paginas_de_livro(scraper):
+    with requests_mock.Mocker() as mock:
+        mock.get(CATEGORY_URL, text=LISTING_HTML)
+        books, next_url = scraper.scrape_listing_page(CATEGORY_URL, 'Travel')
+
+    assert mock.call_count == 1
+    assert next_url is None
+    assert [book['description'] for book in books] == [None, None, None]
+    assert [book['source_url'] for book in books] == BOOK_URLS
+
+def test_fields_invalido():
+    with pytest.raises(ValueError):
+        BookScraper(fields='tudo')
+
+def test_backfill_busca_so_as_descricoes_pendentes(app, scraper):
+    with requests_mock.Mocker() as mock:
+        mock.get(CATEGORY_URL, text=LISTING_HTML)
+        books, _ = scraper.scrape_listing_page(CATEGORY_URL, 'Travel')
+    bulk_upsert_books(books)
+    assert pending_descriptions().count() == 3
+    Book.query.update({'scraped_at': datetime(2020, 1, 1)})
+    db.session.commit()
+
+    with requests_mock.Mocker() as mock:
+        mock.get(BOOK_URLS[0], text=PRODUCT_HTML)
+        mock.get(BOOK_URLS[1], text=PRODUCT_HTML)
+        mock.get(BOOK_URLS[2], status_code=404)
+        stats = backfill_descriptions(scraper, batch_size=2)
+
+    assert stats == {'updated': 2, 'failed': 1, 'stopped_by': None}
+    assert all(book.scraped_at > datetime(2020, 1, 1) for book in Book.query)
+    assert pending_descriptions().count() == 0
+    descriptions = [book.description for book in Book.query.order_by(Book.id)]
+    assert descriptions[0].startswith('Descrição completa')
+    assert descriptions[2] == DESCRICAO_PADRAO
+    assert FailedFetch.query.one().url == BOOK_URLS[2]
+
+def test_ensure_schema_adiciona_coluna_nova(app):
+    db.session.execute(text('ALTER TABLE books DROP COLUMN source_url'))
+    db.session.commit()
+
+    ensure_schema()
+
+    columns = {column['name'] for column in inspect(db.engine).get_columns('books')}
+    assert 'source_url' in columns
+
+def test_ensure_schema_cria_indices_e_remove_duplicados(app):
+    """Banco legado sem índices e com (título, categoria) repetidos"""
+    indexes = sorted(index.name for index in Book.__table__.indexes)
+    for name in indexes:
+        db.session.execute(text(f'DROP INDEX {name}'))
+    db.session.add_all([
+        Book(title='A', category=category, price=price, rating=3, availability='In stock')
+        for category, price in [('Travel', 10.0), ('Travel', 20.0), ('Poetry', 30.0), ('Travel', 40.0)]
+    ])
+    db.session.commit()
+    first_id = Book.query.filter_by(price=10.0).one().id
+
+    assert ensure_schema() == indexes
+
+    assert {index['name'] for index in inspect(db.engine).get_indexes('books')} >= set(indexes)
+    assert sorted((book.id, book.category) for book in Book.query) == [(first_id, 'Travel'), (first_id + 2, 'Poetry')]
+    # Segunda execução não recria nada nem apaga livros
+    assert ensure_schema() == []
+    assert Book.query.count() == 2
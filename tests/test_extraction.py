@@ -0,0 +1,186 @@
+import pytest
+from app.services.extraction import LxmlParser, SoupParser, extract_listing, page_urls, parse_rating, resolve_catalogue_url
+
+BASE_URL = "http://books.toscrape.com/"
+PAGE_URL = "http://books.toscrape.com/catalogue/category/books/travel_2/index.html"
+
+LISTING_HTML = """<!DOCTYPE html>
+<html lang="en-us"><head>
+<meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+<title>Travel | Books to Scrape - Sandbox</title></head>
+<body><div class="page_inner"><section><ol class="row">
+<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">
+    <div class="image_container">
+        <a href="../../../its-only-the-himalayas_981/index.html"><img src="../../../../media/cache/27/a5/27a53d0bb95bdd88288eaf66c9230d7e.jpg" alt="It's Only the Himalayas" class="thumbnail"></a>
+    </div>
+    <p class="star-rating Two">
+        <i class="icon-star"></i><i class="icon-star"></i>
+    </p>
+    <h3><a href="../../../its-only-the-himalayas_981/index.html" title="It's Only the Himalayas">It's Only the Himalayas</a></h3>
+    <div class="product_price">
+        <p class="price_color">£45.17</p>
+        <p class="instock availability">
+            <i class="icon-ok"></i>
+            In stock
+        </p>
+    </div>
+</article></li>
+<li><article class="product_pod">
+    <p class="star-rating Five"></p>
+    <h3><a href="../../../full-moon-over-noahs-ark_811/index.html" title="Full Moon over Noah&#39;s Ark &amp; Beyond">Full Moon...</a></h3>
+    <div class="product_price"><p class="price_color">£49.43</p></div>
+</article></li>
+<li><article class="product_pod">
+    <div class="image_container"><a href="x.html"><img alt="sem src"></a></div>
+    <h3><a href="catalogue/see-america_804/index.html" title="  See America  ">See America</a></h3>
+    <p class="price_color">preço inválido</p>
+    <p class="instock availability"><!-- estoque --> In <b>stock</b> (3 available)</p>
+</article></li>
+<li><article class="product_pod"><h3>Sem link</h3></article></li>
+</ol>
+<ul class="pager">
+    <li class="current">
+        Page 1 of 2
+    </li>
+    <li class="next"><a href="page-2.html">next</a></li>
+</ul>
+</section></div></body></html>
+"""
+
+LAST_PAGE_HTML = """<html><head><meta charset="utf-8"></head><body>
+<ul class="pager"><li class="previous"><a href="page-1.html">previous</a></li>
+<li class="current">Page 2 of 2</li></ul></body></html>"""
+
+PRODUCT_HTML = """<html><head><meta charset="utf-8"></head><body><article class="product_page">
+<div id="product_description" class="sub-header"><h2>Product Description</h2></div>
+<p>How can a 5'4\" woman ... <em>travel</em> the world — alone? “Citações” e acentuação: São Paulo. ...more</p>
+<p>Another paragraph that is long enough to be picked by the fallback search for sure.</p>
+</article></body></html>"""
+
+PRODUCT_SEM_DESCRICAO_HTML = """<html><head><meta charset="utf-8"></head><body>
+<div id="product_description" class="sub-header"><h2>Product Description</h2></div>
+<table><tr><td>UPC</td></tr></table>
+<p class="price_color">£10.00</p>
+<p>   Um parágrafo qualquer, mas comprido o suficiente para o fallback de busca.   </p>
+</body></html>"""
+
+PRODUCT_LONGO_HTML = (
+    '<html><head><meta charset="utf-8"></head><body><div id="product_description"></div><p>'
+    + "Lorem ipsum dolor sit amet " * 40 + "</p></body></html>"
+)
+
+PRODUCT_VAZIO_HTML = '<html><head><meta charset="utf-8"></head><body><p>curto</p></body></html>'
+
+HOME_HTML = """<html><head><meta charset="utf-8"></head><body>
+<div class="side_categories"><ul class="nav nav-list"><li>
+<a href="catalogue/category/books_1/index.html">Books</a>
+<ul>
+<li><a href="catalogue/category/books/travel_2/index.html">
+        Travel
+    </a></li>
+<li><a href="catalogue/category/books/mystery_3/index.html">Mystery</a></li>
+<li><a href="catalogue/category/books/historical-fiction_4/index.html">Historical Fiction</a></li>
+</ul></li></ul></div></body></html>"""
+
+
+@pytest.fixture(params=['bytes', 'str'])
+def as_input(request):
+    """Os dois backends devem aceitar bytes (response.content) e str"""
+    if request.param == 'bytes':
+        return lambda html: html.encode('utf-8')
+    return lambda html: html
+
+def _both(method, *args):
+    soup_result = getattr(SoupParser(BASE_URL), method)(*args)
+    lxml_result = getattr(LxmlParser(BASE_URL), method)(*args)
+    return soup_result, lxml_result
+
+def test_listagem_identica(as_input):
+    soup_result, lxml_result = _both('parse_listing_page', as_input(LISTING_HTML), PAGE_URL, 'Travel')
+
+    assert soup_result == lxml_result
+    books, next_url, pagination = lxml_result
+    assert len(books) == 3
+    assert next_url == "http://books.toscrape.com/catalogue/category/books/travel_2/page-2.html"
+    assert pagination == (1, 2)
+
+    book_url, first = books[0]
+    assert book_url == "http://books.toscrape.com/catalogue/its-only-the-himalayas_981/index.html"
+    assert first == {
+        'title': "It's Only the Himalayas",
+        'price': 45.17,
+        'availability': 'In stock',
+        'rating': 2,
+        'description': None,
+        'category': 'Travel',
+        'image_url': "http://books.toscrape.com/catalogue/media/cache/27/a5/27a53d0bb95bdd88288eaf66c9230d7e.jpg"
+    }
+
+def test_listagem_casos_de_borda(as_input):
+    books, _, _ = LxmlParser(BASE_URL).parse_listing_page(as_input(LISTING_HTML), PAGE_URL, 'Travel')
+
+    sem_imagem = books[1][1]
+    assert sem_imagem['title'] == "Full Moon over Noah's Ark & Beyond"
+    assert sem_imagem['rating'] == 5
+    assert sem_imagem['availability'] == 'Out of stock'
+    assert sem_imagem['image_url'] == ''
+
+    preco_invalido = books[2][1]
+    assert preco_invalido['title'] == 'See America'
+    assert preco_invalido['price'] == 0.0
+    assert preco_invalido['rating'] == 0
+    assert preco_invalido['availability'] == 'Instock(3 available)'
+
+def test_ultima_pagina_sem_proxima(as_input):
+    soup_result, lxml_result = _both('parse_listing_page', as_input(LAST_PAGE_HTML), PAGE_URL, 'Travel')
+    assert soup_result == lxml_result == ([], None, (2, 2))
+
+def test_paginacao_identica(as_input):
+    assert _both('parse_pagination', as_input(LISTING_HTML)) == ((1, 2), (1, 2))
+    assert _both('parse_pagination', as_input(LAST_PAGE_HTML)) == ((2, 2), (2, 2))
+    assert _both('parse_pagination', as_input(PRODUCT_HTML)) == (None, None)
+    # A listagem já devolve a mesma paginação, sem um segundo parse
+    soup_result, lxml_result = _both('parse_listing_page', as_input(LISTING_HTML), PAGE_URL, 'Travel')
+    assert soup_result[2] == lxml_result[2] == (1, 2)
+
+def test_urls_das_paginas_seguintes():
+    assert page_urls(PAGE_URL, 1, 3) == [
+        "http://books.toscrape.com/catalogue/category/books/travel_2/page-2.html",
+        "http://books.toscrape.com/catalogue/category/books/travel_2/page-3.html",
+    ]
+    assert page_urls(PAGE_URL.replace('index.html', 'page-3.html'), 3, 3) == []
+
+@pytest.mark.parametrize('html', [
+    PRODUCT_HTML, PRODUCT_SEM_DESCRICAO_HTML, PRODUCT_LONGO_HTML, PRODUCT_VAZIO_HTML
+])
+def test_descricao_identica(html, as_input):
+    soup_result, lxml_result = _both('parse_description', as_input(html))
+    assert soup_result == lxml_result
+
+def test_descricao_truncada_e_padrao():
+    parser = LxmlParser(BASE_URL)
+    assert parser.parse_description(PRODUCT_LONGO_HTML).endswith('...')
+    assert len(parser.parse_description(PRODUCT_LONGO_HTML)) == 503
+    assert parser.parse_description(PRODUCT_VAZIO_HTML) == "Descrição não disponível"
+    assert 'São Paulo' in parser.parse_description(PRODUCT_HTML.encode('utf-8'))
+
+def test_categorias_identicas(as_input):
+    soup_result, lxml_result = _both('parse_categories', as_input(HOME_HTML))
+
+    assert soup_result == lxml_result
+    assert list(lxml_result) == ['Travel', 'Mystery', 'Historical Fiction']
+    assert lxml_result['Travel'] == "http://books.toscrape.com/catalogue/category/books/travel_2/index.html"
+
+def test_extract_listing_em_lote():
+    """A API em lote devolve o mesmo resultado nos dois backends"""
+    lxml_result = extract_listing(LISTING_HTML.encode('utf-8'), PAGE_URL, 'Travel')
+    soup_result = extract_listing(LISTING_HTML.encode('utf-8'), PAGE_URL, 'Travel', parser='html.parser')
+    assert lxml_result == soup_result
+    assert [data['title'] for _, data in lxml_result[0]][0] == "It's Only the Himalayas"
+
+def test_normalizacao():
+    assert parse_rating(['star-rating', 'Four']) == 4
+    assert parse_rating(['star-rating']) == 0
+    assert resolve_catalogue_url(BASE_URL, '../../../a_1/index.html') == "http://books.toscrape.com/catalogue/a_1/index.html"
+    assert resolve_catalogue_url(BASE_URL, 'catalogue/a_1/index.html') == "http://books.toscrape.com/catalogue/a_1/index.html"
+    assert resolve_catalogue_url(BASE_URL, 'a/../b.html') == "http://books.toscrape.com/catalogue/b.html"
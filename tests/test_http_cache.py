@@ -0,0 +1,48 @@
+import requests
+import requests_mock
+from app.services.http_cache import CachingAdapter, FileCache
+
+URL = 'http://books.toscrape.com/index.html'
+
+def _session(tmp_path, **kwargs):
+    upstream = requests_mock.Adapter()
+    adapter = CachingAdapter(FileCache(str(tmp_path)), upstream=upstream, **kwargs)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    return session, upstream, adapter
+
+def test_cache_hit_dentro_do_ttl(tmp_path):
+    """Dentro do TTL a resposta vem do disco sem ir à rede"""
+    session, upstream, adapter = _session(tmp_path, ttl=3600)
+    upstream.register_uri('GET', URL, content=b'<html>ok</html>', headers={'ETag': '"v1"'})
+
+    assert session.get(URL).content == b'<html>ok</html>'
+    assert session.get(URL).content == b'<html>ok</html>'
+    assert upstream.call_count == 1
+    assert adapter.hits == 1
+
+def test_revalidacao_condicional_304(tmp_path):
+    """Depois do TTL envia If-None-Match e reaproveita o corpo no 304"""
+    session, upstream, adapter = _session(tmp_path, ttl=0)
+    upstream.register_uri('GET', URL, [
+        {'content': b'<html>ok</html>', 'headers': {'ETag': '"v1"'}},
+        {'status_code': 304, 'content': b''},
+    ])
+
+    session.get(URL)
+    response = session.get(URL)
+
+    assert response.status_code == 200
+    assert response.content == b'<html>ok</html>'
+    assert upstream.last_request.headers['If-None-Match'] == '"v1"'
+    assert adapter.revalidated == 1
+
+def test_modo_offline_ignora_idade(tmp_path):
+    """offline=True serve o cache mesmo expirado"""
+    session, upstream, _ = _session(tmp_path, ttl=0)
+    upstream.register_uri('GET', URL, content=b'<html>ok</html>')
+    session.get(URL)
+
+    offline_session, offline_upstream, _ = _session(tmp_path, ttl=0, offline=True)
+    assert offline_session.get(URL).content == b'<html>ok</html>'
+    assert offline_upstream.call_count == 0
@@ -0,0 +1,79 @@
+from app.models.book import Book, db
+from app.services.catalogue import read_generation
+from app.services.extraction import DESCRICAO_PADRAO, content_hash
+from app.services.ingest import bulk_upsert_books
+from tests.conftest import book_data as _book
+
+def test_upsert_em_lote_insere_novos(app):
+    added, updated, unchanged = bulk_upsert_books([_book(f'Livro {i}') for i in range(25)], batch_size=10)
+
+    assert (added, updated, unchanged) == (25, 0, 0)
+    assert Book.query.count() == 25
+    assert Book.query.first().content_hash == content_hash(_book('Livro 0'))
+
+def test_upsert_atualiza_so_os_que_mudaram(app):
+    bulk_upsert_books([_book('A'), _book('B')])
+
+    counts = bulk_upsert_books([_book('A', price=99.0), _book('B'), _book('C'), _book('A', category='Poetry')])
+
+    assert counts == (2, 1, 1)
+    assert Book.query.filter_by(title='A', category='Travel').one().price == 99.0
+    assert Book.query.count() == 4
+
+def test_upsert_inalterado_nao_escreve(app):
+    bulk_upsert_books([_book('A')])
+    generation = read_generation()
+
+    assert bulk_upsert_books([_book('A')]) == (0, 0, 1)
+    assert read_generation() == generation
+
+def test_hash_normalizado():
+    assert content_hash(_book('  A  livro ')) == content_hash(_book('A livro'))
+    assert content_hash({**_book('A'), 'price': '10'}) == content_hash(_book('A'))
+    # A descrição fica fora do hash (vem da página do produto / backfill)
+    assert content_hash(_book('A', description=None)) == content_hash(_book('A'))
+    assert content_hash({**_book('A'), 'source_url': 'http://x/a'}) != content_hash(_book('A'))
+
+def test_atualizacao_preserva_descricao(app):
+    """Crawl só de listagem (None) ou descrição que falhou não apagam a descrição gravada"""
+    bulk_upsert_books([_book('A', description='Descrição real')])
+
+    bulk_upsert_books([_book('A', price=12.0, description=None)])
+    bulk_upsert_books([_book('A', price=13.0, description=DESCRICAO_PADRAO)])
+
+    book = Book.query.one()
+    assert (book.price, book.description) == (13.0, 'Descrição real')
+
+def test_crawl_completo_preenche_descricao_do_crawl_de_listagem(app):
+    """Listagem (description None) e depois crawl completo: mesmo hash, mas a descrição é gravada"""
+    bulk_upsert_books([_book('A', description=None), _book('B', description=DESCRICAO_PADRAO)])
+
+    counts = bulk_upsert_books([_book('A', description='Descrição real'), _book('B', description='Outra real')])
+
+    assert counts == (0, 2, 0)
+    descriptions = {book.title: book.description for book in Book.query}
+    assert descriptions == {'A': 'Descrição real', 'B': 'Outra real'}
+    # Sem descrição nova o livro continua inalterado
+    assert bulk_upsert_books([_book('A', description=None)]) == (0, 0, 1)
+
+def test_descricao_editada_e_regravada(app):
+    bulk_upsert_books([_book('A', description='Descrição antiga')])
+
+    assert bulk_upsert_books([_book('A', description='Descrição  antiga ')]) == (0, 0, 1)
+    assert bulk_upsert_books([_book('A', description='Descrição revisada')]) == (0, 1, 0)
+    assert Book.query.one().description == 'Descrição revisada'
+
+def test_livro_antigo_sem_hash_e_atualizado(app):
+    bulk_upsert_books([_book('A')])
+    Book.query.update({'content_hash': None})
+    db.session.commit()
+
+    assert bulk_upsert_books([_book('A')]) == (0, 1, 0)
+    assert Book.query.one().content_hash is not None
+
+def test_upsert_remove_duplicados_do_lote(app):
+    added, updated, unchanged = bulk_upsert_books([_book('A'), _book('A', price=20.0)])
+
+    # O duplicado é descartado, não contado como inalterado
+    assert (added, updated, unchanged) == (1, 0, 0)
+    assert Book.query.one().price == 10.0
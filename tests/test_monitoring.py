@@ -0,0 +1,14 @@
+import logging
+from app.utils.logger import api_logger
+
+def test_requisicoes_de_teste_nao_vao_para_o_arquivo(app, monkeypatch):
+    file_handlers = [handler for handler in api_logger.logger.handlers if isinstance(handler, logging.FileHandler)]
+    record = logging.LogRecord('book_api', logging.INFO, __file__, 0, '{}', None, None)
+
+    assert file_handlers
+    assert not any(handler.filter(record) for handler in file_handlers)
+
+    app.config['TESTING'] = False
+    assert not any(handler.filter(record) for handler in file_handlers)
+    monkeypatch.delenv('PYTEST_CURRENT_TEST')
+    assert all(handler.filter(record) for handler in file_handlers)
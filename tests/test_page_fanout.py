@@ -0,0 +1,95 @@
+import time
+import pytest
+import requests_mock
+from app.models.book import Book
+from app.services.crawl_state import CrawlStateStore
+from app.services.pipeline import crawl_catalogue
+from app.services.resilience import RetryPolicy
+from app.services.scraper import BookScraper
+
+CATEGORY_DIR = 'http://books.toscrape.com/catalogue/category/books/default_15'
+CATEGORY_URL = f'{CATEGORY_DIR}/index.html'
+
+def _page(number, total, pager=True):
+    books = ''.join(f"""<li><article class="product_pod"><p class="star-rating One"></p>
+    <h3><a href="../../../livro-{number}-{i}_1/index.html" title="Livro {number}-{i}">x</a></h3>
+    <p class="price_color">£10.00</p></article></li>""" for i in range(2))
+    current = f'<li class="current">Page {number} of {total}</li>' if pager else ''
+    next_link = f'<li class="next"><a href="page-{number + 1}.html">next</a></li>' if number < total else ''
+    return f'<html><body><ol class="row">{books}</ol><ul class="pager">{current}{next_link}</ul></body></html>'
+
+def _page_url(number):
+    return CATEGORY_URL if number == 1 else f'{CATEGORY_DIR}/page-{number}.html'
+
+@pytest.fixture
+def scraper():
+    scraper = BookScraper(fields='listing', page_workers=4, retry_policy=RetryPolicy(retries=0))
+    yield scraper
+    scraper.close()
+
+def _mock_site(mock, total, pager=True, started=None):
+    for number in range(1, total + 1):
+        def respond(request, context, number=number):
+            if started is not None:
+                started.append(number)
+            return _page(number, total, pager)
+        mock.get(_page_url(number), text=respond)
+
+def test_paginas_buscadas_de_uma_vez_e_entregues_em_ordem(scraper):
+    started = []
+
+    with requests_mock.Mocker() as mock:
+        _mock_site(mock, 4, started=started)
+        pages = scraper.iter_category_pages(CATEGORY_URL, 'Default')
+
+        first_url, _, next_url = next(pages)
+        # Todas as páginas restantes já foram enviadas antes de consumir a segunda
+        for _ in range(100):
+            if len(started) == 4:
+                break
+            time.sleep(0.01)
+        assert sorted(started) == [1, 2, 3, 4]
+
+        rest = list(pages)
+
+    assert (first_url, next_url) == (CATEGORY_URL, _page_url(2))
+    assert [(url, following) for url, _, following in rest] == [
+        (_page_url(2), _page_url(3)), (_page_url(3), _page_url(4)), (_page_url(4), None)
+    ]
+    assert [book['title'] for book in rest[0][1]] == ['Livro 2-0', 'Livro 2-1']
+
+def test_contagem_vem_do_mesmo_parse_da_listagem(scraper, monkeypatch):
+    """A página 1 não é parseada uma segunda vez só para ler o li.current"""
+    def parse_pagination(content):
+        raise AssertionError('segundo parse da página 1')
+    monkeypatch.setattr(scraper.parser, 'parse_pagination', parse_pagination)
+
+    with requests_mock.Mocker() as mock:
+        _mock_site(mock, 3)
+        urls = [url for url, _, _ in scraper.iter_category_pages(CATEGORY_URL, 'Default')]
+
+    assert urls == [_page_url(number) for number in (1, 2, 3)]
+
+def test_sem_contagem_segue_o_link_next(scraper):
+    with requests_mock.Mocker() as mock:
+        _mock_site(mock, 3, pager=False)
+        pages = [url for url, _, _ in scraper.iter_category_pages(CATEGORY_URL, 'Default')]
+
+    assert pages == [_page_url(1), _page_url(2), _page_url(3)]
+
+def test_pipeline_grava_checkpoint_na_ordem(app, scraper):
+    with requests_mock.Mocker() as mock:
+        _mock_site(mock, 3)
+        mock.get(_page_url(3), status_code=404)
+        stats = crawl_catalogue(scraper, categories={'Default': CATEGORY_URL})
+
+    assert stats['pages_done'] == 2
+    assert Book.query.count() == 4
+    assert CrawlStateStore().resume_point('Default', CATEGORY_URL) == _page_url(3)
+
+    with requests_mock.Mocker() as mock:
+        _mock_site(mock, 3)
+        stats = crawl_catalogue(scraper, categories={'Default': CATEGORY_URL})
+
+    assert stats['pages_done'] == 1
+    assert Book.query.count() == 6
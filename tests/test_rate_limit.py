@@ -0,0 +1,66 @@
+import requests
+import requests_mock
+from app.services.rate_limit import AdaptiveRateLimiter, RateLimitedAdapter
+from tests.conftest import FakeClock
+
+URL = 'http://books.toscrape.com/index.html'
+
+def _limiter(**kwargs):
+    clock = FakeClock()
+    return AdaptiveRateLimiter(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+def test_burst_sem_espera_e_depois_espera_pela_taxa():
+    """Os primeiros `burst` pedidos passam direto; o seguinte espera 1/rate"""
+    limiter, clock = _limiter(rate=2.0, burst=2.0)
+
+    assert limiter.acquire(URL) == 0
+    assert limiter.acquire(URL) == 0
+    assert limiter.acquire(URL) == 0.5
+    assert clock.slept == [0.5]
+
+def test_respostas_rapidas_aumentam_a_taxa():
+    limiter, _ = _limiter(rate=2.0, max_rate=2.5, increase=0.25)
+
+    limiter.record(URL, 0.1, 200)
+    assert limiter.rate(URL) == 2.25
+    limiter.record(URL, 0.1, 200)
+    limiter.record(URL, 0.1, 200)
+    assert limiter.rate(URL) == 2.5
+
+def test_429_5xx_e_lentidao_reduzem_a_taxa():
+    limiter, _ = _limiter(rate=4.0, min_rate=0.5)
+
+    limiter.record(URL, 0.1, 429)
+    assert limiter.rate(URL) == 2.0
+    limiter.record(URL, 0.1, 503)
+    assert limiter.rate(URL) == 1.0
+    limiter.record(URL, 5.0, 200)
+    assert limiter.rate(URL) == 0.5
+    limiter.record(URL, 0.1, None)
+    assert limiter.rate(URL) == 0.5
+
+def test_taxa_e_por_host():
+    limiter, _ = _limiter(rate=2.0)
+
+    limiter.record(URL, 0.1, 429)
+    assert limiter.rate(URL) == 1.0
+    assert limiter.rate('http://outro.example/') == 2.0
+
+def test_retry_after_pausa_o_host():
+    limiter, _ = _limiter(rate=2.0, burst=2.0)
+
+    limiter.record(URL, 0.1, 429, retry_after=3)
+
+    # Taxa caiu para 1 req/s e o próximo token só sai depois dos 3s pedidos
+    assert limiter.acquire(URL) >= 3
+
+def test_adapter_registra_status_da_resposta():
+    limiter, _ = _limiter(rate=2.0)
+    upstream = requests_mock.Adapter()
+    upstream.register_uri('GET', URL, status_code=429, headers={'Retry-After': '1'})
+    session = requests.Session()
+    session.mount('http://', RateLimitedAdapter(limiter, upstream=upstream))
+
+    assert session.get(URL).status_code == 429
+    assert upstream.call_count == 1
+    assert limiter.rate(URL) == 1.0
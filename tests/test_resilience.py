@@ -0,0 +1,177 @@
+from datetime import datetime
+import pytest
+import requests
+import requests_mock
+from app.models.book import Book, db
+from app.models.failed_fetch import FailedFetch
+from app.services.dead_letters import retry_dead_letters, save_dead_letters
+from app.services.extraction import DESCRICAO_PADRAO
+from app.services.pipeline import crawl_catalogue
+from app.services.resilience import CircuitBreaker, CircuitOpen, RetryPolicy
+from app.services.scraper import BookScraper
+
+CATEGORY_URL = 'http://books.toscrape.com/catalogue/category/books/travel_2/index.html'
+PAGE_2_URL = 'http://books.toscrape.com/catalogue/category/books/travel_2/page-2.html'
+BOOK_URL = 'http://books.toscrape.com/catalogue/himalayas_981/index.html'
+
+def _listing(title, next_page=None):
+    pager = f'<ul class="pager"><li class="next"><a href="{next_page}">next</a></li></ul>' if next_page else ''
+    return f"""<html><head><meta charset="utf-8"></head><body><ol class="row"><li><article class="product_pod">
+    <p class="star-rating Two"></p>
+    <h3><a href="../../../himalayas_981/index.html" title="{title}">{title}</a></h3>
+    <p class="price_color">£45.17</p><p class="instock availability">In stock</p>
+    </article></li></ol>{pager}</body></html>"""
+
+PRODUCT_HTML = """<html><head><meta charset="utf-8"></head><body>
+<div id="product_description"><h2>Product Description</h2></div>
+<p>Uma descrição longa o bastante para ser a do livro.</p></body></html>"""
+
+@pytest.fixture
+def scraper(clock):
+    scraper = BookScraper(
+        retry_policy=RetryPolicy(retries=2, backoff=1.0, sleep=clock.sleep, jitter=lambda: 1.0),
+        breaker=CircuitBreaker(failure_threshold=3, cooldown=30, max_pauses=1, clock=clock, sleep=clock.sleep)
+    )
+    yield scraper
+    scraper.close()
+
+def test_backoff_exponencial_com_teto():
+    policy = RetryPolicy(backoff=1.0, max_backoff=5.0, jitter=lambda: 1.0)
+    assert [policy.delay(attempt) for attempt in range(4)] == [1.0, 2.0, 4.0, 5.0]
+
+def test_erro_transitorio_e_repetido(scraper, clock):
+    with requests_mock.Mocker() as mock:
+        mock.get(BOOK_URL, [{'status_code': 503}, {'exc': requests.ConnectTimeout}, {'text': 'ok'}])
+        assert scraper.fetch(BOOK_URL).text == 'ok'
+
+    assert mock.call_count == 3
+    assert clock.slept == [1.0, 2.0]
+
+def test_404_nao_e_repetido(scraper):
+    with requests_mock.Mocker() as mock:
+        mock.get(BOOK_URL, status_code=404)
+        with pytest.raises(requests.HTTPError):
+            scraper.fetch(BOOK_URL)
+
+    assert mock.call_count == 1
+
+def test_circuit_breaker_pausa_e_depois_desiste(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=30, max_pauses=1, clock=clock, sleep=clock.sleep)
+
+    breaker.record_failure(BOOK_URL)
+    assert breaker.before_request(BOOK_URL) == 0
+    breaker.record_failure(BOOK_URL)
+    assert breaker.is_open(BOOK_URL)
+
+    # Primeira abertura: pausa o cooldown e deixa tentar de novo
+    assert breaker.before_request(BOOK_URL) == 30
+    breaker.record_failure(BOOK_URL)
+    with pytest.raises(CircuitOpen):
+        breaker.before_request(BOOK_URL)
+
+    breaker.record_success(BOOK_URL)
+    assert not breaker.is_open(BOOK_URL)
+
+def test_falha_de_pagina_nao_perde_a_categoria(scraper):
+    """Os livros da página 1 ficam e a página 2 vai para dead letters"""
+    with requests_mock.Mocker() as mock:
+        mock.get(CATEGORY_URL, text=_listing('Himalayas', 'page-2.html'))
+        mock.get(PAGE_2_URL, status_code=500)
+        mock.get(BOOK_URL, status_code=404)
+        books = scraper.scrape_single_category('Travel', CATEGORY_URL)
+
+    assert [book['title'] for book in books] == ['Himalayas']
+    assert books[0]['description'] == DESCRICAO_PADRAO
+
+    failures = {entry['url']: entry for entry in scraper.dead_letters.drain()}
+    assert failures[PAGE_2_URL]['kind'] == 'page'
+    assert failures[BOOK_URL]['kind'] == 'description'
+    assert failures[BOOK_URL]['title'] == 'Himalayas'
+
+def test_get_categories_levanta_a_falha(scraper):
+    with requests_mock.Mocker() as mock:
+        mock.get(scraper.base_url, status_code=500)
+        with pytest.raises(requests.HTTPError):
+            scraper.get_categories()
+
+def test_pipeline_grava_e_passada_resolve_descricao(app, scraper):
+    with requests_mock.Mocker() as mock:
+        mock.get(CATEGORY_URL, text=_listing('Himalayas'))
+        mock.get(BOOK_URL, status_code=404)
+        stats = crawl_catalogue(scraper, categories={'Travel': CATEGORY_URL})
+
+    assert stats['dead_letters'] == 1
+    assert FailedFetch.query.one().kind == 'description'
+    Book.query.update({'scraped_at': datetime(2020, 1, 1)})
+    db.session.commit()
+
+    with requests_mock.Mocker() as mock:
+        mock.get(BOOK_URL, text=PRODUCT_HTML)
+        stats = retry_dead_letters(scraper)
+
+    assert stats['resolved'] == 1
+    assert FailedFetch.query.count() == 0
+    assert Book.query.one().description.startswith('Uma descrição longa')
+    assert Book.query.one().scraped_at > datetime(2020, 1, 1)
+
+def test_passada_de_pagina_que_falha_de_novo(app, scraper):
+    save_dead_letters([{
+        'url': PAGE_2_URL, 'kind': 'page', 'category': 'Travel', 'title': None,
+        'error': '500', 'failed_at': db.func.now()
+    }])
+    db.session.commit()
+
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_2_URL, status_code=404)
+        stats = retry_dead_letters(scraper)
+
+    assert stats['failed'] == 1
+    assert FailedFetch.query.one().attempts == 2
+
+def test_pipeline_para_com_circuito_aberto(app, scraper):
+    with requests_mock.Mocker() as mock:
+        mock.get(CATEGORY_URL, exc=requests.ConnectionError)
+        stats = crawl_catalogue(scraper, categories={'Travel': CATEGORY_URL, 'Poetry': CATEGORY_URL + '?p'})
+
+    assert stats['stopped_by'] == 'circuit_open'
+    assert stats['categories_failed'] == 1
+
+def _open_circuit(breaker, clock, url=CATEGORY_URL):
+    """Abre o circuito e esgota as pausas: a próxima chamada ao host levanta CircuitOpen"""
+    for _ in range(breaker.max_pauses + 1):
+        clock.now += breaker.cooldown
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure(url)
+
+def test_categoria_com_circuito_aberto_levanta(scraper, clock):
+    """CircuitOpen não vira dead letter de página - quem chamou precisa parar"""
+    _open_circuit(scraper.breaker, clock)
+    with requests_mock.Mocker() as mock:
+        mock.get(CATEGORY_URL, text=_listing('Himalayas'))
+        with pytest.raises(CircuitOpen):
+            scraper.scrape_single_category('Travel', CATEGORY_URL)
+
+    assert mock.call_count == 0
+    assert scraper.dead_letters.drain() == []
+
+def test_passada_para_com_circuito_aberto_e_renova_o_lock(app, scraper, clock):
+    for url in (BOOK_URL, PAGE_2_URL):
+        save_dead_letters([{
+            'url': url, 'kind': 'page', 'category': 'Travel', 'title': None,
+            'error': '500', 'failed_at': db.func.now()
+        }])
+    db.session.commit()
+    calls = []
+
+    def progress(stats):
+        calls.append(stats)
+        _open_circuit(scraper.breaker, clock)
+
+    with requests_mock.Mocker() as mock:
+        mock.get(BOOK_URL, status_code=404)
+        stats = retry_dead_letters(scraper, progress=progress)
+
+    # A primeira URL foi processada (e renovou o lock); a segunda parou a passada sem contar tentativa
+    assert [call['retried'] for call in calls] == [1]
+    assert stats['failed'] == 1
+    assert {row.url: row.attempts for row in FailedFetch.query} == {BOOK_URL: 2, PAGE_2_URL: 1}
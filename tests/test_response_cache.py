@@ -0,0 +1,73 @@
+import json
+from app.models.book import Book, db
+from app.services.ingest import bulk_upsert_books
+from app.utils.cache import ResponseCache
+from tests.conftest import book_data as _book
+
+def _total(client):
+    return json.loads(client.get('/api/v1/stats/overview').data)['total_books']
+
+def test_lru_descarta_o_menos_usado():
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert len(cache) == 2
+
+def test_resposta_servida_do_cache_ate_o_ingest(client, app):
+    bulk_upsert_books([_book('A Light in the Attic')])
+    assert _total(client) == 1
+
+    # Escrita fora do ingest não muda a geração: resposta continua em cache
+    db.session.add(Book(**_book('Sharp Objects')))
+    db.session.commit()
+    assert _total(client) == 1
+    assert app.extensions['response_cache'].hits == 1
+
+    # Commit do ingest incrementa a geração e invalida o cache
+    bulk_upsert_books([_book('Soumission')])
+    assert _total(client) == 3
+
+def test_chave_normaliza_os_parametros(client, app):
+    bulk_upsert_books([_book('A'), _book('B', price=20.0)])
+    cache = app.extensions['response_cache']
+
+    client.get('/api/v1/books/top-rated?limit=1&x=2')
+    client.get('/api/v1/books/top-rated?x=2&limit=1')
+    client.get('/api/v1/books/top-rated?limit=2')
+
+    assert cache.hits == 1
+    assert len(cache) == 2
+
+def test_swagger_continua_documentando_endpoints_cacheados(client):
+    spec = json.loads(client.get('/apispec_1.json').data)
+    assert 'get' in spec['paths']['/api/v1/categories']
+
+def test_etag_e_304_sem_mudancas(client):
+    bulk_upsert_books([_book('A Light in the Attic')])
+
+    response = client.get('/api/v1/books?per_page=200')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+
+    response = client.get('/api/v1/books?per_page=200', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    # Outros parâmetros, outro ETag
+    other = client.get('/api/v1/books?per_page=20', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+
+def test_etag_muda_apos_ingestao(client):
+    etag = client.get('/api/v1/categories').headers['ETag']
+
+    bulk_upsert_books([_book('Soumission')])
+
+    response = client.get('/api/v1/categories', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
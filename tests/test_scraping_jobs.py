@@ -0,0 +1,105 @@
+import json
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from app.models.book import Book, db
+from app.models.scraping_job import ScrapingJob, FINISHED, FAILED
+from app.services import pipeline
+from app.services import jobs
+from app.services.jobs import JobRunner, create_job
+from tests.conftest import FakeScraper
+
+pytestmark = pytest.mark.usefixtures('no_sleep')
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Não sobe a thread da fila: só registra os jobs enviados"""
+    jobs = []
+    monkeypatch.setattr(JobRunner, 'submit', lambda self, job_id: jobs.append(job_id))
+    return jobs
+
+def _headers(app, identity='admin:admin'):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=identity)}'}
+
+def test_trigger_enfileira_job(client, app, submitted):
+    response = client.post('/api/v1/scraping/trigger', json={'max_minutes': 5}, headers=_headers(app))
+    data = json.loads(response.data)
+
+    assert response.status_code == 202
+    assert data['status'] == 'queued'
+    assert submitted == [data['job_id']]
+    assert db.session.get(ScrapingJob, data['job_id']).params['max_minutes'] == 5
+
+    # Segundo trigger devolve o mesmo job em vez de outro crawl
+    again = json.loads(client.post('/api/v1/scraping/trigger', headers=_headers(app)).data)
+    assert again['job_id'] == data['job_id']
+    assert submitted == [data['job_id']]
+
+def test_trigger_exige_admin(client, app, submitted):
+    response = client.post('/api/v1/scraping/trigger', headers=_headers(app, 'ml_engineer:ml_engineer'))
+    assert response.status_code == 403
+    assert submitted == []
+
+def test_job_executa_e_reporta_progresso(client, app, monkeypatch):
+    job = create_job('admin', {'reset': True})
+    snapshots = []
+
+    def spy(*args, progress, **kwargs):
+        def report(stats):
+            progress(stats)
+            snapshots.append(stats['pages_done'])
+        return pipeline.crawl_catalogue(*args, progress=report, **kwargs)
+    monkeypatch.setattr(jobs, 'crawl_catalogue', spy)
+
+    JobRunner(app, scraper_factory=FakeScraper).run(job.id)
+
+    assert snapshots[0] == 0 and snapshots[-1] == 4
+
+    data = json.loads(client.get(f'/api/v1/scraping/jobs/{job.id}', headers=_headers(app)).data)
+    assert data['status'] == FINISHED
+    assert data['categories'] == {'total': 2, 'done': 2, 'failed': 0}
+    assert data['pages_done'] == 4
+    assert data['books_added'] == Book.query.count() == 8
+    assert data['progress']['percent'] == 100.0
+    assert data['progress']['eta_seconds'] is None
+
+def test_job_com_falha(app):
+    def broken():
+        raise RuntimeError('sem rede')
+
+    job = create_job('admin', {})
+    JobRunner(app, scraper_factory=broken).run(job.id)
+
+    job = db.session.get(ScrapingJob, job.id)
+    assert job.status == FAILED
+    assert job.error == 'sem rede'
+
+def test_job_inexistente(client, app):
+    assert client.get('/api/v1/scraping/jobs/999', headers=_headers(app)).status_code == 404
+
+def test_job_na_fila_abandonado_nao_bloqueia_novo_trigger(client, app, submitted):
+    stale = create_job('admin', {})
+    stale.created_at = datetime(2020, 1, 1)
+    db.session.commit()
+
+    data = json.loads(client.post('/api/v1/scraping/trigger', headers=_headers(app)).data)
+
+    assert data['job_id'] != stale.id
+    assert db.session.get(ScrapingJob, stale.id).status == FAILED
+
+def test_falha_antes_do_crawl_marca_job_como_falho(app, monkeypatch):
+    """Erro fora do run (ex.: banco) não deixa o job 'queued' para sempre"""
+    def explode(self, job_id):
+        raise RuntimeError('banco fora')
+    monkeypatch.setattr(JobRunner, 'run', explode)
+
+    job = create_job('admin', {})
+    runner = JobRunner(app)
+    runner.submit(job.id)
+    runner.queue.join()
+
+    db.session.expire_all()
+    job = db.session.get(ScrapingJob, job.id)
+    assert job.status == FAILED
+    assert job.error == 'banco fora'
@@ -0,0 +1,37 @@
+import json
+from app.models.book import Book, db
+from app.utils import serialization
+from app.utils.serialization import project_books, rows_to_dicts, dumps
+
+def _seed():
+    db.session.add_all([
+        Book(title='Café com Açúcar', price=12.5, rating=4, availability='In stock',
+             category='Food and Drink', image_url='http://x/1.jpg', description='Receitas "clássicas"'),
+        Book(title='Poems', price=8.0, rating=1, availability='In stock',
+             category='Poetry', image_url=None, description=None),
+    ])
+    db.session.commit()
+
+def test_tuplas_iguais_ao_to_dict(app):
+    _seed()
+
+    expected = [book.to_dict() for book in Book.query.order_by(Book.id)]
+    rows = rows_to_dicts(project_books(Book.query).order_by(Book.id))
+
+    assert rows == expected
+    assert [list(row) for row in rows] == [list(book) for book in expected]
+    assert dumps(rows) == dumps(expected)
+
+def test_orjson_e_json_geram_os_mesmos_bytes(app, monkeypatch):
+    _seed()
+    data = {'books': rows_to_dicts(project_books(Book.query))}
+
+    fast = dumps(data)
+    monkeypatch.setattr(serialization, 'orjson', None)
+    assert dumps(data) == fast
+    assert json.loads(fast) == data
+
+def test_api_devolve_mesma_estrutura(client):
+    _seed()
+    data = json.loads(client.get('/api/v1/books').data)
+    assert data['books'][0] == Book.query.order_by(Book.id).first().to_dict()
@@ -0,0 +1,78 @@
+import json
+from app.models.book import Book, db
+from app.models.stats import StatsSnapshot
+from app.services import pipeline
+from app.services.ingest import bulk_upsert_books
+from app.services.stats import compute_snapshot, percentiles, refresh_overview, refresh_stats, SNAPSHOT_ID
+from tests.conftest import CATEGORIES, FakeScraper, book_data as _book
+
+def test_percentis_interpolados():
+    assert percentiles([10.0, 20.0, 30.0, 40.0, 50.0]) == {'p25': 20.0, 'p50': 30.0, 'p75': 40.0, 'p90': 46.0}
+    assert percentiles([])['p50'] == 0.0
+
+def test_ingestao_grava_snapshot(client):
+    bulk_upsert_books([
+        _book('A', 'Poetry', 10.0, 1),
+        _book('B', 'Poetry', 20.0, 5),
+        _book('C', 'Travel', 30.0, 5),
+    ])
+
+    snapshot = db.session.get(StatsSnapshot, SNAPSHOT_ID)
+    assert snapshot.overview['total_books'] == 3
+    assert snapshot.categories['Poetry']['book_count'] == 2
+
+    data = json.loads(client.get('/api/v1/stats/overview').data)
+    assert data['price_statistics'] == {
+        'average': 20.0, 'max': 30.0, 'min': 10.0,
+        'percentiles': {'p25': 15.0, 'p50': 20.0, 'p75': 25.0, 'p90': 28.0}
+    }
+    assert data['rating_distribution'] == [{'rating': 1, 'count': 1}, {'rating': 5, 'count': 2}]
+
+    data = json.loads(client.get('/api/v1/stats/categories').data)
+    assert [stat['category'] for stat in data['category_stats']] == ['Poetry', 'Travel']
+    assert data['category_stats'][0]['avg_price'] == 15.0
+
+def test_atualizacao_incremental_por_categoria(app):
+    bulk_upsert_books([_book('A', 'Poetry', 10.0), _book('C', 'Travel', 30.0)])
+
+    # Alteração fora da ingestão: Travel só é recalculada quando for tocada
+    db.session.add(Book(**_book('D', 'Travel', 50.0)))
+    db.session.commit()
+
+    bulk_upsert_books([_book('B', 'Poetry', 20.0)])
+    snapshot = db.session.get(StatsSnapshot, SNAPSHOT_ID)
+    assert snapshot.categories['Poetry']['book_count'] == 2
+    assert snapshot.categories['Travel']['book_count'] == 1
+
+    refresh_stats()
+    db.session.commit()
+    assert db.session.get(StatsSnapshot, SNAPSHOT_ID).categories['Travel']['book_count'] == 2
+
+def test_sem_snapshot_calcula_na_hora(client):
+    db.session.add(Book(**_book('A', 'Poetry', 10.0)))
+    db.session.commit()
+
+    data = json.loads(client.get('/api/v1/categories').data)
+    assert data['categories'] == [{'name': 'Poetry', 'book_count': 1}]
+
+def test_percentis_gerais_so_no_refresh_overview(app):
+    bulk_upsert_books([_book('A', 'Poetry', 10.0), _book('B', 'Travel', 30.0)])
+
+    # Por página do crawl: contagens e média acompanham, os percentis gerais ficam como estavam
+    bulk_upsert_books([_book('C', 'Travel', 80.0)], percentiles=False)
+    overview = db.session.get(StatsSnapshot, SNAPSHOT_ID).overview
+    assert (overview['total_books'], overview['price_statistics']['average']) == (3, 40.0)
+    assert overview['price_statistics']['percentiles']['p50'] == 20.0
+
+    refresh_overview()
+    assert db.session.get(StatsSnapshot, SNAPSHOT_ID).overview == compute_snapshot()['overview']
+
+def test_crawl_recalcula_percentis_uma_vez_por_categoria(app, monkeypatch, no_sleep):
+    calls = []
+    monkeypatch.setattr(pipeline, 'refresh_overview', lambda: calls.append(1) or refresh_overview())
+
+    stats = pipeline.crawl_catalogue(FakeScraper())
+
+    assert stats['pages_done'] == 2 * len(CATEGORIES)
+    assert len(calls) == len(CATEGORIES)
+    assert db.session.get(StatsSnapshot, SNAPSHOT_ID).overview == compute_snapshot()['overview']
@@ -0,0 +1,88 @@
+import asyncio
+import importlib
+from datetime import timedelta
+import pytest
+import requests_mock
+from app.models.app_lock import AppLock
+from app.models.book import Book, db
+from app.services.locks import (acquire_lock, release_lock, exclusive_lock, crawl_heartbeat, LockBusy,
+                                CRAWL_LOCK, CRAWL_LOCK_TTL)
+from app.services.resilience import RetryPolicy
+from app.services.scraper import BookScraper
+from tests.conftest import FakeScraper
+
+# o pacote app.commands reexporta o comando com o mesmo nome do módulo
+warmup_module = importlib.import_module('app.commands.warmup_command')
+scrape_module = importlib.import_module('app.commands.scrape_command')
+
+@pytest.fixture(autouse=True)
+def fake_scraper(monkeypatch, no_sleep):
+    monkeypatch.setattr(warmup_module, 'BookScraper', lambda **kwargs: FakeScraper())
+    monkeypatch.setattr(FakeScraper, 'close', lambda self: None, raising=False)
+
+def test_lock_exclusivo(app):
+    owner = acquire_lock('teste', timedelta(minutes=5))
+
+    assert owner
+    assert acquire_lock('teste', timedelta(minutes=5)) is None
+    release_lock('teste', owner)
+    assert acquire_lock('teste', timedelta(minutes=5))
+
+def test_lock_expirado_e_assumido(app):
+    acquire_lock('teste', timedelta(minutes=-1))
+    assert acquire_lock('teste', timedelta(minutes=5))
+
+def test_warmup_crawla_e_libera_o_lock(runner):
+    result = runner.invoke(args=['warmup', '--target-books', '100'])
+
+    assert result.exit_code == 0, result.output
+    assert Book.query.count() == 8
+    assert 'Total: 8/100' in result.output
+    assert db.session.get(AppLock, CRAWL_LOCK) is None
+
+def test_warmup_nao_crawla_com_lock_ocupado(runner):
+    with exclusive_lock(CRAWL_LOCK, timedelta(minutes=5)):
+        result = runner.invoke(args=['warmup'])
+
+        assert result.exit_code == 0, result.output
+        assert 'Outro processo já está crawlando' in result.output
+        assert Book.query.count() == 0
+
+        with pytest.raises(LockBusy):
+            with exclusive_lock(CRAWL_LOCK, timedelta(minutes=5)):
+                pass
+
+def test_warmup_com_meta_atingida(runner):
+    result = runner.invoke(args=['warmup', '--target-books', '0'])
+    assert 'Meta atingida' in result.output
+
+def test_crawl_async_renova_o_lock_a_cada_pagina(app):
+    """scrape-books --clean: o lease do crawl não expira no meio de um crawl longo"""
+    url = 'http://books.toscrape.com/catalogue/category/books/travel_2/index.html'
+    scraper = BookScraper(fields='listing', retry_policy=RetryPolicy(retries=0))
+    with exclusive_lock(CRAWL_LOCK, timedelta(seconds=1)) as owner, requests_mock.Mocker() as mock:
+        mock.get(url, text='<html><body><ol class="row"></ol></body></html>')
+        asyncio.run(scraper.crawl_async({'Travel': url}, progress=crawl_heartbeat(owner)))
+
+        lock = db.session.get(AppLock, CRAWL_LOCK)
+        db.session.refresh(lock)
+        assert lock.expires_at - lock.acquired_at > CRAWL_LOCK_TTL - timedelta(minutes=1)
+    scraper.close()
+
+def test_scrape_books_fecha_o_scraper_mesmo_com_erro(runner, monkeypatch):
+    closed = []
+
+    class BrokenScraper(FakeScraper):
+        def get_categories(self):
+            raise RuntimeError('site fora do ar')
+
+        def close(self):
+            closed.append(True)
+
+    monkeypatch.setenv('RAILWAY_ENVIRONMENT', 'test')
+    monkeypatch.setattr(scrape_module, 'BookScraper', lambda **kwargs: BrokenScraper())
+    result = runner.invoke(args=['scrape-books'])
+
+    assert result.exit_code != 0
+    assert 'site fora do ar' in result.output
+    assert closed == [True]